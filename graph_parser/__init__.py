@@ -66,11 +66,11 @@ will need to add some details about the parsing of that function node.
 The update process is streamlined to be as minimal and easy to understand
 as possible.
 
-  1. Add a .py file in the node_parse_info submodule. The file should be
-     named after the node and contain information about how to parse the node.
-  2. Add parameter and naming data to the file function_node_library.py
-     in the node_parse_info submodule. The needed information can be
-     extracted directly from the OpenVX API specification.
+  1. Add a node spec to the file node_specs.py in the node_parse_info submodule,
+     with the node creation function, its parameters and the valid image formats.
+     The needed information can be extracted directly from the OpenVX API specification.
+  2. Only nodes with parameter objects (e.g. vx_threshold) need a .py file
+     in the node_parse_info submodule, named after the node, that creates the objects.
 
 Further overview documentation
 ------------------------------
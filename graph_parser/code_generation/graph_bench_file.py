@@ -0,0 +1,360 @@
+"""Module for generating the standalone benchmark C-sourcefile of the graph in strip mode
+
+"""
+
+from datetime import datetime
+from graphml_parser import graphml_parser
+import graph_swap_io_images_function
+
+def get_declared_size_strings(graphparser, image_id, default_size, userdata_defaults):
+    """Returns the C expressions for the width and height of the image from its attributes,
+    with the expressions of default_size for attributes without a size.
+
+    A userdata field given as width or height gets the expression of default_size as default value in userdata_defaults,
+    unless an earlier image has already given it one.
+    """
+    image_attributes = graphparser.image_nodes.get_image_attributes(image_id)
+    if image_attributes is None:
+        return default_size
+    sizes = []
+    for attribute, default in zip(['width', 'height'], default_size):
+        (is_userdata, value) = image_attributes.get_image_attribute(graphparser.userdata, attribute)
+        if is_userdata:
+            userdata_defaults.setdefault(value, default)
+            sizes.append("userdata." + value)
+        elif int(value) == 0:
+            sizes.append(default)
+        else:
+            sizes.append(str(value))
+    return sizes[0], sizes[1]
+
+def get_output_size_strings(function_name, input_size):
+    """Returns the C expressions for the size of an output image without a declared size,
+    computed from the input image size as in CostModel.get_output_size."""
+    if function_name == 'HalfScaleGaussian':
+        return tuple([str((int(size) + 1) // 2) if size.isdigit() else "(%s + 1) / 2" % (size)
+                      for size in input_size])
+    return input_size
+
+def get_image_size_strings(graphparser):
+    """Returns a dictionary with the id of each image node as key and the C expressions for its width and height
+    as value, and a dictionary with the default value of each userdata field that is used as a width or height.
+
+    As in CostModel.run, images without a size get the size of the image they are computed from,
+    and input images without a size get the frame size given on the command line.
+    """
+    frame_size = ('width', 'height')
+    image_sizes = {}
+    userdata_defaults = {}
+    for image_id in graphparser.image_nodes.input_nodes_indexed_names:
+        image_sizes[image_id] = get_declared_size_strings(graphparser, image_id, frame_size, userdata_defaults)
+
+    for node in graphparser.function_nodes.get_execution_order():
+        function_name = graphparser.function_nodes.get_function_node_name(node)
+        node_info = graphparser.function_nodes.get_node_info(node)
+        known_sizes = [image_sizes[image_id] for image_id in node_info.input_image_node_ids
+                       if image_id in image_sizes]
+        input_size = known_sizes[0] if known_sizes else frame_size
+        for image_id in node_info.input_image_node_ids:
+            if image_id not in image_sizes:
+                image_sizes[image_id] = get_declared_size_strings(graphparser, image_id, input_size,
+                                                                  userdata_defaults)
+        for image_id in node_info.output_image_node_ids:
+            image_sizes[image_id] = get_declared_size_strings(graphparser, image_id,
+                                                              get_output_size_strings(function_name, input_size),
+                                                              userdata_defaults)
+    return image_sizes, userdata_defaults
+
+def userdata_defaults(graphparser, defaults):
+    """Writes the default values of the userdata fields, the fields that are used as a width or height of an image
+    get the size the image would have without them (see get_image_size_strings)."""
+    parsed_string = ""
+    if not graphparser.userdata.has_userdata:
+        return parsed_string
+
+    parsed_string += "    %s_userdata_t userdata;\n" % (graphparser.graphname)
+    parsed_string += "    memset(&userdata, 0, sizeof(userdata));\n"
+    for attribute in sorted(graphparser.userdata.attributes):
+        if attribute in defaults:
+            parsed_string += "    userdata.%s = %s;\n" % (attribute, defaults[attribute])
+    return parsed_string
+
+def userdata_arguments(graphparser, first_argument):
+    """Writes the parsing of name=value command line arguments, from index first_argument, into the userdata fields."""
+    parsed_string = ""
+    if not graphparser.userdata.has_userdata:
+        return parsed_string
+
+    parsed_string += """\
+    for (i = %s; i < argc; i++) {
+        char *value = strchr(argv[i], '=');
+        if (value == NULL) {
+            fprintf(stderr, "Invalid userdata argument %%s, expected name=value\\n", argv[i]);
+            return EXIT_FAILURE;
+        }
+        *value++ = '\\0';
+""" % (first_argument)
+    for attribute in sorted(graphparser.userdata.attributes):
+        parsed_string += "        if (strcmp(argv[i], \"%s\") == 0) { userdata.%s = (%s) atof(value); continue; }\n" % \
+                         (attribute, attribute, graphparser.userdata.attributes[attribute])
+    parsed_string += """\
+        fprintf(stderr, "Unknown userdata field %s\\n", argv[i]);
+        return EXIT_FAILURE;
+    }
+"""
+    return parsed_string
+
+def create_images(graphparser, io_string, image_sizes):
+    """Writes the creation of the input or output images with the sizes given by image_sizes and the declared formats."""
+    parsed_string = ""
+    for index, image_id in enumerate(graphparser.get_indexed_names(io_string + '_image_nodes')):
+        width, height = image_sizes[image_id]
+        image_format = graph_swap_io_images_function.get_io_image_format(graphparser, image_id)
+        parsed_string += "    %s_images[%s] = vxCreateImage(context, %s, %s, VX_DF_IMAGE_%s);\n" % \
+                         (io_string, index, width, height, image_format)
+    return parsed_string
+
+def fill_image_function(graphparser):
+    """Writes the helper function that fills all planes of an image with a synthetic pattern."""
+    if graphparser.vx_version == graphml_parser.VX_VERSION_1_0_1:
+        map_string = """\
+        void *base_ptr = NULL;
+        if (vxAccessImagePatch(image, &rect, plane, &addr, &base_ptr, VX_WRITE_ONLY) != VX_SUCCESS) {
+            return false;
+        }
+"""
+        unmap_string = """\
+        vxCommitImagePatch(image, &rect, plane, &addr, base_ptr);
+"""
+        planes_attribute = "VX_IMAGE_ATTRIBUTE_PLANES"
+        width_attribute = "VX_IMAGE_ATTRIBUTE_WIDTH"
+        height_attribute = "VX_IMAGE_ATTRIBUTE_HEIGHT"
+    else:
+        map_string = """\
+        void *base_ptr = NULL;
+        vx_map_id map_id;
+        if (vxMapImagePatch(image, &rect, plane, &map_id, &addr, &base_ptr, VX_WRITE_ONLY, VX_MEMORY_TYPE_HOST, 0) != VX_SUCCESS) {
+            return false;
+        }
+"""
+        unmap_string = """\
+        vxUnmapImagePatch(image, map_id);
+"""
+        planes_attribute = "VX_IMAGE_PLANES"
+        width_attribute = "VX_IMAGE_WIDTH"
+        height_attribute = "VX_IMAGE_HEIGHT"
+
+    parsed_string = """\
+/* Fills all planes of the image with a synthetic pattern that changes with seed */
+static bool
+fill_synthetic_image(vx_image image, int seed)
+{
+    vx_size planes;
+    vx_uint32 width, height, plane, x, y, byte;
+    vx_rectangle_t rect;
+
+    vxQueryImage(image, %s, &planes, sizeof(planes));
+    vxQueryImage(image, %s, &width, sizeof(width));
+    vxQueryImage(image, %s, &height, sizeof(height));
+    rect.start_x = 0;
+    rect.start_y = 0;
+    rect.end_x = width;
+    rect.end_y = height;
+
+    for (plane = 0; plane < planes; plane++) {
+        vx_imagepatch_addressing_t addr;
+%s
+        for (y = 0; y < addr.dim_y; y += addr.step_y) {
+            for (x = 0; x < addr.dim_x; x += addr.step_x) {
+                vx_uint8 *pixel = (vx_uint8 *) vxFormatImagePatchAddress2d(base_ptr, x, y, &addr);
+                for (byte = 0; byte < (vx_uint32) addr.stride_x; byte++) {
+                    pixel[byte] = (vx_uint8) (x * 7 + y * 13 + byte * 31 + seed);
+                }
+            }
+        }
+%s    }
+
+    return true;
+}
+""" % (planes_attribute, width_attribute, height_attribute, map_string, unmap_string)
+
+    return parsed_string
+
+def parse(graphparser, header_filename):
+    """Writes the benchmark C-sourcefile
+
+    The benchmark creates input images with synthetic frames and output images of the sizes given by
+    get_image_size_strings and the declared formats,
+    creates and verifies the graph, runs warm-up iterations and then timed iterations of vxProcessGraph,
+    and prints the verify time, the first frame latency, the latency percentiles and the frames per second as JSON.
+    """
+
+    graphname = graphparser.graphname
+    num_input_imgs = len(graphparser.image_nodes.input_nodes_indexed_names)
+    num_output_imgs = len(graphparser.image_nodes.output_nodes_indexed_names)
+    userdata_string = "&userdata" if graphparser.userdata.has_userdata else "NULL"
+    image_sizes, defaults = get_image_size_strings(graphparser)
+
+    parsed_string = """\
+/* WARNING: DO NOT EDIT THIS FILE MANUALLY!
+            THIS FILE IS AUTO-GENERATED AND ANY CHANGES
+            WILL BE OVERWRITTEN IF FILE IS RE-GENERATED. */
+/**
+ *  @file   %s_bench.c
+ *  @author HAL 9000
+ *  @brief  Autogenerated standalone benchmark of the OpenVX graph.
+ *
+ *  Generated %s
+ *
+ *  Usage: %s_bench [width height [iterations [warmup [name=value ...]]]]
+ *  where width and height is the size of input images without a size in the graph,
+ *  and name=value sets a userdata field.
+ */
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <time.h>
+#include <VX/vx.h>
+
+#include "%s"
+
+static double
+elapsed_ms(const struct timespec *start, const struct timespec *end)
+{
+    return (end->tv_sec - start->tv_sec) * 1000.0 + (end->tv_nsec - start->tv_nsec) / 1000000.0;
+}
+
+static int
+compare_doubles(const void *a, const void *b)
+{
+    double difference = *(const double *) a - *(const double *) b;
+    return (difference > 0) - (difference < 0);
+}
+
+/* Nearest-rank percentile of sorted latencies */
+static double
+percentile(const double *latencies, int num, int percent)
+{
+    int rank = (percent * num + 99) / 100;
+    return latencies[rank > 0 ? rank - 1 : 0];
+}
+
+""" % (graphname, datetime.now().strftime('%c'), graphname, header_filename)
+
+    parsed_string += fill_image_function(graphparser)
+
+    parsed_string += """\
+
+int main(int argc, char *argv[])
+{
+    vx_uint32 width = argc > 2 ? atoi(argv[1]) : 640;
+    vx_uint32 height = argc > 2 ? atoi(argv[2]) : 480;
+    int iterations = argc > 3 ? atoi(argv[3]) : 100;
+    int warmup = argc > 4 ? atoi(argv[4]) : 10;
+    vx_image input_images[%s];
+    vx_image output_images[%s];
+    double *latencies;
+    double verify_ms, first_frame_ms = 0.0, total_ms = 0.0;
+    struct timespec start, end;
+    int i, iteration;
+    (void) width; /* To avoid compiler warning */
+    (void) height; /* To avoid compiler warning */
+
+""" % (num_input_imgs, num_output_imgs)
+
+    parsed_string += userdata_defaults(graphparser, defaults)
+    parsed_string += userdata_arguments(graphparser, 5)
+
+    parsed_string += """\
+    if (iterations < 1 || warmup < 1) {
+        fprintf(stderr, "At least one timed iteration and one warm-up iteration are needed\\n");
+        return EXIT_FAILURE;
+    }
+
+    vx_context context = vxCreateContext();
+    vx_graph graph = vxCreateGraph(context);
+
+"""
+    parsed_string += create_images(graphparser, 'input', image_sizes)
+    parsed_string += create_images(graphparser, 'output', image_sizes)
+
+    parsed_string += """\
+
+    for (i = 0; i < %s; i++) {
+        if (vxGetStatus((vx_reference) input_images[i]) != VX_SUCCESS || !fill_synthetic_image(input_images[i], i)) {
+            fprintf(stderr, "Failed to create input image #%%d\\n", i);
+            return EXIT_FAILURE;
+        }
+    }
+
+    if (!%s_create(context, graph, input_images, output_images, %s)) {
+        fprintf(stderr, "Failed to create graph\\n");
+        return EXIT_FAILURE;
+    }
+
+    clock_gettime(CLOCK_MONOTONIC, &start);
+    if (vxVerifyGraph(graph) != VX_SUCCESS) {
+        fprintf(stderr, "Failed to verify graph\\n");
+        return EXIT_FAILURE;
+    }
+    clock_gettime(CLOCK_MONOTONIC, &end);
+    verify_ms = elapsed_ms(&start, &end);
+
+    /* The first frame is the first warm-up iteration */
+    for (iteration = 0; iteration < warmup; iteration++) {
+        clock_gettime(CLOCK_MONOTONIC, &start);
+        if (vxProcessGraph(graph) != VX_SUCCESS) {
+            fprintf(stderr, "Failed to process graph\\n");
+            return EXIT_FAILURE;
+        }
+        clock_gettime(CLOCK_MONOTONIC, &end);
+        if (iteration == 0) {
+            first_frame_ms = elapsed_ms(&start, &end);
+        }
+    }
+
+    latencies = malloc(iterations * sizeof(double));
+    for (iteration = 0; iteration < iterations; iteration++) {
+        /* A new synthetic frame for each iteration, not included in the latency */
+        for (i = 0; i < %s; i++) {
+            fill_synthetic_image(input_images[i], iteration + i);
+        }
+        clock_gettime(CLOCK_MONOTONIC, &start);
+        if (vxProcessGraph(graph) != VX_SUCCESS) {
+            fprintf(stderr, "Failed to process graph\\n");
+            return EXIT_FAILURE;
+        }
+        clock_gettime(CLOCK_MONOTONIC, &end);
+        latencies[iteration] = elapsed_ms(&start, &end);
+        total_ms += latencies[iteration];
+    }
+    qsort(latencies, iterations, sizeof(double), compare_doubles);
+
+    printf("{\\"graph\\": \\"%s\\", \\"width\\": %%u, \\"height\\": %%u, \\"iterations\\": %%d, \\"warmup\\": %%d, "
+           "\\"verify_ms\\": %%.3f, \\"first_frame_ms\\": %%.3f, \\"p50_ms\\": %%.3f, \\"p95_ms\\": %%.3f, \\"p99_ms\\": %%.3f, "
+           "\\"fps\\": %%.2f}\\n",
+           width, height, iterations, warmup, verify_ms, first_frame_ms,
+           percentile(latencies, iterations, 50), percentile(latencies, iterations, 95),
+           percentile(latencies, iterations, 99), iterations * 1000.0 / total_ms);
+
+    free(latencies);
+""" % (num_input_imgs, graphname, userdata_string, num_input_imgs, graphname)
+
+    if graphparser.perf_report:
+        parsed_string += "    %s_perf_release_nodes(graph);\n" % (graphname)
+    parsed_string += """\
+    vxReleaseGraph(&graph);
+    for (i = 0; i < %s; i++) {
+        vxReleaseImage(&input_images[i]);
+    }
+    for (i = 0; i < %s; i++) {
+        vxReleaseImage(&output_images[i]);
+    }
+    vxReleaseContext(&context);
+
+    return EXIT_SUCCESS;
+}
+""" % (num_input_imgs, num_output_imgs)
+
+    return parsed_string
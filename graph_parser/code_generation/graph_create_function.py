@@ -2,7 +2,7 @@
 
 """
 from node_parse_info import function_node_library
-from graphml_parser import graphml_parser
+from node_parse_info import base_node
 import graph_create_function_strip
 
 def function_beginning(graphparser):
@@ -40,7 +40,7 @@ def input_imagearray_definition(graphparser):
     struct { int width; int height; vx_df_image format; } in_virt[] =
     {"""
     for index, image_id in enumerate(graphparser.image_nodes.input_nodes_indexed_names):
-        width, height, image_format, parsed_image_format = get_image_formats(graphparser, image_id)
+        width, height, image_format, parsed_image_format = graphparser.get_image_formats(image_id)
         parsed_string += """
         { %s, %s, VX_DF_IMAGE_%s },""" % (width, height, image_format)
     parsed_string += "\n    };\n"
@@ -74,7 +74,7 @@ def output_imagearray_definition(graphparser):
     struct { int width; int height; vx_df_image format; } out_virt[] =
     {"""
     for index, image_id in enumerate(graphparser.image_nodes.output_nodes_indexed_names):
-        width, height, image_format, parsed_image_format = get_image_formats(graphparser, image_id)
+        width, height, image_format, parsed_image_format = graphparser.get_image_formats(image_id)
         parsed_string += """
         { %s, %s, VX_DF_IMAGE_%s },""" % (width, height, image_format)
     parsed_string += "\n    };\n"
@@ -100,65 +100,6 @@ def output_imagearray_definition(graphparser):
 """
     return parsed_string
 
-def get_image_formats(graphparser, image_id):
-    """Gets some image formats
-
-    Returns 'width', 'height', the generated image format 'image_format'
-    and the corresponding parsed image enum 'parsed_image_format'
-
-    Note that if the parsed image enum is not specified in the graph definition,
-    the default attribute value is returned.
-    """
-    image_format = graphparser.get_image_format(image_id)
-
-    (value_from_opts, width) = graphparser.get_value_for_attribute(image_id, 'width')
-    if value_from_opts:
-        # TODO: Do we need to handle more general case when userdata reference isn't at beginning of line?
-        width = "opts->" + width
-
-    (value_from_opts, height) = graphparser.get_value_for_attribute(image_id, 'height')
-    if value_from_opts:
-        height = "opts->" + height
-
-    (value_from_opts, parsed_image_format) = graphparser.get_value_for_attribute(image_id, 'vx_df_image_e')
-    if value_from_opts:
-        raise(TypeError, "Attribute {} is of string type and can not be used as userdata input".format(parsed_image_format))
-
-    return width, height, image_format, parsed_image_format
-
-def uniform_imagearray_definition(graphparser):
-    """Writes the uniform image array definition."""
-    parsed_string = ""
-
-    if len(graphparser.get_indexed_names('uniform_input_image_nodes')) > 0:
-        uniform_image_var_names = {"VX_DF_IMAGE_U8" : "uint8",
-                                   "VX_DF_IMAGE_S16" : "int16"}
-        uniform_value_assign_strings = {"VX_DF_IMAGE_U8" : "U8",
-                                        "VX_DF_IMAGE_S16" : "S16"}
-        for key in uniform_image_var_names:
-            if key in graphparser.image_nodes.uniform_input_image_indexed_formats:
-                uniform_value_type = "vx_pixel_value_t"
-                if graphparser.vx_version == graphml_parser.VX_VERSION_1_0_1:
-                    uniform_value_type = "vx_{}".format(uniform_image_var_names[key])
-                parsed_string += "    {} uniform_value_{};\n".format(uniform_value_type, uniform_image_var_names[key])
-
-        parsed_string += "    vx_image uniform_input_images[{}];\n".format(len(graphparser.get_indexed_names('uniform_input_image_nodes')))
-
-        for index, uniform_image_id in enumerate(graphparser.get_indexed_names('uniform_input_image_nodes')):
-            width, height, image_format, parsed_image_format = get_image_formats(graphparser, uniform_image_id)
-            uniform_value_assign_string = ""
-            if graphparser.vx_version != graphml_parser.VX_VERSION_1_0_1:
-                uniform_value_assign_string = ".{}".format(uniform_value_assign_strings[parsed_image_format])
-            parsed_string += "    uniform_value_{}{} = {};\n".format(uniform_image_var_names[parsed_image_format], uniform_value_assign_string, str(graphparser.get_uniform_image_value_for_id(uniform_image_id)))
-            parsed_string += "    uniform_input_images[{}] = vxCreateUniformImage(graphmanager_get_context(graph_manager), {}, {}, VX_DF_IMAGE_{}, &uniform_value_{});\n".\
-                                                    format(index, width, height, image_format, uniform_image_var_names[parsed_image_format])
-
-        parsed_string += "\n"
-
-    return parsed_string
-
-# TODO: rename virtual_nodes_indexed_names to internal_nodes_indexed_names
-
 def internal_imagearray_definition(graphparser):
     """Writes the internal virtual image array definition."""
     parsed_string = ""
@@ -169,7 +110,7 @@ def internal_imagearray_definition(graphparser):
         parsed_string += "    vx_image internal_images[{}];\n".format(num_imgs)
 
         for index, image_id in enumerate(graphparser.image_nodes.virtual_nodes_indexed_names):
-            width, height, image_format, parsed_image_format = get_image_formats(graphparser, image_id)
+            width, height, image_format, parsed_image_format = graphparser.get_image_formats(image_id)
 
             (value_from_opts, nodetype) = graphparser.get_value_for_attribute(image_id, 'nodetype')
             if value_from_opts:
@@ -190,6 +131,9 @@ def create_function_nodes(graphparser, dry_run = False):
     """Writes function node creation code and connects edges."""
     parsed_string = ""
 
+    # The border mode variable is declared by the first node with a border mode in each generated function
+    base_node.BaseNode.border_mode_count = 0
+
     if not dry_run:
         #Writes memory allocation code for the correct number of input and output function nodes
         #to go into the node lists.
@@ -218,12 +162,22 @@ def create_function_nodes(graphparser, dry_run = False):
         if len(graphparser.get_dynamic_function_nodes_info()) > 0:
             parsed_string += "    node_rc_t *dynamic_nodes[" + str(len(graphparser.get_dynamic_function_nodes_info())) + "];\n"
 
+    # Validation keys of the nodes that passed the dry-run checks, see get_function_node_validation_key
+    validated_keys = set()
     for idx, node in enumerate(graphparser.get_indexed_names('function_nodes')):
         function_name = graphparser.function_nodes.get_function_node_name(node)
+        if dry_run:
+            # Nodes in copies of a subgraph template are validated once, by their prototype node
+            validation_key = graphparser.get_function_node_validation_key(node)
+            if validation_key in validated_keys:
+                continue
         if graphparser.verbose and not dry_run:
             print "Parsing vx" + function_name + "Node"
         parsed_string += function_node_library.get_node(function_name).parse(graphparser, node, "function_node = ", dry_run)
+        if dry_run and not function_node_library.get_node(function_name).node_has_errors:
+            validated_keys.add(validation_key)
         parsed_string += function_node_library.get_node(function_name).parse_border_mode(graphparser, node, "function_node", dry_run)
+        parsed_string += function_node_library.get_node(function_name).parse_target(graphparser, node, "function_node", dry_run)
         if graphparser.using_refcounted_assignment_string(node):
             parsed_string += "    node_rc_release(&function_node_rc);\n"
         else:
@@ -239,6 +193,8 @@ def create_function_nodes(graphparser, dry_run = False):
         for idx, itemlist in enumerate(graphparser.get_dynamic_function_nodes_info()):
             parsed_string += "    node_rc_release(&dynamic_nodes[" + str(idx) + "]);\n"
 
+        parsed_string += graphparser.parameter_pool.get_releases_string(shared=False)
+        parsed_string += graphparser.parameter_pool.get_releases_string(shared=True)
         parsed_string += "\n    return graph_skeleton != NULL ? true : false;\n"
         parsed_string += "}\n"
 
@@ -258,10 +214,17 @@ def parse(graphparser, dry_run = False):
         parsed_string += handle_userdata(graphparser)
         parsed_string += input_imagearray_definition(graphparser)
         parsed_string += output_imagearray_definition(graphparser)
-        parsed_string += uniform_imagearray_definition(graphparser)
+        parsed_string += graph_create_function_strip.uniform_imagearray_definition(graphparser)
         parsed_string += internal_imagearray_definition(graphparser)
 
-    parsed_string += create_function_nodes(graphparser, dry_run)
+    # The function nodes are parsed before the parameter objects are written,
+    # since parsing the function nodes populates the parameter object pool
+    graphparser.parameter_pool.reset()
+    function_nodes_string = create_function_nodes(graphparser, dry_run)
+    if not dry_run:
+        parsed_string += graphparser.parameter_pool.get_definitions_string(shared=True)
+        parsed_string += graphparser.parameter_pool.get_definitions_string(shared=False)
+    parsed_string += function_nodes_string
 
     if graphparser.verbose and not dry_run:
         print "Input image node IDs:\n" + str(graphparser.get_indexed_names('input_image_nodes')) + "\n"
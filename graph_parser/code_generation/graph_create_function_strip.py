@@ -2,8 +2,11 @@
 
 """
 from node_parse_info import function_node_library
+from node_parse_info import base_node
 from graphml_parser import graphml_parser
-import graph_create_function_strip_io
+import graph_tiles_function
+import graph_perf_report_function
+import graph_import_export_function
 
 def function_beginning(graphparser):
     """ Writes the very beginning of the create function, i.e. prototype and vxCreateGraph"""
@@ -15,6 +18,20 @@ def function_beginning(graphparser):
 /* Quick hack to avoid graph_manager dependency while avoiding hacking up the graph_parser too much internally */
 #define graphmanager_get_context(graph_manager) context
 
+"""
+    if graphparser.pipeline_depth > 0:
+        pipeline_depth = graphparser.graphname.upper() + "_PIPELINE_DEPTH"
+        parsed_string += """\
+bool
+%s_create(vx_context context, vx_graph graph_skeleton, vx_image input_image_buffers[%s][%s], vx_image output_image_buffers[%s][%s], void *userdata)
+{
+    /* The nodes are created with the first buffer of each I/O image */
+    vx_image *input_images = input_image_buffers[0];
+    vx_image *output_images = output_image_buffers[0];
+
+""" % (graphparser.graphname, pipeline_depth, num_input_imgs, pipeline_depth, num_output_imgs)
+    else:
+        parsed_string += """\
 bool
 %s_create(vx_context context, vx_graph graph_skeleton, vx_image input_images[%s], vx_image output_images[%s], void *userdata)
 {
@@ -32,34 +49,8 @@ def handle_userdata(graphparser):
 
     return parsed_string
 
-def get_image_formats(graphparser, image_id):
-    """Gets some image formats
-
-    Returns 'width', 'height', the generated image format 'image_format'
-    and the corresponding parsed image enum 'parsed_image_format'
-
-    Note that if the parsed image enum is not specified in the graph definition,
-    the default attribute value is returned.
-    """
-    image_format = graphparser.get_image_format(image_id)
-
-    (value_from_opts, width) = graphparser.get_value_for_attribute(image_id, 'width')
-    if value_from_opts:
-        # TODO: Do we need to handle more general case when userdata reference isn't at beginning of line?
-        width = "opts->" + width
-
-    (value_from_opts, height) = graphparser.get_value_for_attribute(image_id, 'height')
-    if value_from_opts:
-        height = "opts->" + height
-
-    (value_from_opts, parsed_image_format) = graphparser.get_value_for_attribute(image_id, 'vx_df_image_e')
-    if value_from_opts:
-        raise(TypeError, "Attribute {} is of string type and can not be used as userdata input".format(parsed_image_format))
-
-    return width, height, image_format, parsed_image_format
-
 def uniform_imagearray_definition(graphparser):
-    """Writes the uniform image array definition."""
+    """Writes the uniform image array definition, also used by graph_create_function outside strip mode."""
     parsed_string = ""
 
     if len(graphparser.get_indexed_names('uniform_input_image_nodes')) > 0:
@@ -76,8 +67,15 @@ def uniform_imagearray_definition(graphparser):
 
         parsed_string += "    vx_image uniform_input_images[{}];\n".format(len(graphparser.get_indexed_names('uniform_input_image_nodes')))
 
+        # Uniform images with the same value, size and format are only created once
+        created_uniform_images = {}
         for index, uniform_image_id in enumerate(graphparser.get_indexed_names('uniform_input_image_nodes')):
-            width, height, image_format, parsed_image_format = get_image_formats(graphparser, uniform_image_id)
+            width, height, image_format, parsed_image_format = graphparser.get_image_formats(uniform_image_id)
+            uniform_image_key = (str(graphparser.get_uniform_image_value_for_id(uniform_image_id)), width, height, image_format)
+            if uniform_image_key in created_uniform_images:
+                parsed_string += "    uniform_input_images[{}] = uniform_input_images[{}];\n".format(index, created_uniform_images[uniform_image_key])
+                continue
+            created_uniform_images[uniform_image_key] = index
             uniform_value_assign_string = ""
             if graphparser.vx_version != graphml_parser.VX_VERSION_1_0_1:
                 uniform_value_assign_string = ".{}".format(uniform_value_assign_strings[parsed_image_format])
@@ -101,7 +99,7 @@ def internal_imagearray_definition(graphparser):
         parsed_string += "    vx_image internal_images[{}];\n".format(num_imgs)
 
         for index, image_id in enumerate(graphparser.image_nodes.virtual_nodes_indexed_names):
-            width, height, image_format, parsed_image_format = get_image_formats(graphparser, image_id)
+            width, height, image_format, parsed_image_format = graphparser.get_image_formats(image_id)
 
             (value_from_opts, nodetype) = graphparser.get_value_for_attribute(image_id, 'nodetype')
             if value_from_opts:
@@ -118,10 +116,69 @@ def internal_imagearray_definition(graphparser):
 
     return parsed_string
 
+def io_graph_parameters(graphparser):
+    """Writes the code that adds the I/O images as graph parameters.
+
+    The I/O graph parameters follow the graph parameters of the dynamic nodes, see GraphParser.get_io_graph_parameters.
+    """
+    parsed_string = "    /* Input and output images as graph parameters */\n"
+    for io_graph_index in range(len(graphparser.get_io_graph_parameters())):
+        parsed_string += "    vxAddParameterToGraph(graph_skeleton, io_parameters[{}]);\n".format(io_graph_index)
+        parsed_string += "    vxReleaseParameter(&io_parameters[{}]);\n".format(io_graph_index)
+    parsed_string += "\n"
+
+    return parsed_string
+
+def pipeline_schedule_config(graphparser):
+    """Writes the code that configures the pipelined graph scheduling of the I/O graph parameters.
+
+    The extra graph parameters of I/O images with several connections get the buffers of their I/O image,
+    since a graph parameter can only be connected to one function node parameter. Such an image is then
+    in the queues of several graph parameters, which the OpenVX implementation must accept.
+    If the configuration fails, success is set to false, so that the generated function still releases its objects.
+    """
+    num_input_imgs = len(graphparser.image_nodes.input_nodes_indexed_names)
+    num_output_imgs = len(graphparser.image_nodes.output_nodes_indexed_names)
+    num_io_imgs = num_input_imgs + num_output_imgs
+    io_graph_parameters = graphparser.get_io_graph_parameters()
+    first_io_parameter_index = len(graphparser.get_dynamic_function_nodes_info())
+    pipeline_depth = graphparser.graphname.upper() + "_PIPELINE_DEPTH"
+
+    parsed_string = """\
+    vx_reference io_refs[%s][%s];
+    vx_graph_parameter_queue_params_t queue_params[%s];
+    int buffer_index;
+    for (buffer_index = 0; buffer_index < %s; buffer_index++) {
+""" % (num_io_imgs, pipeline_depth, len(io_graph_parameters), pipeline_depth)
+    for index in range(num_input_imgs):
+        parsed_string += "        io_refs[{}][buffer_index] = (vx_reference) input_image_buffers[buffer_index][{}];\n".format(index, index)
+    for index in range(num_output_imgs):
+        parsed_string += "        io_refs[{}][buffer_index] = (vx_reference) output_image_buffers[buffer_index][{}];\n".format(num_input_imgs + index, index)
+    parsed_string += "    }\n"
+
+    if len(io_graph_parameters) > num_io_imgs:
+        parsed_string += "    /* The images of the extra graph parameters are also in the queues of their first graph parameter */\n"
+    for io_graph_index, (io_string, node_index, parameter_index, io_index) in enumerate(io_graph_parameters):
+        parsed_string += "    queue_params[{}].graph_parameter_index = {};\n".format(io_graph_index, first_io_parameter_index + io_graph_index)
+        parsed_string += "    queue_params[{}].refs_list_size = {};\n".format(io_graph_index, pipeline_depth)
+        parsed_string += "    queue_params[{}].refs_list = io_refs[{}];\n".format(io_graph_index, io_index)
+
+    parsed_string += """\
+    if (vxSetGraphScheduleConfig(graph_skeleton, VX_GRAPH_SCHEDULE_MODE_QUEUE_AUTO, %s, queue_params) != VX_SUCCESS) {
+        success = false;
+    }
+
+""" % (len(io_graph_parameters))
+
+    return parsed_string
+
 def create_function_nodes(graphparser, dry_run = False):
     """Writes function node creation code and connects edges."""
     parsed_string = ""
 
+    # The border mode variable is declared by the first node with a border mode in each generated function
+    base_node.BaseNode.border_mode_count = 0
+
     if not dry_run:
         #Writes memory allocation code for the correct number of input and output function nodes
         #to go into the node lists.
@@ -130,15 +187,35 @@ def create_function_nodes(graphparser, dry_run = False):
         if len(graphparser.get_dynamic_function_nodes_info()) > 0:
             parsed_string += "    vx_node dynamic_nodes[" + str(len(graphparser.get_dynamic_function_nodes_info())) + "];\n"
 
+        if graphparser.strip_io or graphparser.pipeline_depth > 0:
+            parsed_string += "    vx_parameter io_parameters[" + str(len(graphparser.get_io_graph_parameters())) + "];\n"
+
+        if graphparser.perf_report:
+            parsed_string += graph_perf_report_function.declare_nodes(graphparser)
+            parsed_string += "\n" + graph_perf_report_function.enable_performance()
+
     parsed_string += "\n"
 
+    # Validation keys of the nodes that passed the dry-run checks, see get_function_node_validation_key
+    validated_keys = set()
     for idx, node in enumerate(graphparser.get_indexed_names('function_nodes')):
         function_name = graphparser.function_nodes.get_function_node_name(node)
+        if dry_run:
+            # Nodes in copies of a subgraph template are validated once, by their prototype node
+            validation_key = graphparser.get_function_node_validation_key(node)
+            if validation_key in validated_keys:
+                continue
         if graphparser.verbose and not dry_run:
             print "Parsing vx" + function_name + "Node"
         parsed_string += function_node_library.get_node(function_name).parse(graphparser, node, "function_node = ", dry_run)
+        if dry_run and not function_node_library.get_node(function_name).node_has_errors:
+            validated_keys.add(validation_key)
         parsed_string += function_node_library.get_node(function_name).parse_border_mode(graphparser, node, "function_node", dry_run)
-        if graphparser.is_function_dynamic_node(node):
+        parsed_string += function_node_library.get_node(function_name).parse_target(graphparser, node, "function_node", dry_run)
+        if graphparser.perf_report:
+            # The node is released by the perf release nodes function
+            parsed_string += graph_perf_report_function.keep_node(graphparser, idx)
+        elif graphparser.is_function_dynamic_node(node):
             pass # Do nothing here
         else:
             parsed_string += "    vxReleaseNode(&function_node);\n"
@@ -146,35 +223,139 @@ def create_function_nodes(graphparser, dry_run = False):
             parsed_string += "\n"
 
     if not dry_run:
+        if graphparser.perf_report:
+            parsed_string += "\n" + graph_perf_report_function.keep_nodes(graphparser)
         if len(graphparser.get_dynamic_function_nodes_info()) > 0:
             parsed_string += "\n"
         for idx, itemlist in enumerate(graphparser.get_dynamic_function_nodes_info()):
             parsed_string += "    vxAddParameterToGraph(graph_skeleton, vxGetParameterByIndex(dynamic_nodes[" + str(idx) + "], " + str(itemlist[1]) + "));\n"
-        for idx, itemlist in enumerate(graphparser.get_dynamic_function_nodes_info()):
-            parsed_string += "    vxReleaseNode(&dynamic_nodes[" + str(idx) + "]);\n"
+        if not graphparser.perf_report:
+            for idx, itemlist in enumerate(graphparser.get_dynamic_function_nodes_info()):
+                parsed_string += "    vxReleaseNode(&dynamic_nodes[" + str(idx) + "]);\n"
 
         parsed_string += "\n"
 
-        parsed_string += "\n    return graph_skeleton != NULL ? true : false;\n"
-        parsed_string += "}\n"
+        if graphparser.strip_io or graphparser.pipeline_depth > 0:
+            parsed_string += io_graph_parameters(graphparser)
+        if graphparser.pipeline_depth > 0:
+            parsed_string += pipeline_schedule_config(graphparser)
+
+    return parsed_string
+
+def indent(code_string):
+    """Indents each non-empty line of code_string by 4 spaces."""
+    return "".join([("    " + line if line.strip() else line) for line in code_string.splitlines(True)])
+
+def create_instances_function(graphparser):
+    """Writes the function that creates all graph instances.
+
+    The uniform images and the shared parameter objects are created once, before the graph instances,
+    while the internal images, the nodes and the parameter objects of the dynamic nodes are created per instance.
+    """
+    instances = graphparser.graphname.upper() + "_INSTANCES"
+    num_input_imgs = len(graphparser.image_nodes.input_nodes_indexed_names)
+    num_output_imgs = len(graphparser.image_nodes.output_nodes_indexed_names)
+
+    parsed_string = """\
+
+bool
+%s_create_instances(vx_context context, vx_graph graphs[%s], vx_image instance_input_images[%s][%s], vx_image instance_output_images[%s][%s], void *userdata)
+{
+""" % (graphparser.graphname, instances, instances, num_input_imgs, instances, num_output_imgs)
+    parsed_string += handle_userdata(graphparser)
+    parsed_string += uniform_imagearray_definition(graphparser)
+
+    graphparser.parameter_pool.reset()
+    function_nodes_string = create_function_nodes(graphparser)
+    parsed_string += graphparser.parameter_pool.get_definitions_string(shared=True)
+
+    instance_string = """\
+    vx_graph graph_skeleton = graphs[instance];
+    vx_image *input_images = instance_input_images[instance];
+    vx_image *output_images = instance_output_images[instance];
+
+"""
+    instance_string += graphparser.parameter_pool.get_definitions_string(shared=False)
+    instance_string += internal_imagearray_definition(graphparser)
+    instance_string += function_nodes_string
+    instance_string += graphparser.parameter_pool.get_releases_string(shared=False)
+    instance_string += "\n    success = success && graph_skeleton != NULL;\n"
+
+    parsed_string += """\
+    bool success = true;
+    int instance;
+    for (instance = 0; instance < %s; instance++) {
+""" % (instances)
+    parsed_string += indent(instance_string)
+    parsed_string += "    }\n\n"
+    parsed_string += graphparser.parameter_pool.get_releases_string(shared=True)
+    parsed_string += """\
+
+    return success;
+}
+
+bool
+%s_process_instances(vx_graph graphs[%s])
+{
+    int num_errors = 0;
+    int instance;
+
+    /* Schedule all instances before waiting, so that the implementation can process them concurrently */
+    for (instance = 0; instance < %s; instance++) {
+        if (vxScheduleGraph(graphs[instance]) != VX_SUCCESS) { fprintf(stderr, "Failed to schedule graph instance #%%d\\n", instance); num_errors++; }
+    }
+    for (instance = 0; instance < %s; instance++) {
+        if (vxWaitGraph(graphs[instance]) != VX_SUCCESS) { fprintf(stderr, "Failed to process graph instance #%%d\\n", instance); num_errors++; }
+    }
+
+    return (num_errors == 0);
+}
+""" % (graphparser.graphname, instances, instances, instances)
 
     return parsed_string
 
 def parse(graphparser, dry_run = False):
     """Writes the graph create function C-code by calling several helper functions."""
 
-    if graphparser.strip_io:
-        return graph_create_function_strip_io.parse(graphparser, dry_run=dry_run)
-
     parsed_string = ""
 
     if not dry_run:
+        if graphparser.perf_report:
+            parsed_string += graph_perf_report_function.definitions(graphparser)
         parsed_string += function_beginning(graphparser)
         parsed_string += handle_userdata(graphparser)
         parsed_string += uniform_imagearray_definition(graphparser)
         parsed_string += internal_imagearray_definition(graphparser)
 
-    parsed_string += create_function_nodes(graphparser, dry_run)
+    # The function nodes are parsed before the parameter objects are written,
+    # since parsing the function nodes populates the parameter object pool
+    graphparser.parameter_pool.reset()
+    function_nodes_string = create_function_nodes(graphparser, dry_run)
+    if not dry_run:
+        parsed_string += graphparser.parameter_pool.get_definitions_string(shared=True)
+        parsed_string += graphparser.parameter_pool.get_definitions_string(shared=False)
+        if graphparser.pipeline_depth > 0:
+            # Cleared by the schedule configuration, see pipeline_schedule_config
+            parsed_string += "    bool success = true;\n"
+    parsed_string += function_nodes_string
+
+    if not dry_run:
+        parsed_string += graphparser.parameter_pool.get_releases_string(shared=False)
+        parsed_string += graphparser.parameter_pool.get_releases_string(shared=True)
+        if graphparser.pipeline_depth > 0:
+            parsed_string += "\n    return success && graph_skeleton != NULL;\n"
+        else:
+            parsed_string += "\n    return graph_skeleton != NULL ? true : false;\n"
+        parsed_string += "}\n"
+
+        if graphparser.instances > 1:
+            parsed_string += create_instances_function(graphparser)
+        if graphparser.tiles > 1:
+            parsed_string += graph_tiles_function.parse(graphparser)
+        if graphparser.perf_report:
+            parsed_string += graph_perf_report_function.parse(graphparser)
+        if graphparser.import_export:
+            parsed_string += graph_import_export_function.parse(graphparser)
 
     if graphparser.verbose and not dry_run:
         print "Input image node IDs:\n" + str(graphparser.get_indexed_names('input_image_nodes')) + "\n"
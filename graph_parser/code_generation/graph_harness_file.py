@@ -0,0 +1,453 @@
+"""Module for generating the standalone sequence test harness C-sourcefile of the graph in strip mode
+
+"""
+
+from datetime import datetime
+import graph_swap_io_images_function
+import graph_bench_file
+
+# Bytes per pixel of the image formats supported by the harness, i.e. the formats of Y8 and Y16 files
+HARNESS_FORMATS = {'U8'  : 1,
+                   'U16' : 2,
+                   'S16' : 2}
+
+def get_unsupported_images(graphparser):
+    """Returns a list of (image id, format) of the I/O images with formats that the harness does not support."""
+    unsupported_images = []
+    for image_id in graphparser.image_nodes.input_nodes_indexed_names + graphparser.image_nodes.output_nodes_indexed_names:
+        image_format = graph_swap_io_images_function.get_io_image_format(graphparser, image_id)
+        if image_format not in HARNESS_FORMATS:
+            unsupported_images.append((image_id, image_format))
+    return unsupported_images
+
+def image_tables(graphparser, io_string, image_sizes):
+    """Writes the tables with the width, height, format and bytes per pixel of the input or output images,
+    with the sizes given by image_sizes (see graph_bench_file.get_image_size_strings)."""
+    widths = []
+    heights = []
+    formats = []
+    bytes_per_pixel = []
+    for image_id in graphparser.get_indexed_names(io_string + '_image_nodes'):
+        width, height = image_sizes[image_id]
+        image_format = graph_swap_io_images_function.get_io_image_format(graphparser, image_id)
+        widths.append(width)
+        heights.append(height)
+        formats.append("VX_DF_IMAGE_" + image_format)
+        bytes_per_pixel.append(str(HARNESS_FORMATS[image_format]))
+
+    parsed_string = """\
+    vx_uint32 %s_widths[] = {%s};
+    vx_uint32 %s_heights[] = {%s};
+    vx_df_image %s_formats[] = {%s};
+    vx_uint32 %s_bytes_per_pixel[] = {%s};
+""" % (io_string, ", ".join(widths), io_string, ", ".join(heights),
+       io_string, ", ".join(formats), io_string, ", ".join(bytes_per_pixel))
+
+    return parsed_string
+
+def helper_functions():
+    """Writes the helper functions for memory-mapped raw and PGM files."""
+    return """\
+typedef struct {
+    vx_uint8 *data;
+    size_t size;
+    size_t offset; /* Offset of the next frame */
+    bool pgm;
+} mapped_file_t;
+
+static double
+elapsed_ms(const struct timespec *start, const struct timespec *end)
+{
+    return (end->tv_sec - start->tv_sec) * 1000.0 + (end->tv_nsec - start->tv_nsec) / 1000000.0;
+}
+
+static bool
+has_pgm_extension(const char *filename)
+{
+    size_t length = strlen(filename);
+    return length >= 4 && strcmp(filename + length - 4, ".pgm") == 0;
+}
+
+/* Maps an input file read-only, or creates an output file of the given size and maps it for writing */
+static bool
+map_file(const char *filename, size_t size, bool output, mapped_file_t *file)
+{
+    struct stat file_stat;
+    void *data = MAP_FAILED;
+    int fd = open(filename, output ? O_RDWR | O_CREAT | O_TRUNC : O_RDONLY, 0644);
+
+    if (fd < 0) {
+        fprintf(stderr, "Failed to open %s\\n", filename);
+        return false;
+    }
+    if (output) {
+        if (ftruncate(fd, size) != 0) {
+            size = 0;
+        }
+    } else if (fstat(fd, &file_stat) == 0) {
+        size = file_stat.st_size;
+    }
+    if (size > 0) {
+        data = mmap(NULL, size, output ? PROT_READ | PROT_WRITE : PROT_READ, output ? MAP_SHARED : MAP_PRIVATE, fd, 0);
+    }
+    close(fd);
+    if (data == MAP_FAILED) {
+        fprintf(stderr, "Failed to map %s\\n", filename);
+        return false;
+    }
+    if (!output) {
+        madvise(data, size, MADV_SEQUENTIAL);
+    }
+
+    file->data = (vx_uint8 *) data;
+    file->size = size;
+    file->offset = 0;
+    file->pgm = has_pgm_extension(filename);
+    return true;
+}
+
+/* Parses the P5 PGM header at the offset of the file, returns the size of the header or 0 if it is not valid */
+static size_t
+parse_pgm_header(const mapped_file_t *file, size_t offset, vx_uint32 *width, vx_uint32 *height, vx_uint32 *maxval)
+{
+    vx_uint32 values[3];
+    size_t pos = offset + 2;
+    int i;
+
+    if (offset + 2 > file->size || file->data[offset] != 'P' || file->data[offset + 1] != '5') {
+        return 0;
+    }
+    for (i = 0; i < 3; i++) {
+        /* Skip white space and comments */
+        while (pos < file->size && (isspace(file->data[pos]) || file->data[pos] == '#')) {
+            if (file->data[pos] == '#') {
+                while (pos < file->size && file->data[pos] != '\\n') {
+                    pos++;
+                }
+            } else {
+                pos++;
+            }
+        }
+        if (pos >= file->size || !isdigit(file->data[pos])) {
+            return 0;
+        }
+        values[i] = 0;
+        while (pos < file->size && isdigit(file->data[pos])) {
+            values[i] = values[i] * 10 + (file->data[pos] - '0');
+            pos++;
+        }
+    }
+    /* A single white space character before the pixel data */
+    pos++;
+
+    *width = values[0];
+    *height = values[1];
+    *maxval = values[2];
+    return pos - offset;
+}
+
+/* Returns the number of complete frames in an input file of raw frames or concatenated PGM frames */
+static vx_uint32
+count_frames(const char *filename, const mapped_file_t *file, vx_uint32 width, vx_uint32 height, vx_uint32 bytes_per_pixel)
+{
+    size_t frame_size = (size_t) width * height * bytes_per_pixel;
+    vx_uint32 num_frames = 0;
+    size_t offset = 0;
+
+    if (!file->pgm) {
+        return file->size / frame_size;
+    }
+    while (offset < file->size) {
+        vx_uint32 pgm_width, pgm_height, maxval;
+        size_t header_size = parse_pgm_header(file, offset, &pgm_width, &pgm_height, &maxval);
+        if (header_size == 0 || pgm_width != width || pgm_height != height || (maxval > 255) != (bytes_per_pixel == 2) ||
+            offset + header_size + frame_size > file->size) {
+            fprintf(stderr, "Frame #%u of %s is not a %ux%u PGM image with %u bytes per pixel\\n",
+                    num_frames, filename, width, height, bytes_per_pixel);
+            break;
+        }
+        offset += header_size + frame_size;
+        num_frames++;
+    }
+    return num_frames;
+}
+
+/* Returns the pixel data of the next frame of an input file */
+static vx_uint8 *
+next_input_frame(mapped_file_t *file, size_t frame_size)
+{
+    vx_uint8 *frame;
+
+    if (file->pgm) {
+        vx_uint32 width, height, maxval;
+        file->offset += parse_pgm_header(file, file->offset, &width, &height, &maxval);
+    }
+    frame = file->data + file->offset;
+    file->offset += frame_size;
+    return frame;
+}
+
+/* Returns the pixel data of the next frame of an output file, after writing the PGM header if it is a PGM file */
+static vx_uint8 *
+next_output_frame(mapped_file_t *file, size_t frame_size, vx_uint32 width, vx_uint32 height, vx_uint32 bytes_per_pixel)
+{
+    vx_uint8 *frame;
+
+    if (file->pgm) {
+        /* The terminating null character is overwritten by the pixel data */
+        file->offset += sprintf((char *) file->data + file->offset, "P5\\n%u %u %u\\n", width, height, bytes_per_pixel == 2 ? 65535 : 255);
+    }
+    frame = file->data + file->offset;
+    file->offset += frame_size;
+    return frame;
+}
+
+/* Swaps the bytes of 16-bit pixels, since PGM files store them in big-endian order */
+static void
+swap_bytes_16(vx_uint8 *dst, const vx_uint8 *src, size_t size)
+{
+    size_t i;
+
+    for (i = 0; i + 1 < size; i += 2) {
+        vx_uint8 tmp = src[i];
+        dst[i] = src[i + 1];
+        dst[i + 1] = tmp;
+    }
+}
+
+static vx_image
+create_image_from_frame(vx_context context, vx_uint32 width, vx_uint32 height, vx_df_image format, vx_uint32 bytes_per_pixel, void *frame)
+{
+    vx_imagepatch_addressing_t addr;
+    void *ptrs[1];
+
+    addr.dim_x = width;
+    addr.dim_y = height;
+    addr.stride_x = bytes_per_pixel;
+    addr.stride_y = width * bytes_per_pixel;
+    addr.scale_x = VX_SCALE_UNITY;
+    addr.scale_y = VX_SCALE_UNITY;
+    addr.step_x = 1;
+    addr.step_y = 1;
+    ptrs[0] = frame;
+
+    return vxCreateImageFromHandle(context, format, &addr, ptrs, VX_MEMORY_TYPE_HOST);
+}
+
+/* Binds a new frame to the image, or reclaims the frame if frame is NULL, and returns the previous frame */
+static bool
+swap_frame(vx_image image, void *frame, void **previous_frame)
+{
+    void *ptrs[1];
+    void *previous_ptrs[1];
+
+    ptrs[0] = frame;
+    if (vxSwapImageHandle(image, frame != NULL ? ptrs : NULL, previous_ptrs, 1) != VX_SUCCESS) {
+        fprintf(stderr, "Failed to swap image handle\\n");
+        return false;
+    }
+    if (previous_frame != NULL) {
+        *previous_frame = previous_ptrs[0];
+    }
+    return true;
+}
+
+"""
+
+def parse(graphparser, header_filename):
+    """Writes the sequence test harness C-sourcefile
+
+    The harness maps multi-frame raw Y8/Y16 files and concatenated P5 PGM files with mmap, and binds each input frame
+    to the input images with vxSwapImageHandle, without copying (except 16-bit PGM frames, which are byte swapped).
+    The output images are bound in the same way to the frames of memory-mapped output files.
+    """
+
+    graphname = graphparser.graphname
+    num_input_imgs = len(graphparser.image_nodes.input_nodes_indexed_names)
+    num_output_imgs = len(graphparser.image_nodes.output_nodes_indexed_names)
+    userdata_string = "&userdata" if graphparser.userdata.has_userdata else "NULL"
+    image_sizes, defaults = graph_bench_file.get_image_size_strings(graphparser)
+
+    parsed_string = """\
+/* WARNING: DO NOT EDIT THIS FILE MANUALLY!
+            THIS FILE IS AUTO-GENERATED AND ANY CHANGES
+            WILL BE OVERWRITTEN IF FILE IS RE-GENERATED. */
+/**
+ *  @file   %s_harness.c
+ *  @author HAL 9000
+ *  @brief  Autogenerated standalone test harness that runs the OpenVX graph over frame sequences.
+ *
+ *  Generated %s
+ *
+ *  Usage: %s_harness width height in_0 ... in_%s out_0 ... out_%s [name=value ...]
+ *  where width and height is the size of images without a size in the graph, the files are raw Y8/Y16 frames,
+ *  or concatenated P5 PGM frames if the file name ends with .pgm, and name=value sets a userdata field.
+ *  All frames of the input files are processed, up to the number of frames of the shortest input file.
+ */
+
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <ctype.h>
+#include <time.h>
+#include <fcntl.h>
+#include <unistd.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
+#include <VX/vx.h>
+
+#include "%s"
+
+#define NUM_INPUTS %s
+#define NUM_OUTPUTS %s
+
+""" % (graphname, datetime.now().strftime('%c'), graphname, num_input_imgs - 1, num_output_imgs - 1, header_filename,
+       num_input_imgs, num_output_imgs)
+
+    parsed_string += helper_functions()
+
+    parsed_string += """\
+int main(int argc, char *argv[])
+{
+    vx_uint32 width, height, frame, num_frames = 0xffffffff;
+    mapped_file_t input_files[NUM_INPUTS];
+    mapped_file_t output_files[NUM_OUTPUTS];
+    vx_uint8 *swap_buffers[NUM_INPUTS];
+    vx_image input_images[NUM_INPUTS];
+    vx_image output_images[NUM_OUTPUTS];
+    struct timespec start, end;
+    double total_ms = 0.0;
+    void *previous_frame;
+    int i;
+
+    if (argc < 3 + NUM_INPUTS + NUM_OUTPUTS) {
+        fprintf(stderr, "Usage: %s width height in_0 ... in_%d out_0 ... out_%d [name=value ...]\\n",
+                argv[0], NUM_INPUTS - 1, NUM_OUTPUTS - 1);
+        return EXIT_FAILURE;
+    }
+    width = atoi(argv[1]);
+    height = atoi(argv[2]);
+    (void) width; /* To avoid compiler warning */
+    (void) height; /* To avoid compiler warning */
+
+"""
+    parsed_string += graph_bench_file.userdata_defaults(graphparser, defaults)
+    parsed_string += graph_bench_file.userdata_arguments(graphparser, "3 + NUM_INPUTS + NUM_OUTPUTS")
+    parsed_string += "\n"
+    parsed_string += image_tables(graphparser, 'input', image_sizes)
+    parsed_string += image_tables(graphparser, 'output', image_sizes)
+
+    parsed_string += """\
+
+    /* Map the input files, and find the number of frames to process */
+    for (i = 0; i < NUM_INPUTS; i++) {
+        vx_uint32 file_frames;
+        if (!map_file(argv[3 + i], 0, false, &input_files[i])) {
+            return EXIT_FAILURE;
+        }
+        file_frames = count_frames(argv[3 + i], &input_files[i], input_widths[i], input_heights[i], input_bytes_per_pixel[i]);
+        if (file_frames < num_frames) {
+            num_frames = file_frames;
+        }
+    }
+    if (num_frames == 0) {
+        fprintf(stderr, "No complete input frames\\n");
+        return EXIT_FAILURE;
+    }
+
+    /* Create and map the output files with room for all frames */
+    for (i = 0; i < NUM_OUTPUTS; i++) {
+        const char *filename = argv[3 + NUM_INPUTS + i];
+        size_t frame_size = (size_t) output_widths[i] * output_heights[i] * output_bytes_per_pixel[i];
+        size_t header_size = has_pgm_extension(filename) ?
+            snprintf(NULL, 0, "P5\\n%%u %%u %%u\\n", output_widths[i], output_heights[i], output_bytes_per_pixel[i] == 2 ? 65535 : 255) : 0;
+        if (!map_file(filename, num_frames * (header_size + frame_size), true, &output_files[i])) {
+            return EXIT_FAILURE;
+        }
+    }
+
+    vx_context context = vxCreateContext();
+    vx_graph graph = vxCreateGraph(context);
+
+    /* The I/O images are created from the first frames, 16-bit PGM input frames are byte swapped into a buffer */
+    for (i = 0; i < NUM_INPUTS; i++) {
+        size_t frame_size = (size_t) input_widths[i] * input_heights[i] * input_bytes_per_pixel[i];
+        void *data = next_input_frame(&input_files[i], frame_size);
+        swap_buffers[i] = NULL;
+        if (input_files[i].pgm && input_bytes_per_pixel[i] == 2) {
+            swap_buffers[i] = malloc(frame_size);
+            swap_bytes_16(swap_buffers[i], data, frame_size);
+            data = swap_buffers[i];
+        }
+        input_images[i] = create_image_from_frame(context, input_widths[i], input_heights[i], input_formats[i], input_bytes_per_pixel[i], data);
+    }
+    for (i = 0; i < NUM_OUTPUTS; i++) {
+        size_t frame_size = (size_t) output_widths[i] * output_heights[i] * output_bytes_per_pixel[i];
+        void *data = next_output_frame(&output_files[i], frame_size, output_widths[i], output_heights[i], output_bytes_per_pixel[i]);
+        output_images[i] = create_image_from_frame(context, output_widths[i], output_heights[i], output_formats[i], output_bytes_per_pixel[i], data);
+    }
+
+    if (!%s_create(context, graph, input_images, output_images, %s)) {
+        fprintf(stderr, "Failed to create graph\\n");
+        return EXIT_FAILURE;
+    }
+    if (vxVerifyGraph(graph) != VX_SUCCESS) {
+        fprintf(stderr, "Failed to verify graph\\n");
+        return EXIT_FAILURE;
+    }
+
+    for (frame = 0; frame < num_frames; frame++) {
+        if (frame > 0) {
+            /* Bind the next frames of the files to the I/O images */
+            for (i = 0; i < NUM_INPUTS; i++) {
+                size_t frame_size = (size_t) input_widths[i] * input_heights[i] * input_bytes_per_pixel[i];
+                void *data = next_input_frame(&input_files[i], frame_size);
+                if (swap_buffers[i] != NULL) {
+                    swap_frame(input_images[i], NULL, NULL);
+                    swap_bytes_16(swap_buffers[i], data, frame_size);
+                    data = swap_buffers[i];
+                }
+                swap_frame(input_images[i], data, NULL);
+            }
+            for (i = 0; i < NUM_OUTPUTS; i++) {
+                size_t frame_size = (size_t) output_widths[i] * output_heights[i] * output_bytes_per_pixel[i];
+                void *data = next_output_frame(&output_files[i], frame_size, output_widths[i], output_heights[i], output_bytes_per_pixel[i]);
+                if (swap_frame(output_images[i], data, &previous_frame) && output_files[i].pgm && output_bytes_per_pixel[i] == 2) {
+                    swap_bytes_16(previous_frame, previous_frame, frame_size);
+                }
+            }
+        }
+
+        clock_gettime(CLOCK_MONOTONIC, &start);
+        if (vxProcessGraph(graph) != VX_SUCCESS) {
+            fprintf(stderr, "Failed to process frame #%%u\\n", frame);
+            return EXIT_FAILURE;
+        }
+        clock_gettime(CLOCK_MONOTONIC, &end);
+        total_ms += elapsed_ms(&start, &end);
+    }
+
+    /* Reclaim the last output frames from the output images */
+    for (i = 0; i < NUM_OUTPUTS; i++) {
+        size_t frame_size = (size_t) output_widths[i] * output_heights[i] * output_bytes_per_pixel[i];
+        if (swap_frame(output_images[i], NULL, &previous_frame) && output_files[i].pgm && output_bytes_per_pixel[i] == 2) {
+            swap_bytes_16(previous_frame, previous_frame, frame_size);
+        }
+    }
+
+    printf("Processed %%u frames of graph %s in %%.3f ms (%%.2f fps)\\n", num_frames, total_ms, num_frames * 1000.0 / total_ms);
+
+    vxReleaseContext(&context);
+    for (i = 0; i < NUM_INPUTS; i++) {
+        munmap(input_files[i].data, input_files[i].size);
+        free(swap_buffers[i]);
+    }
+    for (i = 0; i < NUM_OUTPUTS; i++) {
+        munmap(output_files[i].data, output_files[i].size);
+    }
+
+    return EXIT_SUCCESS;
+}
+""" % (graphname, userdata_string, graphname)
+
+    return parsed_string
@@ -4,6 +4,8 @@
 """
 
 from datetime import datetime
+import graph_swap_io_images_function
+import graph_run_async_function
 
 
 def create_userdata_struct(graphparser):
@@ -52,32 +54,77 @@ def parse_strip_mode(graphparser):
 %s
 """ % (graphname_strip, datetime.now().strftime('%c'), graphname.upper(), graphname.upper(), create_userdata_struct(graphparser))
 
-    if graphparser.strip_io:
-        input_index_lists = graphparser.function_nodes.get_index_lists_for_io_function_nodes('input',
-                                                                                              graphparser.image_nodes)
-        num_input_nodes = len(set(input_index_lists.function_nodes_index_list))
-        output_index_lists = graphparser.function_nodes.get_index_lists_for_io_function_nodes('output',
-                                                                                              graphparser.image_nodes)
-        num_output_nodes = len(set(output_index_lists.function_nodes_index_list))
+    if graphparser.pipeline_depth > 0:
         parsed_string += """
-typedef struct {
-    vx_node input_nodes[%s];
-    vx_node output_nodes[%s];
-} %s_io_nodes_t;
-""" % (num_input_nodes, num_output_nodes, graphname_strip)
+#include <VX/vx_khr_pipelining.h>
+
+/* Number of buffers per input and output image */
+#define %s_PIPELINE_DEPTH %s
+
+/**
+ *  Call this to create the nodes etc.
+ *  The graph is created with the first buffer of each I/O image, and all buffers are
+ *  registered to the graph parameters of the I/O images for pipelined execution.
+ */
+bool
+%s_create(vx_context context, vx_graph graph_skeleton, vx_image input_image_buffers[%s_PIPELINE_DEPTH][%s], vx_image output_image_buffers[%s_PIPELINE_DEPTH][%s], void *userdata);
+""" % (graphname.upper(), graphparser.pipeline_depth, graphname, graphname.upper(), num_input_imgs, graphname.upper(), num_output_imgs)
 
         parsed_string += """
 /**
+ *  Enqueues one buffer of each I/O image for processing.
+ */
+bool
+%s_enqueue_imgs(vx_graph graph, vx_image input_images[%s], vx_image output_images[%s]);
+
+/**
+ *  Dequeues one processed buffer of each I/O image, waiting for the processing to finish.
+ */
+bool
+%s_dequeue_imgs(vx_graph graph, vx_image input_images[%s], vx_image output_images[%s]);
+""" % (graphname_strip, num_input_imgs, num_output_imgs, graphname_strip, num_input_imgs, num_output_imgs)
+    elif graphparser.strip_io:
+        parsed_string += """
+/**
  *  Call this to create the nodes etc.
+ *  The I/O images are added as graph parameters after the dynamic parameters.
  */
 bool
-%s_create(vx_context context, vx_graph graph_skeleton, vx_image input_images[%s], vx_image output_images[%s], void *userdata, %s_io_nodes_t *io_nodes);
-""" % (graphname, num_input_imgs, num_output_imgs, graphname_strip)
+%s_create(vx_context context, vx_graph graph_skeleton, vx_image input_images[%s], vx_image output_images[%s], void *userdata);
+""" % (graphname, num_input_imgs, num_output_imgs)
 
         parsed_string += """
+/**
+ *  Sets new I/O images on the graph parameters of the graph.
+ */
+bool
+%s_io_set_imgs(vx_graph graph, vx_image input_images[%s], vx_image output_images[%s]);
+""" % (graphname_strip, num_input_imgs, num_output_imgs)
+
+        if graphparser.run_async:
+            parsed_string += graph_run_async_function.async_struct(graphparser)
+            parsed_string += """
+/**
+ *  Initializes the asynchronous run loop with two sets of I/O images for a verified graph.
+ */
+void
+%s_async_init(%s_async_t *async, vx_graph graph, vx_image input_images[2][%s], vx_image output_images[2][%s]);
+
+/**
+ *  Waits for the previous frame (if any), then schedules the graph on the next set of I/O images and returns
+ *  without waiting. done_set is set to the set of the finished frame, or -1 on the first call.
+ *  While the graph runs, the caller reads the outputs and fills the inputs of set 1 - async->current.
+ */
 bool
-%s_io_set_imgs(vx_image input_images[%s], vx_image output_images[%s], %s_io_nodes_t *io_nodes);
-""" % (graphname_strip, num_input_imgs, num_output_imgs, graphname_strip)
+%s_run_async(%s_async_t *async, int *done_set);
+
+/**
+ *  Waits for the last scheduled frame. done_set is set to its set, or -1 if no frame was scheduled.
+ */
+bool
+%s_async_finish(%s_async_t *async, int *done_set);
+""" % (graphname_strip, graphname_strip, num_input_imgs, num_output_imgs,
+       graphname_strip, graphname_strip, graphname_strip, graphname_strip)
     else:
         parsed_string += """
 /**
@@ -87,6 +134,159 @@ bool
 %s_create(vx_context context, vx_graph graph_skeleton, vx_image input_images[%s], vx_image output_images[%s], void *userdata);
 """ % (graphname, num_input_imgs, num_output_imgs)
 
+    if graphparser.instances > 1:
+        parsed_string += """
+/* Number of graph instances */
+#define %s_INSTANCES %s
+
+/**
+ *  Creates the nodes of all graph instances in the same context.
+ *  Uniform images and parameter objects of non-dynamic nodes are shared by the instances.
+ *  Each graph must be verified with vxVerifyGraph before it is processed.
+ */
+bool
+%s_create_instances(vx_context context, vx_graph graphs[%s_INSTANCES], vx_image instance_input_images[%s_INSTANCES][%s], vx_image instance_output_images[%s_INSTANCES][%s], void *userdata);
+
+/**
+ *  Schedules all graph instances with vxScheduleGraph and waits for them to finish.
+ */
+bool
+%s_process_instances(vx_graph graphs[%s_INSTANCES]);
+""" % (graphname.upper(), graphparser.instances,
+       graphname, graphname.upper(), graphname.upper(), num_input_imgs, graphname.upper(), num_output_imgs,
+       graphname, graphname.upper())
+
+    if graphparser.tiles > 1:
+        if graphparser.graph_tiling.tileable:
+            parsed_string += """
+/* Number of tiles, i.e. horizontal bands of the images that are processed in parallel */
+#define %s_TILES %s
+/* Number of extra rows above and below each tile, in rows of the input images */
+#define %s_TILE_HALO %s
+/* The image height and width must be multiples of the alignment, the tile borders are multiples of it */
+#define %s_TILE_ALIGNMENT %s
+""" % (graphname.upper(), graphparser.tiles, graphname.upper(), graphparser.graph_tiling.halo,
+       graphname.upper(), graphparser.graph_tiling.alignment)
+        else:
+            parsed_string += """
+/* The graph can not be tiled (%s), so there is only one tile with the whole images */
+#define %s_TILES 1
+""" % (graphparser.graph_tiling.reason, graphname.upper())
+
+        parsed_string += """
+/**
+ *  Creates one graph per tile, processing ROIs of the input and output images.
+ *  Set the dynamic parameters on each tile graph, and verify each graph with vxVerifyGraph before processing.
+ */
+bool
+%s_create_tiles(vx_context context, vx_graph tile_graphs[%s_TILES], vx_image input_images[%s], vx_image output_images[%s], void *userdata);
+
+/**
+ *  Processes the tile graphs in one thread each, and waits for all tiles to finish.
+ */
+bool
+%s_process_tiles(vx_graph tile_graphs[%s_TILES]);
+""" % (graphname, graphname.upper(), num_input_imgs, num_output_imgs, graphname, graphname.upper())
+
+    if graphparser.import_export:
+        parsed_string += """
+/*
+ *  %s_IMPORT_EXPORT selects whether the import/export extension (vx_khr_ix) is used,
+ *  by default it is used if the compiler finds VX/vx_khr_ix.h. Without the extension,
+ *  %s_load_graph always creates and verifies the graph and %s_export_graph fails.
+ */
+#ifndef %s_IMPORT_EXPORT
+#if defined(__has_include)
+#if __has_include(<VX/vx_khr_ix.h>)
+#define %s_IMPORT_EXPORT 1
+#endif
+#endif
+#endif
+#if %s_IMPORT_EXPORT
+#include <VX/vx_khr_ix.h>
+#else
+typedef struct _vx_import *vx_import;
+#endif
+
+/**
+ *  Exports the verified graph with its I/O images to a blob with the import/export extension.
+ *  Store the blob, then release it with vxReleaseExportedMemory.
+ */
+bool
+%s_export_graph(vx_context context, vx_graph graph, vx_image input_images[%s], vx_image output_images[%s],
+                const vx_uint8 **blob, vx_size *blob_size);
+
+/**
+ *  Imports the graph from a blob exported by %s_export_graph, with new I/O images of the same sizes and formats.
+ *  Falls back to creating and verifying the graph if blob is NULL, the extension is unavailable or the import fails,
+ *  and then sets import to NULL. The blob must be kept until the import is released.
+ *  Release the graph, then the import (if not NULL) with vxReleaseImport.
+ */
+bool
+%s_load_graph(vx_context context, const vx_uint8 *blob, vx_size blob_size, vx_image input_images[%s], vx_image output_images[%s],
+              void *userdata, vx_graph *graph, vx_import *import);
+
+/**
+ *  Processes the graph once, so that the first real frame is not slowed down by lazy initialization.
+ *  The dummy frame is whatever the I/O images bound to the graph contain, their content does not matter,
+ *  but the output images are overwritten, so call it before the first real frame.
+ */
+bool
+%s_warmup(vx_graph graph);
+""" % (graphname_strip.upper(), graphname_strip, graphname_strip,
+       graphname_strip.upper(), graphname_strip.upper(), graphname_strip.upper(),
+       graphname_strip, num_input_imgs, num_output_imgs, graphname_strip,
+       graphname_strip, num_input_imgs, num_output_imgs, graphname_strip)
+
+    if graphparser.perf_report:
+        parsed_string += """
+/**
+ *  Prints the performance of each function node, keyed by its graphml node id, and of the graph as CSV,
+ *  with the number of runs and the average, minimum and maximum time in nanoseconds.
+ *  Uses the function nodes kept when the graph was created. Graphs must not be created
+ *  concurrently from several threads, since the kept function nodes are listed per graph.
+ */
+bool
+%s_perf_report(vx_graph graph);
+
+/**
+ *  Releases the function nodes kept for the performance report of graph, call it before releasing the graph.
+ */
+void
+%s_perf_release_nodes(vx_graph graph);
+""" % (graphname, graphname)
+
+    if graphparser.zero_copy:
+        max_planes = graph_swap_io_images_function.get_max_planes(graphparser)
+        parsed_string += """
+/* Sizes of the input and output images, for allocating buffers for %s_create_io_images */
+%s
+/* Maximum number of planes of the input and output images */
+#define %s_MAX_PLANES %s
+
+/**
+ *  Creates the input and output images from host memory, with a pointer and a row stride in bytes
+ *  for each image plane. Images without a size in the graph get the size width x height.
+ *  The strides can not be changed after the images are created.
+ */
+bool
+%s_create_io_images(vx_context context, vx_uint32 width, vx_uint32 height, void *userdata,
+                    void *input_ptrs[%s][%s_MAX_PLANES], vx_int32 input_strides[%s][%s_MAX_PLANES],
+                    void *output_ptrs[%s][%s_MAX_PLANES], vx_int32 output_strides[%s][%s_MAX_PLANES],
+                    vx_image input_images[%s], vx_image output_images[%s]);
+
+/**
+ *  Binds new host memory to the input and output images by swapping the image handles,
+ *  without copying image data or changing the graph. Call it when the graph is not processing.
+ */
+bool
+%s_swap_io_images(vx_image input_images[%s], vx_image output_images[%s],
+                  void *input_ptrs[%s][%s_MAX_PLANES], void *output_ptrs[%s][%s_MAX_PLANES]);
+""" % (graphname_strip, graph_swap_io_images_function.size_constants(graphparser), graphname.upper(), max_planes,
+       graphname_strip, num_input_imgs, graphname.upper(), num_input_imgs, graphname.upper(),
+       num_output_imgs, graphname.upper(), num_output_imgs, graphname.upper(), num_input_imgs, num_output_imgs,
+       graphname_strip, num_input_imgs, num_output_imgs, num_input_imgs, graphname.upper(), num_output_imgs, graphname.upper())
+
     parsed_string += "#endif /* " + graphname.upper() + "_H */\n"
 
     return parsed_string
@@ -0,0 +1,164 @@
+"""Module for generating the graph export, import and warm-up functions for the graph definition C-sourcefile in strip mode
+
+"""
+
+def parse(graphparser):
+    """Writes the C-code for the functions that export a verified graph to a blob, load the graph from a blob,
+    and process a warm-up frame
+
+    The graph is exported with the OpenVX import/export extension (vx_khr_ix) together with the I/O images,
+    which are created by the application both when exporting and when importing.
+    Loading falls back to creating and verifying the graph if the extension is unavailable, there is no blob,
+    or the import fails. The extension is only used if <GRAPH>_STRIP_IMPORT_EXPORT is set (see graph_headerfile),
+    so the generated code also builds with OpenVX headers without VX/vx_khr_ix.h.
+    """
+
+    graphname = graphparser.graphname
+    graphname_strip = graphname + "_strip"
+    num_input_imgs = len(graphparser.image_nodes.input_nodes_indexed_names)
+    num_output_imgs = len(graphparser.image_nodes.output_nodes_indexed_names)
+    num_refs = 1 + num_input_imgs + num_output_imgs
+    import_export_macro = graphname_strip.upper() + "_IMPORT_EXPORT"
+
+    parsed_string = """\
+
+#if %s
+/* Sets the references of the graph and its I/O images, in the order of the blob */
+static void
+%s_ix_refs(vx_reference refs[%s], vx_enum uses[%s], vx_graph graph, vx_image input_images[%s], vx_image output_images[%s])
+{
+    int i;
+
+    refs[0] = (vx_reference) graph;
+    uses[0] = VX_IX_USE_EXPORT_VALUES;
+    for (i = 0; i < %s; i++) {
+        refs[1 + i] = (vx_reference) input_images[i];
+        uses[1 + i] = VX_IX_USE_APPLICATION_CREATE;
+    }
+    for (i = 0; i < %s; i++) {
+        refs[1 + %s + i] = (vx_reference) output_images[i];
+        uses[1 + %s + i] = VX_IX_USE_APPLICATION_CREATE;
+    }
+}
+#endif
+
+static bool
+%s_has_import_export(vx_context context)
+{
+#if %s
+    vx_size size = 0;
+    vx_char *extensions;
+    bool found = false;
+
+    if (vxQueryContext(context, VX_CONTEXT_EXTENSIONS_SIZE, &size, sizeof(size)) != VX_SUCCESS || size == 0) {
+        return false;
+    }
+    extensions = malloc(size);
+    if (extensions != NULL && vxQueryContext(context, VX_CONTEXT_EXTENSIONS, extensions, size) == VX_SUCCESS) {
+        found = (strstr(extensions, OPENVX_KHR_IX) != NULL);
+    }
+    free(extensions);
+
+    return found;
+#else
+    (void) context;
+    return false;
+#endif
+}
+
+bool
+%s_export_graph(vx_context context, vx_graph graph, vx_image input_images[%s], vx_image output_images[%s],
+                const vx_uint8 **blob, vx_size *blob_size)
+{
+#if %s
+    vx_reference refs[%s];
+    vx_enum uses[%s];
+
+    if (!%s_has_import_export(context)) {
+        fprintf(stderr, "The import/export extension is not available\\n");
+        return false;
+    }
+    %s_ix_refs(refs, uses, graph, input_images, output_images);
+    if (vxExportObjectsToMemory(context, %s, refs, uses, blob, blob_size) != VX_SUCCESS) {
+        fprintf(stderr, "Failed to export graph\\n");
+        return false;
+    }
+
+    return true;
+#else
+    (void) context;
+    (void) graph;
+    (void) input_images;
+    (void) output_images;
+    (void) blob;
+    (void) blob_size;
+    fprintf(stderr, "The import/export extension is not available\\n");
+    return false;
+#endif
+}
+
+bool
+%s_load_graph(vx_context context, const vx_uint8 *blob, vx_size blob_size, vx_image input_images[%s], vx_image output_images[%s],
+              void *userdata, vx_graph *graph, vx_import *import)
+{
+    *graph = NULL;
+    *import = NULL;
+
+#if %s
+    if (blob != NULL && blob_size > 0 && %s_has_import_export(context)) {
+        vx_reference refs[%s];
+        vx_enum uses[%s];
+
+        %s_ix_refs(refs, uses, NULL, input_images, output_images);
+        *import = vxImportObjectsFromMemory(context, %s, refs, uses, blob, blob_size);
+        if (vxGetStatus((vx_reference) *import) == VX_SUCCESS && refs[0] != NULL) {
+            *graph = (vx_graph) refs[0];
+            return true;
+        }
+        fprintf(stderr, "Failed to import graph, creating it instead\\n");
+        if (vxGetStatus((vx_reference) *import) == VX_SUCCESS) {
+            vxReleaseImport(import);
+        }
+        *import = NULL;
+    }
+#else
+    (void) blob;
+    (void) blob_size;
+#endif
+
+    /* Regular create path */
+    *graph = vxCreateGraph(context);
+    if (!%s_create(context, *graph, input_images, output_images, userdata)) {
+        fprintf(stderr, "Failed to create graph\\n");
+        return false;
+    }
+    if (vxVerifyGraph(*graph) != VX_SUCCESS) {
+        fprintf(stderr, "Failed to verify graph\\n");
+        return false;
+    }
+
+    return true;
+}
+
+bool
+%s_warmup(vx_graph graph)
+{
+    /* The dummy frame is the content of the bound I/O images, only the lazy initialization of the implementation matters */
+    if (vxProcessGraph(graph) != VX_SUCCESS) {
+        fprintf(stderr, "Failed to process warm-up frame\\n");
+        return false;
+    }
+
+    return true;
+}
+""" % (import_export_macro, graphname_strip, num_refs, num_refs, num_input_imgs, num_output_imgs,
+       num_input_imgs, num_output_imgs, num_input_imgs, num_input_imgs,
+       graphname_strip, import_export_macro,
+       graphname_strip, num_input_imgs, num_output_imgs, import_export_macro, num_refs, num_refs, graphname_strip,
+       graphname_strip, num_refs,
+       graphname_strip, num_input_imgs, num_output_imgs, import_export_macro, graphname_strip, num_refs, num_refs,
+       graphname_strip, num_refs,
+       graphname,
+       graphname_strip)
+
+    return parsed_string
@@ -0,0 +1,153 @@
+"""Module for generating the performance report functions for the graph definition C-sourcefile in strip mode
+
+"""
+
+def declare_nodes(graphparser):
+    """Writes the declaration of the local array that keeps the function node handles during graph creation."""
+    return "    vx_node perf_nodes[" + str(len(graphparser.get_indexed_names('function_nodes'))) + "];\n"
+
+def keep_node(graphparser, idx):
+    """Writes the C-code that keeps the handle of function node number idx, instead of releasing it."""
+    return "    perf_nodes[" + str(idx) + "] = function_node;\n"
+
+def keep_nodes(graphparser):
+    """Writes the C-code that stores the kept function node handles with the created graph."""
+    return "    " + graphparser.graphname + "_perf_keep_nodes(graph_skeleton, perf_nodes);\n"
+
+def enable_performance():
+    """Writes the C-code that enables the performance counters of the context, before any processing."""
+    return "    vxDirective((vx_reference) context, VX_DIRECTIVE_ENABLE_PERFORMANCE);\n"
+
+def definitions(graphparser):
+    """Writes the list of the function node handles of each created graph, with the functions that add to it
+    and look up a graph in it, and the static arrays with the graphml node ids and types of the function nodes.
+
+    The handles are kept per graph, so that several graphs can be created and reported on.
+    """
+    graphname = graphparser.graphname
+    function_nodes = graphparser.get_indexed_names('function_nodes')
+    num_nodes = len(function_nodes)
+    node_ids = ", ".join(["\"" + node.attributes["id"].value + "\"" for node in function_nodes])
+    node_types = ", ".join(["\"" + graphparser.function_nodes.get_function_node_name(node) + "\"" for node in function_nodes])
+
+    parsed_string = """\
+/* The function nodes of each created graph, released by %s_perf_release_nodes */
+typedef struct %s_perf_nodes {
+    vx_graph graph;
+    vx_node nodes[%s];
+    struct %s_perf_nodes *next;
+} %s_perf_nodes_t;
+static %s_perf_nodes_t *%s_perf_nodes_list = NULL;
+/* The graphml node id and the type of each function node */
+static const char *%s_perf_node_ids[%s] = {%s};
+static const char *%s_perf_node_types[%s] = {%s};
+
+/* Keeps the function nodes of graph, or releases them if there is no memory for keeping them */
+static void
+%s_perf_keep_nodes(vx_graph graph, vx_node nodes[%s])
+{
+    %s_perf_nodes_t *perf_nodes = malloc(sizeof(*perf_nodes));
+    int node;
+
+    if (perf_nodes == NULL) {
+        fprintf(stderr, "Failed to keep the function nodes for the performance report\\n");
+        for (node = 0; node < %s; node++) {
+            vxReleaseNode(&nodes[node]);
+        }
+        return;
+    }
+    perf_nodes->graph = graph;
+    for (node = 0; node < %s; node++) {
+        perf_nodes->nodes[node] = nodes[node];
+    }
+    perf_nodes->next = %s_perf_nodes_list;
+    %s_perf_nodes_list = perf_nodes;
+}
+
+/* Returns the link that points to the kept function nodes of graph, or to NULL if there are none */
+static %s_perf_nodes_t **
+%s_perf_find_nodes(vx_graph graph)
+{
+    %s_perf_nodes_t **link = &%s_perf_nodes_list;
+
+    while (*link != NULL && (*link)->graph != graph) {
+        link = &(*link)->next;
+    }
+    return link;
+}
+
+""" % (graphname, graphname, num_nodes, graphname, graphname, graphname, graphname,
+       graphname, num_nodes, node_ids,
+       graphname, num_nodes, node_types,
+       graphname, num_nodes, graphname, num_nodes, num_nodes, graphname, graphname,
+       graphname, graphname, graphname, graphname)
+
+    return parsed_string
+
+def parse(graphparser):
+    """Writes the C-code for the functions that print the performance of each function node and of the graph
+    as CSV, and that release the kept function nodes
+
+    The times are given in nanoseconds, as measured by the OpenVX implementation.
+    """
+    graphname = graphparser.graphname
+    num_nodes = len(graphparser.get_indexed_names('function_nodes'))
+
+    parsed_string = """\
+
+bool
+%s_perf_report(vx_graph graph)
+{
+    %s_perf_nodes_t *perf_nodes = *%s_perf_find_nodes(graph);
+    int num_errors = 0;
+    vx_perf_t perf;
+    int node;
+
+    if (perf_nodes == NULL) {
+        fprintf(stderr, "No function nodes are kept for the graph\\n");
+        return false;
+    }
+    printf("node_id,type,num,avg_ns,min_ns,max_ns\\n");
+    for (node = 0; node < %s; node++) {
+        if (vxQueryNode(perf_nodes->nodes[node], VX_NODE_PERFORMANCE, &perf, sizeof(perf)) != VX_SUCCESS) {
+            fprintf(stderr, "Failed to query performance of node %%s\\n", %s_perf_node_ids[node]);
+            num_errors++;
+            continue;
+        }
+        printf("%%s,%%s,%%llu,%%llu,%%llu,%%llu\\n", %s_perf_node_ids[node], %s_perf_node_types[node],
+               (unsigned long long) perf.num, (unsigned long long) perf.avg,
+               (unsigned long long) perf.min, (unsigned long long) perf.max);
+    }
+
+    if (vxQueryGraph(graph, VX_GRAPH_PERFORMANCE, &perf, sizeof(perf)) != VX_SUCCESS) {
+        fprintf(stderr, "Failed to query performance of graph\\n");
+        num_errors++;
+    } else {
+        printf("graph,%s,%%llu,%%llu,%%llu,%%llu\\n",
+               (unsigned long long) perf.num, (unsigned long long) perf.avg,
+               (unsigned long long) perf.min, (unsigned long long) perf.max);
+    }
+
+    return (num_errors == 0);
+}
+
+void
+%s_perf_release_nodes(vx_graph graph)
+{
+    %s_perf_nodes_t **link = %s_perf_find_nodes(graph);
+    %s_perf_nodes_t *perf_nodes = *link;
+    int node;
+
+    if (perf_nodes == NULL) {
+        return;
+    }
+    for (node = 0; node < %s; node++) {
+        vxReleaseNode(&perf_nodes->nodes[node]);
+    }
+    *link = perf_nodes->next;
+    free(perf_nodes);
+}
+""" % (graphname, graphname, graphname, num_nodes, graphname, graphname, graphname, graphname,
+       graphname, graphname, graphname, graphname, num_nodes)
+
+    return parsed_string
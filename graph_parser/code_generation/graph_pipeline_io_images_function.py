@@ -0,0 +1,74 @@
+"""Module for generating the enqueue and dequeue functions for pipelined graphs in the graph definition C-sourcefile
+
+"""
+
+def parse(graphparser):
+    """Writes the C-code for the functions that enqueue and dequeue I/O images of a pipelined graph
+
+    The I/O images are graph parameters, following the graph parameters of the dynamic nodes,
+    with the input images first. I/O images with several connections are also enqueued
+    on their extra graph parameters, see GraphParser.get_io_graph_parameters.
+    """
+
+    graphname_strip = graphparser.graphname + "_strip"
+    num_input_imgs = len(graphparser.image_nodes.input_nodes_indexed_names)
+    num_output_imgs = len(graphparser.image_nodes.output_nodes_indexed_names)
+    first_io_parameter_index = len(graphparser.get_dynamic_function_nodes_info())
+    # (io_string, images_string, index of the image, graph parameter index) for each I/O graph parameter
+    io_images = []
+    for io_graph_index, (io_string, node_index, parameter_index, io_index) in enumerate(graphparser.get_io_graph_parameters()):
+        if io_string == 'input':
+            io_images.append((io_string, 'input_images', io_index, first_io_parameter_index + io_graph_index))
+        else:
+            io_images.append((io_string, 'output_images', io_index - num_input_imgs, first_io_parameter_index + io_graph_index))
+
+    parsed_string = """\
+
+bool
+%s_enqueue_imgs(vx_graph graph, vx_image input_images[%s], vx_image output_images[%s])
+{
+    int num_errors = 0;
+    vx_status status;
+
+""" % (graphname_strip, num_input_imgs, num_output_imgs)
+
+    for io_string, images_string, index, parameter_index in io_images:
+        parsed_string += "    status = vxGraphParameterEnqueueReadyRef(graph, " + str(parameter_index) + \
+                         ", (vx_reference *) &" + images_string + "[" + str(index) + "], 1);"
+        parsed_string += " if (status != VX_SUCCESS) {"
+        parsed_string += " fprintf(stderr, \"Failed to enqueue " + io_string + " image #" + str(index) + "\\n\");"
+        parsed_string += " num_errors++;"
+        parsed_string += " }\n"
+
+    parsed_string += """\
+
+    return (num_errors == 0);
+}
+
+bool
+%s_dequeue_imgs(vx_graph graph, vx_image input_images[%s], vx_image output_images[%s])
+{
+    int num_errors = 0;
+    vx_uint32 num_refs;
+    vx_status status;
+
+""" % (graphname_strip, num_input_imgs, num_output_imgs)
+
+    # The output images are dequeued first, since they are done last.
+    # The extra graph parameters of an I/O image give back the same buffer as its first graph parameter.
+    for io_string, images_string, index, parameter_index in [io_image for io_image in io_images if io_image[0] == 'output'] + \
+                                                            [io_image for io_image in io_images if io_image[0] == 'input']:
+        parsed_string += "    status = vxGraphParameterDequeueDoneRef(graph, " + str(parameter_index) + \
+                         ", (vx_reference *) &" + images_string + "[" + str(index) + "], 1, &num_refs);"
+        parsed_string += " if (status != VX_SUCCESS || num_refs != 1) {"
+        parsed_string += " fprintf(stderr, \"Failed to dequeue " + io_string + " image #" + str(index) + "\\n\");"
+        parsed_string += " num_errors++;"
+        parsed_string += " }\n"
+
+    parsed_string += """\
+
+    return (num_errors == 0);
+}
+"""
+
+    return parsed_string
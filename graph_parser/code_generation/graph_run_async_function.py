@@ -0,0 +1,91 @@
+"""Module for generating the double-buffered asynchronous run functions for the graph definition C-sourcefile
+
+"""
+
+def async_struct(graphparser):
+    """Writes the struct with the two sets of I/O images and the state of the asynchronous run loop."""
+    num_input_imgs = len(graphparser.image_nodes.input_nodes_indexed_names)
+    num_output_imgs = len(graphparser.image_nodes.output_nodes_indexed_names)
+
+    parsed_string = """
+/* State of the double-buffered asynchronous run loop */
+typedef struct {
+    vx_graph graph;
+    vx_image input_images[2][%s];
+    vx_image output_images[2][%s];
+    int current; /* The set of I/O images that is processed, or is processed next */
+    bool running;
+} %s_strip_async_t;
+""" % (num_input_imgs, num_output_imgs, graphparser.graphname)
+
+    return parsed_string
+
+def parse(graphparser):
+    """Writes the C-code for the functions that run the graph asynchronously on two alternating sets of I/O images
+
+    Each call to the run function waits for the previous frame, sets the I/O images of the other set
+    with the strip_io set function and schedules the graph with vxScheduleGraph, so the caller can read the
+    outputs and fill the inputs of the finished set while the graph processes the next frame.
+    """
+
+    graphname_strip = graphparser.graphname + "_strip"
+    num_input_imgs = len(graphparser.image_nodes.input_nodes_indexed_names)
+    num_output_imgs = len(graphparser.image_nodes.output_nodes_indexed_names)
+
+    parsed_string = """\
+
+void
+%s_async_init(%s_async_t *async, vx_graph graph, vx_image input_images[2][%s], vx_image output_images[2][%s])
+{
+    int set, i;
+
+    async->graph = graph;
+    for (set = 0; set < 2; set++) {
+        for (i = 0; i < %s; i++) {
+            async->input_images[set][i] = input_images[set][i];
+        }
+        for (i = 0; i < %s; i++) {
+            async->output_images[set][i] = output_images[set][i];
+        }
+    }
+    async->current = 0;
+    async->running = false;
+}
+
+bool
+%s_async_finish(%s_async_t *async, int *done_set)
+{
+    bool success = true;
+
+    *done_set = -1;
+    if (async->running) {
+        if (vxWaitGraph(async->graph) != VX_SUCCESS) { fprintf(stderr, "Failed to process graph\\n"); success = false; }
+        *done_set = async->current;
+        async->current = 1 - async->current;
+        async->running = false;
+    }
+
+    return success;
+}
+
+bool
+%s_run_async(%s_async_t *async, int *done_set)
+{
+    bool success = %s_async_finish(async, done_set);
+
+    if (!%s_io_set_imgs(async->graph, async->input_images[async->current], async->output_images[async->current])) {
+        return false;
+    }
+    if (vxScheduleGraph(async->graph) != VX_SUCCESS) {
+        fprintf(stderr, "Failed to schedule graph\\n");
+        return false;
+    }
+    async->running = true;
+
+    return success;
+}
+""" % (graphname_strip, graphname_strip, num_input_imgs, num_output_imgs, num_input_imgs, num_output_imgs,
+       graphname_strip, graphname_strip,
+       graphname_strip, graphname_strip, graphname_strip, graphname_strip)
+
+    return parsed_string
@@ -3,6 +3,9 @@
 """
 
 import graph_set_io_images_function_strip_io
+import graph_pipeline_io_images_function
+import graph_swap_io_images_function
+import graph_run_async_function
 
 def parse(graphparser):
     """Writes the graph set io function C-code
@@ -14,11 +17,20 @@ def parse(graphparser):
 
     # Do not create this function if strip_mode since there is no graphmanager
     if graphparser.strip_mode:
+        parsed_string = ""
+        # Pipelined graphs get their I/O images by enqueueing them as graph parameters
+        if graphparser.pipeline_depth > 0:
+            parsed_string += graph_pipeline_io_images_function.parse(graphparser)
         # Unless we run strip_io mode
-        if graphparser.strip_io:
-            return graph_set_io_images_function_strip_io.parse(graphparser)
-        else:
-            return ""
+        elif graphparser.strip_io:
+            parsed_string += graph_set_io_images_function_strip_io.parse(graphparser)
+            # The asynchronous run loop sets the I/O images with the strip_io set function
+            if graphparser.run_async:
+                parsed_string += graph_run_async_function.parse(graphparser)
+        # Zero-copy I/O images are created from host memory and get new frames by swapping handles
+        if graphparser.zero_copy:
+            parsed_string += graph_swap_io_images_function.parse(graphparser)
+        return parsed_string
 
     # TODO:: VX_DF_IMAGE_U8 should be parsed in the 2 calls to vxCreateImageFromHandle
     parsed_string = """\
@@ -28,10 +28,23 @@ def parse_strip_mode(graphparser):
 
 """ % (graphname_strip, datetime.now().strftime('%c'), graphname_strip)
 
-    if graphparser.strip_io:
+    if graphparser.strip_io or graphparser.pipeline_depth > 0 or graphparser.zero_copy or graphparser.instances > 1 or \
+       graphparser.tiles > 1 or graphparser.perf_report or \
+       graphparser.import_export:
         parsed_string += """\
 #include <stdio.h>
 
+"""
+    if graphparser.import_export or graphparser.perf_report:
+        parsed_string += """\
+#include <stdlib.h>
+#include <string.h>
+
+"""
+    if graphparser.tiles > 1 and graphparser.graph_tiling.tileable:
+        parsed_string += """\
+#include <pthread.h>
+
 """
     return parsed_string
 
@@ -0,0 +1,189 @@
+"""Module for generating the zero-copy I/O image functions for the graph definition C-sourcefile in strip mode
+
+"""
+
+import graph_create_function_strip
+
+# Planes of each image format as a list of (bytes per pixel, horizontal subsampling, vertical subsampling)
+IMAGE_PLANES = {'U8'   : [(1, 1, 1)],
+                'U16'  : [(2, 1, 1)],
+                'S16'  : [(2, 1, 1)],
+                'U32'  : [(4, 1, 1)],
+                'S32'  : [(4, 1, 1)],
+                'RGB'  : [(3, 1, 1)],
+                'RGBX' : [(4, 1, 1)],
+                'UYVY' : [(2, 1, 1)],
+                'YUYV' : [(2, 1, 1)],
+                'NV12' : [(1, 1, 1), (2, 2, 2)],
+                'NV21' : [(1, 1, 1), (2, 2, 2)],
+                'IYUV' : [(1, 1, 1), (1, 2, 2), (1, 2, 2)],
+                'YUV4' : [(1, 1, 1), (1, 1, 1), (1, 1, 1)]}
+
+def get_io_image_format(graphparser, image_id):
+    """Returns the image format of an input or output image, e.g. 'U8'.
+
+    Uses the image format given in the graph, since input and output images always have an explicit format.
+    """
+    return graphparser.get_value_for_attribute(image_id, 'vx_df_image_e')[1].replace("VX_DF_IMAGE_", "")
+
+def get_image_planes(graphparser, image_id):
+    """Returns the planes of the image, see IMAGE_PLANES."""
+    image_format = get_io_image_format(graphparser, image_id)
+    if image_format not in IMAGE_PLANES:
+        raise NameError('Image format {} of image {} is not supported for zero-copy I/O.'.format(image_format, image_id))
+    return IMAGE_PLANES[image_format]
+
+def get_max_planes(graphparser):
+    """Returns the maximum number of planes of the input and output images."""
+    return max([len(get_image_planes(graphparser, image_id)) for image_id in
+                graphparser.image_nodes.input_nodes_indexed_names + graphparser.image_nodes.output_nodes_indexed_names] + [1])
+
+def get_constant_prefix(graphparser, io_string, index):
+    """Returns the prefix of the size constants of an input or output image, e.g. GRAPH_INPUT_0."""
+    return "{}_{}_{}".format(graphparser.graphname.upper(), io_string.upper(), index)
+
+def get_io_image_size(graphparser, image_id):
+    """Returns the width and height of an input or output image if they are given as numbers in the graph,
+    otherwise None for each, since the size is then only known at runtime."""
+    sizes = []
+    for attribute in ['width', 'height']:
+        (value_from_opts, value) = graphparser.get_value_for_attribute(image_id, attribute)
+        if value_from_opts or int(value) == 0:
+            sizes.append(None)
+        else:
+            sizes.append(int(value))
+    return sizes[0], sizes[1]
+
+def size_constants(graphparser):
+    """Writes the compile-time size constants of the input and output images with sizes given as numbers,
+    i.e. the width, height, format and the row stride and size in bytes of each plane of a packed buffer."""
+    parsed_string = ""
+
+    for io_string in ['input', 'output']:
+        for index, image_id in enumerate(graphparser.get_indexed_names(io_string + '_image_nodes')):
+            prefix = get_constant_prefix(graphparser, io_string, index)
+            width, height = get_io_image_size(graphparser, image_id)
+            if width is None or height is None:
+                parsed_string += "/* The size of {} image #{} is given at runtime */\n".format(io_string, index)
+                continue
+            parsed_string += "#define {}_WIDTH {}\n".format(prefix, width)
+            parsed_string += "#define {}_HEIGHT {}\n".format(prefix, height)
+            parsed_string += "#define {}_FORMAT VX_DF_IMAGE_{}\n".format(prefix, get_io_image_format(graphparser, image_id))
+            for plane, (bytes_per_pixel, subsampling_x, subsampling_y) in enumerate(get_image_planes(graphparser, image_id)):
+                stride = width / subsampling_x * bytes_per_pixel
+                parsed_string += "#define {}_PLANE_{}_STRIDE {}\n".format(prefix, plane, stride)
+                parsed_string += "#define {}_PLANE_{}_SIZE {}\n".format(prefix, plane, stride * (height / subsampling_y))
+
+    return parsed_string
+
+def create_io_images(graphparser, io_string):
+    """Writes the creation of the input or output images from the host memory pointers and strides."""
+    parsed_string = ""
+
+    for index, image_id in enumerate(graphparser.get_indexed_names(io_string + '_image_nodes')):
+        # Images with a size given as numbers in the graph use the size constants of the header,
+        # and images without a size in the graph get the size given to the create function
+        if None not in get_io_image_size(graphparser, image_id):
+            width = get_constant_prefix(graphparser, io_string, index) + "_WIDTH"
+            height = get_constant_prefix(graphparser, io_string, index) + "_HEIGHT"
+        else:
+            (value_from_opts, width) = graphparser.get_value_for_attribute(image_id, 'width')
+            if value_from_opts:
+                width = "opts->" + width
+            elif width == 0:
+                width = "width"
+
+            (value_from_opts, height) = graphparser.get_value_for_attribute(image_id, 'height')
+            if value_from_opts:
+                height = "opts->" + height
+            elif height == 0:
+                height = "height"
+
+        for plane, (bytes_per_pixel, subsampling_x, subsampling_y) in enumerate(get_image_planes(graphparser, image_id)):
+            parsed_string += "    addrs[{}].dim_x = {};\n".format(plane, width)
+            parsed_string += "    addrs[{}].dim_y = {};\n".format(plane, height)
+            parsed_string += "    addrs[{}].stride_x = {};\n".format(plane, bytes_per_pixel)
+            parsed_string += "    addrs[{}].stride_y = {}_strides[{}][{}];\n".format(plane, io_string, index, plane)
+            parsed_string += "    addrs[{}].scale_x = VX_SCALE_UNITY / {};\n".format(plane, subsampling_x)
+            parsed_string += "    addrs[{}].scale_y = VX_SCALE_UNITY / {};\n".format(plane, subsampling_y)
+            parsed_string += "    addrs[{}].step_x = {};\n".format(plane, subsampling_x)
+            parsed_string += "    addrs[{}].step_y = {};\n".format(plane, subsampling_y)
+        parsed_string += "    {}_images[{}] = vxCreateImageFromHandle(context, VX_DF_IMAGE_{}, addrs, {}_ptrs[{}], VX_MEMORY_TYPE_HOST);\n".\
+                         format(io_string, index, get_io_image_format(graphparser, image_id), io_string, index)
+        parsed_string += "    if (vxGetStatus((vx_reference) {}_images[{}]) != VX_SUCCESS) {{".format(io_string, index)
+        parsed_string += " fprintf(stderr, \"Failed to create " + io_string + " image #" + str(index) + " from handle\\n\");"
+        parsed_string += " num_errors++;"
+        parsed_string += " }\n\n"
+
+    return parsed_string
+
+def swap_io_images(graphparser, io_string):
+    """Writes the swapping of the host memory pointers of the input or output images."""
+    parsed_string = ""
+
+    for index, image_id in enumerate(graphparser.get_indexed_names(io_string + '_image_nodes')):
+        num_planes = len(get_image_planes(graphparser, image_id))
+        parsed_string += "    status = vxSwapImageHandle({}_images[{}], {}_ptrs[{}], NULL, {});".\
+                         format(io_string, index, io_string, index, num_planes)
+        parsed_string += " if (status != VX_SUCCESS) {"
+        parsed_string += " fprintf(stderr, \"Failed to swap handle of " + io_string + " image #" + str(index) + "\\n\");"
+        parsed_string += " num_errors++;"
+        parsed_string += " }\n"
+
+    return parsed_string
+
+def parse(graphparser):
+    """Writes the C-code for the functions that create the I/O images from host memory and swap their handles
+
+    The I/O images are created once with vxCreateImageFromHandle, and each new frame is bound to the graph
+    by swapping the host memory pointers with vxSwapImageHandle, so no graph parameters are changed
+    and no image data is copied.
+    """
+
+    graphname_strip = graphparser.graphname + "_strip"
+    max_planes = graphparser.graphname.upper() + "_MAX_PLANES"
+    num_input_imgs = len(graphparser.image_nodes.input_nodes_indexed_names)
+    num_output_imgs = len(graphparser.image_nodes.output_nodes_indexed_names)
+
+    parsed_string = """\
+
+bool
+%s_create_io_images(vx_context context, vx_uint32 width, vx_uint32 height, void *userdata,
+                    void *input_ptrs[%s][%s], vx_int32 input_strides[%s][%s],
+                    void *output_ptrs[%s][%s], vx_int32 output_strides[%s][%s],
+                    vx_image input_images[%s], vx_image output_images[%s])
+{
+    int num_errors = 0;
+    vx_imagepatch_addressing_t addrs[%s];
+    (void) width; /* To avoid compiler warning */
+    (void) height; /* To avoid compiler warning */
+""" % (graphname_strip, num_input_imgs, max_planes, num_input_imgs, max_planes,
+       num_output_imgs, max_planes, num_output_imgs, max_planes, num_input_imgs, num_output_imgs, max_planes)
+
+    parsed_string += graph_create_function_strip.handle_userdata(graphparser)
+    parsed_string += create_io_images(graphparser, 'input')
+    parsed_string += create_io_images(graphparser, 'output')
+
+    parsed_string += """\
+    return (num_errors == 0);
+}
+
+bool
+%s_swap_io_images(vx_image input_images[%s], vx_image output_images[%s],
+                  void *input_ptrs[%s][%s], void *output_ptrs[%s][%s])
+{
+    int num_errors = 0;
+    vx_status status;
+
+""" % (graphname_strip, num_input_imgs, num_output_imgs, num_input_imgs, max_planes, num_output_imgs, max_planes)
+
+    parsed_string += swap_io_images(graphparser, 'input')
+    parsed_string += swap_io_images(graphparser, 'output')
+
+    parsed_string += """\
+
+    return (num_errors == 0);
+}
+"""
+
+    return parsed_string
@@ -0,0 +1,185 @@
+"""Module for generating the tiled execution functions for the graph definition C-sourcefile in strip mode
+
+"""
+
+import graph_swap_io_images_function
+
+def create_tile_images(graphparser):
+    """Writes the creation of the input image ROIs and the local output images of one tile,
+    and the copy nodes from the central rows of the local output images to the output images."""
+    input_string = ""
+    for index in range(len(graphparser.image_nodes.input_nodes_indexed_names)):
+        input_string += "        tile_input_images[{}] = vxCreateImageFromROI(input_images[{}], &rect);\n".format(index, index)
+
+    output_string = ""
+    copy_string = ""
+    for index, image_id in enumerate(graphparser.image_nodes.output_nodes_indexed_names):
+        scale = graphparser.graph_tiling.get_image_scale(image_id)
+        image_format = graph_swap_io_images_function.get_io_image_format(graphparser, image_id)
+        output_string += "        vxQueryImage(output_images[{}], VX_IMAGE_WIDTH, &output_width, sizeof(output_width));\n".format(index)
+        output_string += "        tile_output_images[{}] = vxCreateImage(context, output_width, (halo_end - halo_start) / {}, VX_DF_IMAGE_{});\n".\
+                         format(index, scale, image_format)
+
+        copy_string += "        vxQueryImage(output_images[{}], VX_IMAGE_WIDTH, &output_width, sizeof(output_width));\n".format(index)
+        copy_string += "        rect.end_x = output_width;\n"
+        copy_string += "        rect.start_y = (start - halo_start) / {}; rect.end_y = (end - halo_start) / {};\n".format(scale, scale)
+        copy_string += "        tile_roi = vxCreateImageFromROI(tile_output_images[{}], &rect);\n".format(index)
+        copy_string += "        rect.start_y = start / {}; rect.end_y = end / {};\n".format(scale, scale)
+        copy_string += "        output_roi = vxCreateImageFromROI(output_images[{}], &rect);\n".format(index)
+        copy_string += "        copy_node = vxCopyNode(tile_graphs[tile], (vx_reference) tile_roi, (vx_reference) output_roi);\n"
+        copy_string += "        if (vxGetStatus((vx_reference) copy_node) != VX_SUCCESS) {"
+        copy_string += " fprintf(stderr, \"Failed to create copy node of output image #" + str(index) + " for tile #%d\\n\", tile);"
+        copy_string += " num_errors++;"
+        copy_string += " }\n"
+        copy_string += "        vxReleaseNode(&copy_node);\n"
+        copy_string += "        vxReleaseImage(&tile_roi);\n"
+        copy_string += "        vxReleaseImage(&output_roi);\n\n"
+
+    return input_string, output_string, copy_string
+
+def release_tile_images(graphparser):
+    """Writes the release of the tile images, which are kept alive by the nodes of the tile graph."""
+    parsed_string = ""
+    for index in range(len(graphparser.image_nodes.input_nodes_indexed_names)):
+        parsed_string += "        vxReleaseImage(&tile_input_images[{}]);\n".format(index)
+    for index in range(len(graphparser.image_nodes.output_nodes_indexed_names)):
+        parsed_string += "        vxReleaseImage(&tile_output_images[{}]);\n".format(index)
+    return parsed_string
+
+def parse(graphparser):
+    """Writes the C-code for the functions that create and process the graphs of all tiles
+
+    Each tile is a horizontal band of the images. The graph of a tile processes ROIs of the input images
+    that are extended by the halo rows above and below the band, into local output images,
+    and copies the central rows of the local output images into ROIs of the output images with vxCopyNode.
+    The tile graphs are processed in one thread each.
+
+    If the graph can not be tiled, the functions create and process a single graph on the whole images.
+    """
+
+    graphname = graphparser.graphname
+    tiles = graphname.upper() + "_TILES"
+    num_input_imgs = len(graphparser.image_nodes.input_nodes_indexed_names)
+    num_output_imgs = len(graphparser.image_nodes.output_nodes_indexed_names)
+
+    parsed_string = """\
+
+bool
+%s_create_tiles(vx_context context, vx_graph tile_graphs[%s], vx_image input_images[%s], vx_image output_images[%s], void *userdata)
+{
+""" % (graphname, tiles, num_input_imgs, num_output_imgs)
+
+    if not graphparser.graph_tiling.tileable:
+        parsed_string += """\
+    /* The graph can not be tiled, so the only tile is the whole image */
+    return %s_create(context, tile_graphs[0], input_images, output_images, userdata);
+}
+
+bool
+%s_process_tiles(vx_graph tile_graphs[%s])
+{
+    if (vxProcessGraph(tile_graphs[0]) != VX_SUCCESS) { fprintf(stderr, "Failed to process graph\\n"); return false; }
+    return true;
+}
+""" % (graphname, graphname, tiles)
+        return parsed_string
+
+    halo = graphname.upper() + "_TILE_HALO"
+    alignment = graphname.upper() + "_TILE_ALIGNMENT"
+    input_string, output_string, copy_string = create_tile_images(graphparser)
+
+    parsed_string += """\
+    int num_errors = 0;
+    vx_uint32 width, height, output_width;
+    int tile;
+
+    vxQueryImage(input_images[0], VX_IMAGE_WIDTH, &width, sizeof(width));
+    vxQueryImage(input_images[0], VX_IMAGE_HEIGHT, &height, sizeof(height));
+    if (width %% %s != 0 || height %% %s != 0 || height < %s * %s) {
+        fprintf(stderr, "Image size %%ux%%u can not be split into %%d tiles\\n", width, height, %s);
+        return false;
+    }
+
+    for (tile = 0; tile < %s; tile++) {
+        /* The rows of the tile, and of the tile with the halo, in rows of the input images.
+           The last tile ends at the bottom of the image, also when the height is not a multiple of the tiles. */
+        vx_uint32 start = tile * (height / %s) / %s * %s;
+        vx_uint32 end = tile == %s - 1 ? height : (tile + 1) * (height / %s) / %s * %s;
+        vx_uint32 halo_start = start > %s ? start - %s : 0;
+        vx_uint32 halo_end = end + %s < height ? end + %s : height;
+        vx_rectangle_t rect;
+        vx_image tile_input_images[%s];
+        vx_image tile_output_images[%s];
+        vx_image tile_roi, output_roi;
+        vx_node copy_node;
+
+        rect.start_x = 0;
+        rect.end_x = width;
+        rect.start_y = halo_start;
+        rect.end_y = halo_end;
+""" % (alignment, alignment, tiles, alignment, tiles,
+       tiles, alignment, tiles, alignment, tiles, alignment, tiles, alignment, halo, halo, halo, halo,
+       num_input_imgs, num_output_imgs)
+
+    parsed_string += input_string
+    parsed_string += output_string
+    parsed_string += """\
+
+        if (!%s_create(context, tile_graphs[tile], tile_input_images, tile_output_images, userdata)) {
+            fprintf(stderr, "Failed to create graph of tile #%%d\\n", tile);
+            num_errors++;
+        }
+
+""" % (graphname)
+    parsed_string += copy_string
+    parsed_string += release_tile_images(graphparser)
+    parsed_string += """\
+    }
+
+    return (num_errors == 0);
+}
+
+typedef struct {
+    vx_graph graph;
+    vx_status status;
+} %s_tile_job_t;
+
+static void *
+%s_process_tile(void *arg)
+{
+    %s_tile_job_t *job = (%s_tile_job_t *) arg;
+    job->status = vxProcessGraph(job->graph);
+    return NULL;
+}
+
+bool
+%s_process_tiles(vx_graph tile_graphs[%s])
+{
+    int num_errors = 0;
+    pthread_t threads[%s];
+    bool started[%s];
+    %s_tile_job_t jobs[%s];
+    int tile;
+
+    for (tile = 0; tile < %s; tile++) {
+        jobs[tile].graph = tile_graphs[tile];
+        jobs[tile].status = VX_FAILURE;
+        started[tile] = (pthread_create(&threads[tile], NULL, %s_process_tile, &jobs[tile]) == 0);
+        if (!started[tile]) {
+            /* Process the tile in this thread instead */
+            %s_process_tile(&jobs[tile]);
+        }
+    }
+    for (tile = 0; tile < %s; tile++) {
+        if (started[tile]) {
+            pthread_join(threads[tile], NULL);
+        }
+        if (jobs[tile].status != VX_SUCCESS) { fprintf(stderr, "Failed to process graph of tile #%%d\\n", tile); num_errors++; }
+    }
+
+    return (num_errors == 0);
+}
+""" % (graphname, graphname, graphname, graphname, graphname, tiles, tiles, tiles, graphname, tiles,
+       tiles, graphname, graphname, tiles)
+
+    return parsed_string
@@ -58,6 +58,11 @@ Adding a function node to the graph
      should be of type "vx_enum". However, as is specified in the parameter description,
      "vx_enum" should be of the specific type "vx_convert_policy_e". The graph parser is designed to look
      for the specific type, and not the generic "vx_enum" type.
+  5. An execution target for the node can be given with [vx_target TARGET], where TARGET is either VX_TARGET_ANY
+     or a target name of the OpenVX implementation, e.g. [vx_target dsp]. The generated code then calls
+     vxSetNodeTarget for the node (the target is ignored for OpenVX 1.0.1, where vxSetNodeTarget is not available).
+     The format checker warns if the node is not known to be supported on the target, for the targets
+     listed in TARGET_SUPPORTED_NODES in the function node library (other targets are not checked).
 
 Adding an image node to the graph
 ---------------------------------
@@ -112,6 +117,19 @@ For instance, if a reference width is needed to be specified, one can add the pa
 See the documentation of the graph manager for further information on how to set the userdata parameter
 when registering the graph in the algorithm code.
 
+The userdata object can also contain graph options, which control the code generation for the graph
+instead of being added as userdata parameters. They use the same notation, with the option name first:
+
+  - [fuse_morphology true] or [fuse_morphology false]: Enables or disables fusion of chains of
+    Erode3x3/Erode2x2 or Dilate3x3/Dilate2x2 nodes into single vxNonLinearFilterNodes
+    (only for OpenVX 1.1 and later). Overrides the -M/--fuse-morphology option of parse_graph.py.
+  - [fold_uniform_images true] or [fold_uniform_images false]: Enables or disables folding of
+    Add/Subtract/Multiply/And/Or/AbsDiff nodes with a uniform input image. Identity nodes (e.g. add 0)
+    are removed and U8 nodes are replaced by a vxTableLookupNode. Uniform images that are no longer used
+    are not created. Overrides the -U/--fold-uniform-images option of parse_graph.py.
+  - [vx_target TARGET]: The default execution target for all function nodes that do not have
+    their own [vx_target ...] entry.
+
 Debug image nodes
 -----------------
 
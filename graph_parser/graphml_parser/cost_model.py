@@ -0,0 +1,161 @@
+"""Cost Model Class
+"""
+
+import parse_common
+
+# Number of bytes per pixel of each image format
+IMAGE_FORMAT_BYTES = {'U8'   : 1,
+                      'U16'  : 2,
+                      'S16'  : 2,
+                      'U32'  : 4,
+                      'S32'  : 4,
+                      'RGB'  : 3,
+                      'RGBX' : 4,
+                      'UYVY' : 2,
+                      'YUYV' : 2,
+                      'NV12' : 1.5,
+                      'NV21' : 1.5,
+                      'IYUV' : 1.5,
+                      'YUV4' : 3}
+
+class CostModel:
+    """Class that statically estimates the memory traffic and the arithmetic operations of each function node.
+
+    The sizes of the images are taken from their width and height attributes. Images without a numeric size
+    get the size of the image they are computed from (half of it for HalfScaleGaussian),
+    and input images without a numeric size get the frame size given to run().
+    Each node is assumed to read each of its input images and write each of its output images once,
+    and to perform the number of operations per output pixel given by COST_NODES in the function node library.
+
+    The estimate must only be made after the optimization passes, since the passes change the function nodes.
+    """
+
+    def __init__(self, debug_mode):
+        self.debug_mode = debug_mode
+        self.reset()
+
+    def reset(self):
+        # Dictionary with the id of each image node as key and its size as a (width, height) tuple as value
+        self.image_sizes = {}
+        # Dictionary with the id of each image node as key and its image format as value
+        self.image_formats = {}
+        # List with a dictionary for each function node, in execution order,
+        # with the node id, the function node name, the read and written bytes and the operations
+        self.node_costs = []
+        self.total_read_bytes = 0
+        self.total_write_bytes = 0
+        self.total_ops = 0
+
+    def run(self, function_nodes, image_nodes, userdata, image_format_checker, library, morphology_fusion, frame_size):
+        """Estimates the cost of each function node of the graph for input images of frame_size (width, height)."""
+        self.reset()
+        self.image_formats = dict(zip(image_format_checker.PIN_ID, image_format_checker.PIN_FORMAT))
+
+        for image_id in image_nodes.input_nodes_indexed_names:
+            self.image_sizes[image_id] = self.get_declared_size(image_nodes, userdata, image_id) or frame_size
+
+        for node in function_nodes.get_execution_order():
+            function_name = function_nodes.get_function_node_name(node)
+            node_info = function_nodes.get_node_info(node)
+            known_sizes = [self.image_sizes[image_id] for image_id in node_info.input_image_node_ids
+                           if image_id in self.image_sizes]
+            input_size = known_sizes[0] if known_sizes else frame_size
+            for image_id in node_info.input_image_node_ids:
+                # Uniform images without a size get the size of the other input image
+                if image_id not in self.image_sizes:
+                    self.image_sizes[image_id] = self.get_declared_size(image_nodes, userdata, image_id) or input_size
+            for image_id in node_info.output_image_node_ids:
+                self.image_sizes[image_id] = self.get_declared_size(image_nodes, userdata, image_id) or \
+                                             self.get_output_size(function_name, input_size)
+
+            read_bytes = sum([self.get_image_bytes(image_id) for image_id in node_info.input_image_node_ids])
+            write_bytes = sum([self.get_image_bytes(image_id) for image_id in node_info.output_image_node_ids])
+            ops_per_pixel = self.get_ops_per_pixel(library, function_name, node, input_size,
+                                                   node_info.output_image_node_ids, morphology_fusion)
+            if ops_per_pixel is None:
+                ops = None
+                print "WARNING: No operation count is known for " + function_name + " nodes"
+            else:
+                ops = int(ops_per_pixel * sum([self.get_image_pixels(image_id)
+                                               for image_id in node_info.output_image_node_ids]))
+                self.total_ops += ops
+
+            self.node_costs.append({'id': node.attributes["id"].value,
+                                    'function': function_name,
+                                    'read_bytes': read_bytes,
+                                    'write_bytes': write_bytes,
+                                    'ops': ops})
+            self.total_read_bytes += read_bytes
+            self.total_write_bytes += write_bytes
+            if self.debug_mode:
+                print "Node {} ({}) reads {} bytes, writes {} bytes and performs {} operations".format(
+                    node.attributes["id"].value, function_name, read_bytes, write_bytes, ops)
+
+    def get_declared_size(self, image_nodes, userdata, image_id):
+        """Returns the (width, height) of the image from its attributes, or None if they are not numeric."""
+        image_attributes = image_nodes.get_image_attributes(image_id)
+        if image_attributes is None:
+            return None
+        sizes = []
+        for attribute in ['width', 'height']:
+            (is_userdata, value) = image_attributes.get_image_attribute(userdata, attribute)
+            if is_userdata or int(value) == 0:
+                return None
+            sizes.append(int(value))
+        return sizes[0], sizes[1]
+
+    def get_output_size(self, function_name, input_size):
+        """Returns the size of an output image without a declared size, computed from the input image size."""
+        if function_name == 'HalfScaleGaussian':
+            return (input_size[0] + 1) // 2, (input_size[1] + 1) // 2
+        return input_size
+
+    def get_image_pixels(self, image_id):
+        return self.image_sizes[image_id][0] * self.image_sizes[image_id][1]
+
+    def get_image_bytes(self, image_id):
+        return int(self.get_image_pixels(image_id) * IMAGE_FORMAT_BYTES.get(self.image_formats[image_id], 1))
+
+    def get_ops_per_pixel(self, library, function_name, node, input_size, output_image_ids, morphology_fusion):
+        """Returns the operations per output pixel, also for function nodes where it depends on the parameters."""
+        if function_name not in library.COST_NODES:
+            return None
+        ops_per_pixel = library.COST_NODES[function_name]
+        if ops_per_pixel is not None:
+            return ops_per_pixel
+
+        if function_name == 'HalfScaleGaussian':
+            try:
+                kernel_size = int(parse_common.parse_parameter("vx_int32", node))
+            except ValueError:
+                # The kernel size is only known at runtime, assume the largest one supported by vxHalfScaleGaussianNode
+                kernel_size = 5
+            # A multiplication and an addition for each kernel element
+            return 2 * kernel_size * kernel_size
+        elif function_name == 'MorphologyChain':
+            offsets = morphology_fusion.get_chain(node.attributes["id"].value).offsets
+            # A comparison for each element of the square structuring element except the first
+            return (offsets[1] - offsets[0] + 1) ** 2 - 1
+        elif function_name in ['ScaleImage', 'WarpAffine']:
+            interpolation = parse_common.parse_parameter("vx_interpolation_type_e", node)
+            # WarpAffine also computes the source coordinates
+            coordinate_ops = 4 if function_name == 'WarpAffine' else 0
+            if 'NEAREST_NEIGHBOR' in interpolation:
+                return coordinate_ops + 1
+            elif 'AREA' in interpolation:
+                output_pixels = max(self.get_image_pixels(output_image_ids[0]), 1)
+                return coordinate_ops + max(input_size[0] * input_size[1] // output_pixels, 1) + 1
+            # Bilinear interpolation, also assumed if no interpolation is given
+            return coordinate_ops + 8
+        raise NameError('The operation count of {} nodes is not known.'.format(function_name))
+
+    def get_total_bytes(self):
+        return self.total_read_bytes + self.total_write_bytes
+
+    def get_report(self):
+        """Returns the per-node and total estimates as a dictionary, e.g. for writing as JSON."""
+        return {'nodes': self.node_costs,
+                'total': {'read_bytes': self.total_read_bytes,
+                          'write_bytes': self.total_write_bytes,
+                          'bytes': self.get_total_bytes(),
+                          'ops': self.total_ops}}
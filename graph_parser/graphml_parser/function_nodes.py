@@ -2,9 +2,11 @@
 """
 
 from xml.dom import minidom
+from array import array
 import logging
+from node_id_table import NodeIdTable
 
-class NodeInfo:
+class NodeInfo(object):
     """Class that contains information about the neighborhood of a given node.
 
     input_image_node_ids and output_image_node_ids contain the image node ids
@@ -15,6 +17,7 @@ class NodeInfo:
 
     They are used to get the correct input image ordering in the parameter list of the node-creating C-functions.
     """
+    __slots__ = ['input_edge_labels', 'output_edge_labels', 'input_image_node_ids', 'output_image_node_ids']
 
     def __init__(self):
         self.input_edge_labels = []
@@ -22,7 +25,7 @@ class NodeInfo:
         self.input_image_node_ids = []
         self.output_image_node_ids = []
 
-class IndexLists:
+class IndexLists(object):
     """Class that is used to store synched index lists used to set new I/O and debug images using vxSetParameterByIndex.
 
     function_nodes_index_list contains the array indices of the function nodes
@@ -33,11 +36,12 @@ class IndexLists:
     images_nodes_index_list contains the array indices of the image nodes to be set
     (stored in the respective image nodes array in the c code).
     """
+    __slots__ = ['function_nodes_index_list', 'function_param_index_list', 'images_nodes_index_list']
 
     def __init__(self):
-        self.function_nodes_index_list = []
-        self.function_param_index_list = []
-        self.images_nodes_index_list = []
+        self.function_nodes_index_list = array('i')
+        self.function_param_index_list = array('i')
+        self.images_nodes_index_list = array('i')
 
     def append_to_index_lists(self, function_node_array_index, function_node_param_index, image_node_array_index):
         self.function_nodes_index_list.append(function_node_array_index)
@@ -91,8 +95,23 @@ class FunctionNodes:
         self.node_info = NodeInfo()
         self.current_node = minidom.Node()
 
+        # The node ids of the graph interned to integer indices
+        self.node_id_table = NodeIdTable()
+        # Dictionary with the integer index of each node id as key and a list with an
+        # (is_input, other node id, edge) tuple for each edge of the node, in file order, as value
+        self.edges_by_node = {}
+        # Dictionary with each function node as key and its index in the synched function node lists as value,
+        # None when the lists have changed
+        self.node_positions = None
+        # The list given by get_io_graph_parameters, and a dictionary with the id of each I/O function node as key
+        # and its list of (node parameter index, I/O graph parameter index) tuples as value,
+        # None when the I/O function node lists have changed
+        self.io_graph_parameters = None
+        self.io_graph_parameters_by_node = None
+
     def populate_function_nodes_indexed_lists(self, graph, library, image_nodes):
         """Populates the lists related to function nodes and creates associated node_info objects"""
+        self.index_edges(graph)
         for node in graph.getElementsByTagName('node'):  # visit every node <node />
             for node_appearance in node.getElementsByTagName('y:GenericNode'):  #TODO:: Change to if?
                 if (node_appearance.attributes["configuration"].value == "com.yworks.flowchart.start1")\
@@ -101,18 +120,41 @@ class FunctionNodes:
                     self.indexed_function_nodes.append(node)
                     function_name = node.getElementsByTagName('y:NodeLabel')[0].firstChild.wholeText
                     self.function_nodes_indexed_names.append(function_name)
-                    self.populate_io_function_node_indexed_lists(library.FIRST_INPUT_IMAGE_INDEX_DICT.get(function_name, -999) ,
-                                                                 library.FIRST_OUTPUT_IMAGE_INDEX_DICT.get(function_name, -999) ,
-                                                                 node, image_nodes) #Only happens if it is an I/O node
-                    self.populate_debug_function_node_indexed_lists(library.FIRST_INPUT_IMAGE_INDEX_DICT.get(function_name, -999) ,
-                                                                 library.FIRST_OUTPUT_IMAGE_INDEX_DICT.get(function_name, -999) ,
-                                                                 node, image_nodes) #Only happens if it is an I/O node
+        self.node_positions = None
+
+        self.populate_io_and_debug_function_node_indexed_lists(library, image_nodes)
 
         #Dynamic nodes info is dependent of that self.indexed_function_nodes
         #and self.function_nodes_indexed_names exists
         self.populate_dynamic_function_nodes_list(graph, library)
         self.lists_populated = True
 
+    def populate_io_and_debug_function_node_indexed_lists(self, library, image_nodes):
+        """(Re)populates the I/O and debug function node lists from the current function node lists.
+
+        Called when the function node lists are first populated,
+        and again if a graph optimization pass has changed the function nodes of the graph.
+        """
+        self.input_function_nodes_indexed_names = []
+        self.input_function_nodes_first_input_index = []
+        self.output_function_nodes_indexed_names = []
+        self.output_function_nodes_first_output_index = []
+        self.output_function_nodes_first_input_index = []
+        self.io_graph_parameters = None
+        self.io_graph_parameters_by_node = None
+        self.debug_input_function_nodes_indexed_names = []
+        self.debug_input_function_nodes_first_output_index = []
+        self.debug_output_function_nodes_indexed_names = []
+        self.debug_output_function_nodes_first_input_index = []
+
+        for node, function_name in zip(self.indexed_function_nodes, self.function_nodes_indexed_names):
+            self.populate_io_function_node_indexed_lists(library.FIRST_INPUT_IMAGE_INDEX_DICT.get(function_name, -999) ,
+                                                         library.FIRST_OUTPUT_IMAGE_INDEX_DICT.get(function_name, -999) ,
+                                                         node, image_nodes) #Only happens if it is an I/O node
+            self.populate_debug_function_node_indexed_lists(library.FIRST_INPUT_IMAGE_INDEX_DICT.get(function_name, -999) ,
+                                                            library.FIRST_OUTPUT_IMAGE_INDEX_DICT.get(function_name, -999) ,
+                                                            node, image_nodes) #Only happens if it is an I/O node
+
     def populate_io_function_node_indexed_lists(self, first_input_index, first_output_index, current_node, image_nodes):
         """Appends information about function node id and I/O indexing structure to global I/O list
 
@@ -170,14 +212,99 @@ class FunctionNodes:
     # =========================================
     # Function node information related methods
     # =========================================
+    def get_function_node_position(self, node):
+        """Returns the index of the function node in the synched function node lists.
+
+        Raises a ValueError if node is not a function node, like list.index.
+        """
+        if self.node_positions is None:
+            self.node_positions = dict([(function_node, position)
+                                        for position, function_node in enumerate(self.indexed_function_nodes)])
+        try:
+            return self.node_positions[node]
+        except KeyError:
+            raise ValueError("The node is not a function node")
+
     def get_function_node_name(self, node):
         """Returns the function node name of the node given by 'node'."""
         try:
-            return self.function_nodes_indexed_names[self.indexed_function_nodes.index(node)]
+            return self.function_nodes_indexed_names[self.get_function_node_position(node)]
         except IndexError:
             print "ERROR: The class function_nodes has function node lists that are out of sync!"
             raise
 
+    def remove_function_node(self, node):
+        """Removes a function node and its node_info object from the synched function node lists.
+
+        Used by graph optimization passes that replace function nodes.
+        The I/O and debug function node lists must be repopulated afterwards.
+        """
+        index = self.get_function_node_position(node)
+        del self.indexed_function_nodes[index]
+        del self.indexed_node_info_list[index]
+        del self.function_nodes_indexed_names[index]
+        self.node_positions = None
+
+    def remove_function_nodes(self, nodes):
+        """Removes several function nodes and their node_info objects from the synched function node lists at once.
+
+        Like remove_function_node, but each list is only rebuilt once.
+        """
+        removed_nodes = set(nodes)
+        kept_positions = [position for position, node in enumerate(self.indexed_function_nodes) if node not in removed_nodes]
+        self.indexed_function_nodes[:] = [self.indexed_function_nodes[position] for position in kept_positions]
+        self.indexed_node_info_list[:] = [self.indexed_node_info_list[position] for position in kept_positions]
+        self.function_nodes_indexed_names[:] = [self.function_nodes_indexed_names[position] for position in kept_positions]
+        self.node_positions = None
+
+    def get_producers(self):
+        """Returns a dictionary with the id of each image node that is an output of a function node as key
+        and the function node as value."""
+        producers = {}
+        for node, node_info in zip(self.indexed_function_nodes, self.indexed_node_info_list):
+            for image_id in node_info.output_image_node_ids:
+                producers[image_id] = node
+        return producers
+
+    def get_predecessors(self):
+        """Returns a dictionary with each function node as key and the list of function nodes that produce
+        its input images as value."""
+        producers = self.get_producers()
+        predecessors = {}
+        for node, node_info in zip(self.indexed_function_nodes, self.indexed_node_info_list):
+            predecessors[node] = []
+            for image_id in node_info.input_image_node_ids:
+                producer = producers.get(image_id)
+                if producer is not None and producer not in predecessors[node]:
+                    predecessors[node].append(producer)
+        return predecessors
+
+    def get_execution_order(self):
+        """Returns the function nodes in topological order, i.e. each node after the producers of its input images.
+
+        Runs in time linear in the number of nodes and edges. Raises a RuntimeError if the graph has a cycle.
+        """
+        predecessors = self.get_predecessors()
+        successors = dict([(node, []) for node in self.indexed_function_nodes])
+        nbr_waiting = {}
+        for node in self.indexed_function_nodes:
+            nbr_waiting[node] = len(predecessors[node])
+            for predecessor in predecessors[node]:
+                successors[predecessor].append(node)
+
+        order = [node for node in self.indexed_function_nodes if nbr_waiting[node] == 0]
+        index = 0
+        while index < len(order):
+            for successor in successors[order[index]]:
+                nbr_waiting[successor] -= 1
+                if nbr_waiting[successor] == 0:
+                    order.append(successor)
+            index += 1
+        if len(order) != len(self.indexed_function_nodes):
+            raise RuntimeError("The graph has a cycle and can not be executed")
+
+        return order
+
     def get_input_function_node_index(self, current_node):
         """Gets the list index in input_function_nodes_indexed_names for current_node."""
         try:
@@ -213,50 +340,51 @@ class FunctionNodes:
             print "ERROR: function node is not in debug output function nodes list"
             raise
 
+    def index_edges(self, graph):
+        """Interns the node ids of graph and indexes the edges by the integer index of their nodes.
+
+        Edges from a node to itself are skipped (a bug causes these to appear in the XML sometimes).
+        """
+        self.node_id_table = NodeIdTable()
+        self.edges_by_node = {}
+        for node in graph.getElementsByTagName('node'):
+            self.edges_by_node[self.node_id_table.add(node.attributes["id"].value)] = []
+
+        for edge in graph.getElementsByTagName('edge'):
+            source = self.node_id_table.intern(edge.attributes["source"].value)
+            target = self.node_id_table.intern(edge.attributes["target"].value)
+            if source == target:
+                continue
+            self.edges_by_node.setdefault(self.node_id_table.get_index(target), []).append((True, source, edge))
+            self.edges_by_node.setdefault(self.node_id_table.get_index(source), []).append((False, target, edge))
+
     def create_node_info(self, graph, current_node):
-        """Generates information about edges linked to current_node and the nearest neighbor nodes."""
+        """Generates information about edges linked to current_node and the nearest neighbor nodes.
+
+        Uses the edges indexed by index_edges, which must be called for graph first.
+        """
         #If current_node has changed, clear node_info and generate new data
         if self.current_node != current_node:
             self.current_node = current_node
             self.node_info = NodeInfo()
 
-            # Check all edges in the graph, to see if they are connected to the
-            # current node
-            for edge in graph.getElementsByTagName('edge'):
-
-                # Also avoid closed loops (a bug causes these to appear in the XML
-                # sometimes)
-                if edge.attributes["source"].value != edge.attributes["target"].value:
-
-                    if edge.attributes["target"].value == current_node.attributes["id"].value:
-
-                        # ID for the data node of an edge that ends in the current
-                        # function node is added to the indexed list
-                        self.node_info.input_image_node_ids.append(
-                            edge.attributes["source"].value)
-
-                        # Check if there is a label on any of the input edges (used for
-                        # ordering the input arguments)
-                        if edge.getElementsByTagName('y:EdgeLabel'):
-                            self.node_info.input_edge_labels.append(
-                                edge.getElementsByTagName('y:EdgeLabel')[0].firstChild.wholeText)
-                        else:
-                            self.node_info.input_edge_labels.append("NO_LABEL")
-
-                    if edge.attributes["source"].value == current_node.attributes["id"].value:
-
-                        # ID for the data node of an edge that starts at the current
-                        # function node is added to the indexed list
-                        self.node_info.output_image_node_ids.append(
-                            edge.attributes["target"].value)
-
-                        # Check if there is a label on any of the output edges (used
-                        # for ordering the output arguments)
-                        if edge.getElementsByTagName('y:EdgeLabel'):
-                            self.node_info.output_edge_labels.append(
-                                edge.getElementsByTagName('y:EdgeLabel')[0].firstChild.wholeText)
-                        else:
-                            self.node_info.output_edge_labels.append("NO_LABEL")
+            node_index = self.node_id_table.get_index(current_node.attributes["id"].value)
+            for is_input, image_node_id, edge in self.edges_by_node.get(node_index, []):
+                # Check if there is a label on the edge (used for ordering the input and output arguments)
+                if edge.getElementsByTagName('y:EdgeLabel'):
+                    label = edge.getElementsByTagName('y:EdgeLabel')[0].firstChild.wholeText
+                else:
+                    label = "NO_LABEL"
+                if is_input:
+                    # ID for the data node of an edge that ends in the current
+                    # function node is added to the indexed list
+                    self.node_info.input_image_node_ids.append(image_node_id)
+                    self.node_info.input_edge_labels.append(label)
+                else:
+                    # ID for the data node of an edge that starts at the current
+                    # function node is added to the indexed list
+                    self.node_info.output_image_node_ids.append(image_node_id)
+                    self.node_info.output_edge_labels.append(label)
 
         return self.node_info
 
@@ -266,9 +394,9 @@ class FunctionNodes:
         Assumes self.populate_function_nodes_indexed_lists() has been called prior to
         using this function
         """
-        if current_node in self.indexed_function_nodes:
-            return self.indexed_node_info_list[self.indexed_function_nodes.index(current_node)]
-        else:
+        try:
+            return self.indexed_node_info_list[self.get_function_node_position(current_node)]
+        except ValueError:
             print "ERROR: function node has no associated node_info object"
             return NodeInfo() #Return empty info object
 
@@ -284,6 +412,44 @@ class FunctionNodes:
         return success
 
 
+    def get_io_graph_parameters(self, image_nodes):
+        """Returns the function node parameters that are bound to graph parameters for the I/O images,
+        see GraphParser.get_io_graph_parameters.
+
+        The list is computed once, until the I/O function node lists are repopulated.
+        """
+        if self.io_graph_parameters is None:
+            first_parameters = {}
+            extra_parameters = []
+            for io_string, io_offset in [('input', 0), ('output', len(image_nodes.input_nodes_indexed_names))]:
+                index_lists = self.get_index_lists_for_io_function_nodes(io_string, image_nodes)
+                for idx, node_index in enumerate(index_lists.function_nodes_index_list):
+                    io_parameter = (io_string, node_index, index_lists.function_param_index_list[idx],
+                                    io_offset + index_lists.images_nodes_index_list[idx])
+                    if io_parameter[3] in first_parameters:
+                        extra_parameters.append(io_parameter)
+                    else:
+                        first_parameters[io_parameter[3]] = io_parameter
+            self.io_graph_parameters = [first_parameters[io_index] for io_index in sorted(first_parameters)] + \
+                                       extra_parameters
+        return self.io_graph_parameters
+
+    def get_io_graph_parameters_for_node(self, node, image_nodes):
+        """Returns the list of (node parameter index, I/O graph parameter index) tuples of the function node,
+        see GraphParser.get_io_graph_parameters_for_node.
+
+        The parameters of all function nodes are mapped once, until the I/O function node lists are repopulated.
+        """
+        if self.io_graph_parameters_by_node is None:
+            self.io_graph_parameters_by_node = {}
+            io_function_node_ids = {'input': self.input_function_nodes_indexed_names,
+                                    'output': self.output_function_nodes_indexed_names}
+            for io_graph_index, (io_string, node_index, parameter_index, io_index) in \
+                    enumerate(self.get_io_graph_parameters(image_nodes)):
+                node_id = io_function_node_ids[io_string][node_index]
+                self.io_graph_parameters_by_node.setdefault(node_id, []).append((parameter_index, io_graph_index))
+        return self.io_graph_parameters_by_node.get(node.attributes["id"].value, [])
+
     def get_index_lists_for_io_function_nodes(self, io_string, image_nodes):
         """Prepares a list of index lists used to set input or output images on I/O function nodes.
 
@@ -0,0 +1,123 @@
+"""Graph Tiling Class
+"""
+
+import parse_common
+
+class GraphTiling:
+    """Class that analyses if a graph can be processed in horizontal bands (tiles) of the images.
+
+    Each tile is processed by its own graph, with ROIs of the input images that are extended by a halo,
+    i.e. the number of extra rows above and below the tile needed by the neighbourhoods of the function nodes.
+    The halo is computed backwards from the output images, using the neighbourhood radius and the
+    vertical downscale factor of each function node (see TILING_NODES in the function node library).
+
+    Graphs with function nodes that can not be tiled (e.g. WarpAffine and ScaleImage), uniform images
+    (which have a fixed size) or debug images are processed as whole images.
+
+    The analysis must only run after the optimization passes, since the passes change the function nodes.
+    """
+
+    def __init__(self, debug_mode):
+        self.debug_mode = debug_mode
+        self.reset()
+
+    def reset(self):
+        self.tileable = False
+        # The reason why the graph can not be tiled
+        self.reason = ""
+        # Number of halo rows (in rows of the input images) above and below each tile
+        self.halo = 0
+        # Dictionary with the id of each image node as key and its vertical downscale factor
+        # relative to the input images as value
+        self.image_scales = {}
+        # Largest downscale factor of the images, the tile borders and the halo are multiples of it
+        self.alignment = 1
+
+    def run(self, function_nodes, image_nodes, library, morphology_fusion):
+        """Analyses the graph. Returns True if the graph can be tiled, otherwise the reason is set."""
+        self.reset()
+
+        if len(image_nodes.debug_nodes_indexed_names) > 0:
+            self.reason = "the graph has debug images"
+            return False
+        if len(image_nodes.uniform_input_image_indexed_names) > 0:
+            self.reason = "the graph has uniform images, which have a fixed size"
+            return False
+
+        node_tiling = {}
+        for node in function_nodes.indexed_function_nodes:
+            function_name = function_nodes.get_function_node_name(node)
+            if function_name not in library.TILING_NODES:
+                self.reason = "{} node {} can not be tiled".format(function_name, node.attributes["id"].value)
+                return False
+            radius, downscale = library.TILING_NODES[function_name]
+            if radius is None:
+                radius = self.get_radius(function_name, node, morphology_fusion)
+            node_tiling[node] = (radius, downscale)
+
+        # Propagate the downscale factors forward from the input images
+        for image_id in image_nodes.input_nodes_indexed_names:
+            self.image_scales[image_id] = 1
+        changed = True
+        while changed:
+            changed = False
+            for node in function_nodes.indexed_function_nodes:
+                node_info = function_nodes.get_node_info(node)
+                input_scales = set([self.image_scales.get(image_id) for image_id in node_info.input_image_node_ids])
+                if None in input_scales or len(node_info.output_image_node_ids) == 0:
+                    continue
+                if len(input_scales) > 1:
+                    self.reason = "the input images of node {} have different sizes".format(node.attributes["id"].value)
+                    return False
+                output_scale = input_scales.pop() * node_tiling[node][1]
+                for image_id in node_info.output_image_node_ids:
+                    if image_id not in self.image_scales:
+                        self.image_scales[image_id] = output_scale
+                        changed = True
+
+        for image_id in image_nodes.output_nodes_indexed_names:
+            if image_id not in self.image_scales:
+                self.reason = "output image {} does not depend on the input images".format(image_id)
+                return False
+            self.alignment = max(self.alignment, self.image_scales[image_id])
+
+        # Propagate the halo backwards from the output images, in rows of each image
+        image_halos = dict([(image_id, 0) for image_id in image_nodes.output_nodes_indexed_names])
+        changed = True
+        while changed:
+            changed = False
+            for node in function_nodes.indexed_function_nodes:
+                node_info = function_nodes.get_node_info(node)
+                output_halos = [image_halos.get(image_id) for image_id in node_info.output_image_node_ids]
+                if None in output_halos:
+                    continue
+                radius, downscale = node_tiling[node]
+                input_halo = max(output_halos + [0]) * downscale + radius
+                for image_id in node_info.input_image_node_ids:
+                    if image_halos.get(image_id, -1) < input_halo:
+                        image_halos[image_id] = input_halo
+                        changed = True
+
+        halo = max([image_halos.get(image_id, 0) for image_id in image_nodes.input_nodes_indexed_names] + [0])
+        # Round up so that the tiles with halo start on whole rows of all downscaled images
+        self.halo = -(-halo // self.alignment) * self.alignment
+        self.tileable = True
+        if self.debug_mode:
+            print "Graph can be tiled with a halo of {} rows and an alignment of {} rows".format(self.halo, self.alignment)
+        return True
+
+    def get_radius(self, function_name, node, morphology_fusion):
+        """Returns the neighbourhood radius of function nodes where it depends on the node parameters."""
+        if function_name == 'HalfScaleGaussian':
+            try:
+                return int(parse_common.parse_parameter("vx_int32", node)) // 2
+            except ValueError:
+                # The kernel size is only known at runtime, assume the largest one supported by vxHalfScaleGaussianNode
+                return 2
+        elif function_name == 'MorphologyChain':
+            return morphology_fusion.get_chain(node.attributes["id"].value).get_mask_dimension() // 2
+        raise NameError('The neighbourhood radius of {} nodes is not known.'.format(function_name))
+
+    def get_image_scale(self, image_id):
+        """Returns the vertical downscale factor of the image relative to the input images."""
+        return self.image_scales[image_id]
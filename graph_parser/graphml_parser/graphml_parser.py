@@ -2,10 +2,21 @@
 
 from xml.dom import minidom
 import os.path
+import parse_common
 from function_nodes import FunctionNodes
 from image_nodes import ImageNodes
 from image_format_checker import ImageNodeFormatChecker
+from morphology_fusion import MorphologyChainFusion
+from parameter_pool import ParameterObjectPool
+from uniform_folding import UniformImageFolding
+from graph_tiling import GraphTiling
+from reference_executor import ReferenceExecutor
+from cost_model import CostModel
+from parallelism_analysis import ParallelismAnalysis
+from memory_analysis import MemoryAnalysis
+from subgraph_templates import SubgraphTemplates
 from userdata import Userdata
+import validation_graph_writer
 
 # The supported OpenVX versions
 VX_VERSION_1_0_1 = "1.0.1"
@@ -42,6 +53,10 @@ class GraphParser():
     and similarly for the output function nodes. A given function node can technically be present
     both in the input- and output function node lists though usually this is not the case.
 
+    yEd group nodes are subgraph templates, see SubgraphTemplates. Their contents are moved to the top level
+    of the parsed graph, and the parsing and format checking of the nodes in copies of a template reuse the results
+    for the corresponding nodes of the first copy.
+
     After all lists have been created, no mode parsing should be needed, and the
     C-code can be generated and written to file, using queries to the GraphParser methods and
     its generated lists.
@@ -59,6 +74,42 @@ class GraphParser():
     If the strip_mode flag is set, the GraphParser will generate C-code without any
     graphmanager or other libs/vision dependencies.
     Such generated code is typically used for standalone OpenVX tests.
+
+    If a pipeline depth is set (only in strip mode and for OpenVX 1.2), the generated code uses the
+    OpenVX pipelining extension, with the I/O images as graph parameters that are enqueued and dequeued
+    with pipeline depth buffers each.
+
+    If zero-copy I/O is enabled (only in strip mode and for OpenVX 1.1 and later), functions are also generated
+    that create the I/O images from host memory and swap the image handles for each new frame.
+
+    If several graph instances are set (only in strip mode), a function is also generated that creates all
+    instances in one context, sharing the uniform images and the parameter objects of non-dynamic nodes,
+    and a function that processes all instances concurrently.
+
+    If several tiles are set (only in strip mode and for OpenVX 1.2), functions are also generated that create
+    one graph per horizontal band (tile) of the images, using ROIs with a halo of extra rows, and that process
+    the tile graphs in parallel threads. Graphs that can not be tiled are processed as whole images.
+
+    If the performance report is enabled (only in strip mode and for OpenVX 1.1 and later), the create function
+    keeps the function node handles, and a function is generated that prints the performance of each
+    function node as CSV, keyed by the graphml node id.
+
+    If the asynchronous run loop is enabled (only in strip mode with I/O setting), functions are also generated
+    that alternate between two sets of I/O images, scheduling the graph on one set while the caller
+    prepares the other.
+
+    If export and import is enabled (only in strip mode and for OpenVX 1.2), functions are also generated that export
+    the verified graph to a blob and load it again with the import/export extension, falling back to the create function.
+
+    Graph optimization passes (e.g. uniform image folding and morphology chain fusion) are run by optimize_graph
+    after the image format check, and change the node lists before the final code generation.
+
+    The memory traffic and arithmetic operations of each function node can be estimated with analyse_cost,
+    which fails if the graph exceeds the budget of bytes per frame, and the topological levels and the critical path
+    of the graph can be analysed with analyse_parallelism. The peak memory of the internal images, and the
+    images that can share storage, can be analysed with analyse_memory.
+
+    The parsed graph can also be executed on NumPy arrays with run_reference, without an OpenVX implementation.
     """
 
     def __init__(self, verbose, debug_mode, strip_mode=False, strip_io=False, vx_version=VX_VERSION_DEFAULT):
@@ -71,6 +122,16 @@ class GraphParser():
         self.debug_mode = debug_mode
         self.strip_mode = strip_mode
         self.strip_io = strip_io
+        self.pipeline_depth = 0
+        self.zero_copy = False
+        self.instances = 1
+        self.tiles = 1
+        self.perf_report = False
+        self.run_async = False
+        self.bench = False
+        self.harness = False
+        self.import_export = False
+        self.max_bytes_per_frame = 0
 
         if not vx_version in VX_VERSIONS:
             raise RuntimeError('OpenVX version %s is not supported.' % vx_version)
@@ -80,16 +141,163 @@ class GraphParser():
         self.image_nodes = ImageNodes(debug_mode)
         self.function_nodes = FunctionNodes(debug_mode)
         self.userdata = Userdata(debug_mode)
+        self.subgraph_templates = SubgraphTemplates(debug_mode)
         #Format checker only be initialized, NOT run during graphparser initialization time.
         #It can give meaningless results if the graph contains other errors,
         #therefore a dry-run for the code generation should be done first.
         self.image_format_checker = ImageNodeFormatChecker(debug_mode)
         self.validation_output_graph = [None, None]  # Init to a hardcoded empty graph
+        #Parameter objects used by the function nodes, populated during code generation of the create function
+        self.parameter_pool = ParameterObjectPool(debug_mode)
+
+        #Graph optimization passes, only run by optimize_graph
+        self.fuse_morphology = False
+        self.morphology_fusion = MorphologyChainFusion(debug_mode)
+        self.fold_uniform_images = False
+        self.uniform_folding = UniformImageFolding(debug_mode)
+
+        #Tiling analysis, only run by analyse_tiling
+        self.graph_tiling = GraphTiling(debug_mode)
+
+        #Static cost estimate, only run by analyse_cost
+        self.cost_model = CostModel(debug_mode)
+
+        #Parallelism analysis, only run by analyse_parallelism
+        self.parallelism_analysis = ParallelismAnalysis(debug_mode)
+
+        #Memory analysis of the internal images, only run by analyse_memory
+        self.memory_analysis = MemoryAnalysis(debug_mode)
+
+        #Reference execution with NumPy, only run by run_reference
+        self.reference_executor = ReferenceExecutor(debug_mode)
 
     def set_io_strip_mode(self):
         """ Set strip mode to also generate code for I/O-image setting"""
         self.strip_io = True
 
+    def set_pipeline_depth(self, pipeline_depth):
+        """ Set the number of buffers per I/O image for pipelined execution, 0 disables pipelining."""
+        if pipeline_depth > 0:
+            if not self.strip_mode:
+                raise RuntimeError('Pipelined execution is only supported in strip mode.')
+            if self.vx_version != VX_VERSION_1_2:
+                raise RuntimeError('Pipelined execution requires OpenVX version %s.' % VX_VERSION_1_2)
+        self.pipeline_depth = pipeline_depth
+
+    def set_zero_copy(self, zero_copy):
+        """ Enable or disable zero-copy I/O, where the I/O images are created from host memory
+        and new frames are bound by swapping the image handles."""
+        if zero_copy:
+            if not self.strip_mode:
+                raise RuntimeError('Zero-copy I/O is only supported in strip mode.')
+            if self.vx_version == VX_VERSION_1_0_1:
+                raise RuntimeError('Zero-copy I/O is not supported for OpenVX version %s.' % VX_VERSION_1_0_1)
+            if self.pipeline_depth > 0:
+                raise RuntimeError('Zero-copy I/O can not be combined with pipelined execution.')
+        self.zero_copy = zero_copy
+
+    def set_instances(self, instances):
+        """ Set the number of graph instances created by the generated create instances function, 1 disables it."""
+        if instances < 1:
+            raise RuntimeError('The number of graph instances must be at least 1.')
+        if instances > 1:
+            if not self.strip_mode:
+                raise RuntimeError('Multiple graph instances are only supported in strip mode.')
+            if self.pipeline_depth > 0:
+                raise RuntimeError('Multiple graph instances can not be combined with pipelined execution.')
+        self.instances = instances
+
+    def set_tiles(self, tiles):
+        """ Set the number of tiles (horizontal bands) that the images are split into for multi-threaded processing,
+        1 disables tiling."""
+        if tiles < 1:
+            raise RuntimeError('The number of tiles must be at least 1.')
+        if tiles > 1:
+            if not self.strip_mode:
+                raise RuntimeError('Tiled execution is only supported in strip mode.')
+            # The tiles are copied into the output images with vxCopyNode
+            if self.vx_version != VX_VERSION_1_2:
+                raise RuntimeError('Tiled execution requires OpenVX version %s.' % VX_VERSION_1_2)
+            if self.strip_io or self.pipeline_depth > 0 or self.instances > 1:
+                raise RuntimeError('Tiled execution can not be combined with I/O setting, pipelined execution or multiple instances.')
+        self.tiles = tiles
+
+    def set_perf_report(self, perf_report):
+        """ Enable or disable the performance report, where the create function keeps the function node handles
+        and a function is generated that prints the performance of each function node."""
+        if perf_report:
+            if not self.strip_mode:
+                raise RuntimeError('The performance report is only supported in strip mode.')
+            if self.vx_version == VX_VERSION_1_0_1:
+                raise RuntimeError('The performance report is not supported for OpenVX version %s.' % VX_VERSION_1_0_1)
+            if self.instances > 1 or self.tiles > 1:
+                raise RuntimeError('The performance report can not be combined with multiple instances or tiles.')
+        self.perf_report = perf_report
+
+    def set_run_async(self, run_async):
+        """ Enable or disable the double-buffered asynchronous run loop, which sets the I/O images
+        with the strip_io set function."""
+        if run_async:
+            if not self.strip_io:
+                raise RuntimeError('The asynchronous run loop is only supported in strip mode with I/O setting.')
+            # Pipelined graphs get their I/O images by enqueueing them, not with the strip_io set function
+            if self.pipeline_depth > 0:
+                raise RuntimeError('The asynchronous run loop can not be combined with pipelined execution.')
+        self.run_async = run_async
+
+    def set_bench(self, bench):
+        """ Enable or disable generation of the standalone benchmark sourcefile."""
+        if bench:
+            if not self.strip_mode:
+                raise RuntimeError('The benchmark is only supported in strip mode.')
+            if self.pipeline_depth > 0:
+                raise RuntimeError('The benchmark can not be combined with pipelined execution.')
+        self.bench = bench
+
+    def set_harness(self, harness):
+        """ Enable or disable generation of the sequence test harness sourcefile, which binds memory-mapped
+        frames to the I/O images with vxSwapImageHandle."""
+        if harness:
+            if not self.strip_mode:
+                raise RuntimeError('The test harness is only supported in strip mode.')
+            if self.vx_version == VX_VERSION_1_0_1:
+                raise RuntimeError('The test harness is not supported for OpenVX version %s.' % VX_VERSION_1_0_1)
+            if self.pipeline_depth > 0:
+                raise RuntimeError('The test harness can not be combined with pipelined execution.')
+        self.harness = harness
+
+    def set_import_export(self, import_export):
+        """ Enable or disable generation of the functions that export a verified graph to a blob and import it,
+        using the OpenVX import/export extension."""
+        if import_export:
+            if not self.strip_mode:
+                raise RuntimeError('Graph export and import is only supported in strip mode.')
+            if self.vx_version != VX_VERSION_1_2:
+                raise RuntimeError('Graph export and import requires OpenVX version %s.' % VX_VERSION_1_2)
+            if self.pipeline_depth > 0 or self.instances > 1 or self.tiles > 1:
+                raise RuntimeError('Graph export and import can not be combined with pipelined execution, multiple instances or tiles.')
+        self.import_export = import_export
+
+    def set_max_bytes_per_frame(self, max_bytes_per_frame):
+        """ Set the budget of bytes read and written per frame by all function nodes, 0 for no budget."""
+        if max_bytes_per_frame < 0:
+            raise RuntimeError('The budget of bytes per frame can not be negative.')
+        self.max_bytes_per_frame = max_bytes_per_frame
+
+    def set_fuse_morphology(self, fuse_morphology):
+        """ Enable or disable fusion of morphology node chains.
+
+        Can be overridden per graph by the graph option [fuse_morphology true/false] in the userdata node.
+        """
+        self.fuse_morphology = fuse_morphology
+
+    def set_fold_uniform_images(self, fold_uniform_images):
+        """ Enable or disable folding of arithmetic nodes with uniform input images.
+
+        Can be overridden per graph by the graph option [fold_uniform_images true/false] in the userdata node.
+        """
+        self.fold_uniform_images = fold_uniform_images
+
     def set_function_node_library(self, library):
         """Set the function node library to be used.
 
@@ -105,15 +313,22 @@ class GraphParser():
         """
         file_name, file_extension = os.path.splitext(file_path)
         self.graphname = os.path.basename(file_name)
+        self.graph_file_path = file_path
         self.graph = minidom.parse(file_path)
         self.validation_output_graph = self.graph.cloneNode(True)
+        # The group nodes are only kept in the validation graph
+        self.subgraph_templates.run(self.graph)
+        if self.verbose and self.subgraph_templates.templates:
+            print "Found {} group nodes with {} distinct subgraph templates".format(
+                self.subgraph_templates.get_nbr_copies(), len(self.subgraph_templates.templates))
         # Populate all node related lists
         has_errors = self.userdata.populate_userdata(self.graph, self.validation_output_graph)
         self.graph_has_errors |= has_errors
 
         has_errors = self.image_nodes.populate_image_nodes_lists(self.graph,
                                                                  self.userdata,
-                                                                 self.validation_output_graph)
+                                                                 self.validation_output_graph,
+                                                                 self.subgraph_templates)
         self.graph_has_errors |= has_errors
 
         self.function_nodes.populate_function_nodes_indexed_lists(self.graph, self.library, self.image_nodes)
@@ -122,9 +337,170 @@ class GraphParser():
         has_errors, self.validation_output_graph = self.image_format_checker.check_graph_image_formats(self.graph,
                                                                                                        self.image_nodes,
                                                                                                        self.function_nodes,
-                                                                                                       self.library)
+                                                                                                       self.library,
+                                                                                                       self.subgraph_templates)
+        self.image_format_checker.check_function_node_targets(self.function_nodes, self.userdata, self.library)
         return has_errors
 
+    def write_validation_graph(self, file_path):
+        """Writes the validation/error graph to file_path.
+
+        The loaded graph file is copied, with the label, fill and geometry of the annotated nodes rewritten.
+        """
+        validation_graph_writer.write_validation_graph(self.graph_file_path, self.validation_output_graph, file_path)
+
+    def verify_pipeline_io_images(self):
+        """Checks that the graph can be executed pipelined.
+
+        Each input and output image is enqueued on its graph parameters, see get_io_graph_parameters.
+        I/O images that are not connected to any function node have no graph parameter to be enqueued on,
+        and are marked as errors.
+        Returns True if errors were found.
+        """
+        has_errors = False
+        io_indices = set([io_index for io_string, node_index, parameter_index, io_index in self.get_io_graph_parameters()])
+        io_image_ids = self.image_nodes.input_nodes_indexed_names + self.image_nodes.output_nodes_indexed_names
+        for io_index, image_id in enumerate(io_image_ids):
+            if io_index not in io_indices:
+                print "ERROR: I/O image {} is not connected to any function node, " \
+                      "which is not supported for pipelined execution".format(image_id)
+                has_errors = True
+                for node in self.graph.getElementsByTagName('node'):
+                    if node.attributes["id"].value == image_id:
+                        parse_common.set_text_on_node(self.validation_output_graph, node,
+                                                      "Pipelined I/O\nimage is not\nconnected", 'Red', True)
+
+        return has_errors
+
+    def get_io_graph_parameters(self):
+        """ Get the function node parameters that are bound to graph parameters for the I/O images.
+
+        Each I/O image is a graph parameter bound to its first function node parameter, in the order
+        of the input images followed by the output images. Since a graph parameter can only be bound to
+        one function node parameter, each further function node parameter connected to an I/O image
+        is bound to an extra graph parameter, after the graph parameters of all I/O images.
+        :return: A list of (io_string, function node index, node parameter index, I/O index) tuples,
+                 one per graph parameter, where io_string is 'input' or 'output', the function node index
+                 is the index in the input or output function node list and the I/O index is the index of
+                 the input image, or the number of input images plus the index of the output image.
+                 The list is computed once and must not be changed by the caller.
+        """
+        self.function_nodes_list_check()
+        return self.function_nodes.get_io_graph_parameters(self.image_nodes)
+
+    def get_io_graph_parameters_for_node(self, node):
+        """ Get the node parameters of a function node that are bound to graph parameters for the I/O images.
+        :param node: The function node.
+        :return: A list of (node parameter index, I/O graph parameter index) tuples, where the I/O graph parameter
+                 index is the index in the list returned by get_io_graph_parameters.
+        """
+        self.function_nodes_list_check()
+        return self.function_nodes.get_io_graph_parameters_for_node(node, self.image_nodes)
+
+    def optimize_graph(self):
+        """Runs the enabled graph optimization passes.
+
+        Must be called after verify_graph_image_formats and before the final code generation.
+        """
+        fold_uniform_images = self.userdata.get_graph_option('fold_uniform_images',
+                                                             'true' if self.fold_uniform_images else 'false') == 'true'
+        # Folding is run first, since removed identity nodes can make longer morphology chains possible
+        if fold_uniform_images:
+            nbr_removed_nodes, nbr_folded_nodes = self.uniform_folding.run(self.function_nodes, self.image_nodes,
+                                                                           self.image_format_checker, self.library)
+            if self.verbose:
+                print "Uniform image folding removed " + str(nbr_removed_nodes) + " function nodes and folded " + \
+                      str(nbr_folded_nodes) + " function nodes into lookup tables"
+
+        fuse_morphology = self.userdata.get_graph_option('fuse_morphology',
+                                                         'true' if self.fuse_morphology else 'false') == 'true'
+        # vxNonLinearFilterNode is not available in OpenVX 1.0.1
+        if fuse_morphology and self.vx_version != VX_VERSION_1_0_1:
+            nbr_removed_nodes = self.morphology_fusion.run(self.function_nodes, self.image_nodes, self.library)
+            if self.verbose:
+                print "Morphology fusion removed " + str(nbr_removed_nodes) + " function nodes"
+
+    def analyse_tiling(self):
+        """Analyses if the graph can be tiled, and prints a warning if it falls back to whole-image processing.
+
+        Must be called after optimize_graph and before the final code generation.
+        """
+        if not self.graph_tiling.run(self.function_nodes, self.image_nodes, self.library, self.morphology_fusion):
+            print "WARNING: The graph can not be tiled, since " + self.graph_tiling.reason + \
+                  ", falling back to whole-image mode"
+        elif self.verbose:
+            print "Tiled execution with " + str(self.tiles) + " tiles and a halo of " + \
+                  str(self.graph_tiling.halo) + " rows"
+
+    def analyse_cost(self, frame_size):
+        """Estimates the cost of each function node for input images of frame_size (width, height)
+        if their size is not given in the graph.
+
+        Returns True if the graph exceeds the budget of bytes per frame.
+        Must be called after optimize_graph.
+        """
+        self.cost_model.run(self.function_nodes, self.image_nodes, self.userdata, self.image_format_checker,
+                            self.library, self.morphology_fusion, frame_size)
+        total_bytes = self.cost_model.get_total_bytes()
+        if self.verbose:
+            print "Estimated cost per frame: " + str(total_bytes) + " bytes read and written, " + \
+                  str(self.cost_model.total_ops) + " operations"
+        if self.max_bytes_per_frame > 0 and total_bytes > self.max_bytes_per_frame:
+            print "ERROR: The graph reads and writes an estimated " + str(total_bytes) + \
+                  " bytes per frame, which exceeds the budget of " + str(self.max_bytes_per_frame) + " bytes"
+            return True
+        return False
+
+    def get_cost_report(self):
+        """Returns the per-node and total cost estimates of analyse_cost as a dictionary."""
+        report = self.cost_model.get_report()
+        report['graph'] = self.graphname
+        report['max_bytes_per_frame'] = self.max_bytes_per_frame
+        return report
+
+    def analyse_parallelism(self, highlight_critical_path=False):
+        """Analyses the topological levels, the critical path and the fan-in/fan-out of the function nodes.
+
+        If highlight_critical_path is True, the function nodes and images of the critical path by cost
+        are highlighted in the validation graph.
+        Must be called after analyse_cost, which gives the cost of each node.
+        """
+        node_costs = dict([(node_cost['id'], node_cost['ops']) for node_cost in self.cost_model.node_costs])
+        self.parallelism_analysis.run(self.function_nodes, node_costs)
+        if highlight_critical_path:
+            parse_common.set_color_on_nodes(self.validation_output_graph,
+                                            set(self.parallelism_analysis.critical_path_cost_nodes +
+                                                self.parallelism_analysis.critical_path_image_ids),
+                                            'Yellow')
+
+    def get_parallelism_report(self):
+        """Returns the result of analyse_parallelism as a dictionary."""
+        report = self.parallelism_analysis.get_report()
+        report['graph'] = self.graphname
+        return report
+
+    def analyse_memory(self):
+        """Analyses the live bytes of the internal images, for the topological order and the order with the smallest peak.
+
+        Must be called after analyse_cost, which gives the size of each image.
+        """
+        image_bytes = dict([(image_id, self.cost_model.get_image_bytes(image_id))
+                            for image_id in self.cost_model.image_sizes])
+        self.memory_analysis.run(self.function_nodes, self.image_nodes, image_bytes)
+
+    def get_memory_report(self):
+        """Returns the result of analyse_memory as a dictionary."""
+        report = self.memory_analysis.get_report()
+        report['graph'] = self.graphname
+        return report
+
+    def run_reference(self, input_images, userdata_values=None):
+        """Executes the graph with the NumPy reference executor and returns the list of output images.
+
+        Must be called after optimize_graph.
+        """
+        return self.reference_executor.run(self, input_images, userdata_values)
+
     def function_nodes_list_check(self):
         if not self.function_nodes.lists_populated:
             raise RuntimeError('The FunctionNodes class instance must populate its function node lists before this function is called.')
@@ -204,6 +580,23 @@ class GraphParser():
             (is_userdata, value) = image_attributes.get_image_attribute(self.userdata, attribute)
             return is_userdata, value
 
+    def get_image_formats(self, node_id):
+        """ Get the values used in the generated code for creating a specific image node.
+        :param node_id: The id of the image node.
+        :return: A tuple containing (width, height, image_format, parsed_image_format) where:
+        width and height are prefixed with opts-> if they reference userdata,
+        image_format is the image format from the format checker and
+        parsed_image_format is the vx_df_image_e attribute, or its default value if it is not specified.
+        """
+        image_attributes = self.image_nodes.get_image_attributes(node_id)
+        if image_attributes is None:
+            raise RuntimeError("No image attributes could be found for node with id: {}".format(node_id))
+        if image_attributes.resolved_values['vx_df_image_e'][0]:
+            raise TypeError("Attribute {} is of string type and can not be used as userdata input".format(
+                image_attributes.resolved_values['vx_df_image_e'][1]))
+        return (image_attributes.code_values['width'], image_attributes.code_values['height'],
+                self.get_image_format(node_id), image_attributes.code_values['vx_df_image_e'])
+
     def get_image_format(self, node_id):
         """ Get the image format for a specific image node.
         :param node_id: The id of the image node.
@@ -223,6 +616,14 @@ class GraphParser():
             print "ERROR: node id is not in uniform image nodes list"
             raise
 
+    def get_function_node_target(self, node):
+        """ Get the execution target for a specific function node.
+        :param node: The function node.
+        :return: The target given by [vx_target ...] in the node data, otherwise the graph-wide
+                 target given in the userdata node, or an empty string if no target is given.
+        """
+        return parse_common.get_function_node_target(node, self.userdata)
+
     def is_function_io_node(self, current_node, node_info):
         return ( any(e in node_info.input_image_node_ids for e in self.get_indexed_names('input_image_nodes')) or \
                  any(e in node_info.output_image_node_ids for e in self.get_indexed_names('output_image_nodes')) or \
@@ -233,6 +634,18 @@ class GraphParser():
         return ( any(e in node_info.input_image_node_ids for e in self.get_indexed_names('debug_image_nodes')) or \
                  any(e in node_info.output_image_node_ids for e in self.get_indexed_names('debug_image_nodes')) )
 
+    def get_function_node_validation_key(self, node):
+        """Returns a key for reusing the validation of a function node in the dry-run.
+
+        The validation of a function node only depends on its function name, its data text and the number
+        and labels of its edges. Nodes in copies of a subgraph template have the same function name and data text
+        as their prototype node, but the edges to images outside the group may differ, so the key is the id of
+        the prototype node together with the edge labels.
+        """
+        node_info = self.get_function_node_info(node)
+        return (self.subgraph_templates.get_prototype_id(node.attributes["id"].value),
+                tuple(sorted(node_info.input_edge_labels)), tuple(sorted(node_info.output_edge_labels)))
+
     def is_function_dynamic_node(self, current_node):
         return any(e[0] == current_node for e in self.get_dynamic_function_nodes_info())
 
@@ -2,10 +2,30 @@
 """
 
 import re #Module for regexp expressions
+import multiprocessing
 import parse_common
 
+# Smallest number of function nodes in a graph for checking its weakly connected components in a process pool.
+# Smaller graphs are checked in the parser process, since starting the processes takes longer than the check.
+MIN_PARALLEL_FUNCTION_NODES = 200
+
+def check_components(arguments):
+    """Checks the image formats of a batch of components in a worker process of the process pool.
+
+    arguments is a (debug_mode, components, valid_formats) tuple, see ImageNodeFormatChecker.check_components.
+    """
+    debug_mode, components, valid_formats = arguments
+    return ImageNodeFormatChecker(debug_mode).check_components(components, valid_formats)
+
 class ImageNodeFormatChecker:
-    """Class that..."""
+    """Class that checks and sets the image formats of the image nodes, from the input images through the function nodes.
+
+    The graph is split into its weakly connected components, i.e. the function nodes that are connected through images
+    regardless of the edge directions, and each component is checked independently. The check of a component only uses
+    plain data (ids and formats) and returns its processed images and its annotations of the validation graph,
+    so large graphs with several components are checked in a process pool. The results are merged in the order
+    of the first function node of each component in the graph, so the result does not depend on the number of processes.
+    """
     def __init__(self, debug_mode):
         self.debug_mode = debug_mode
         #Processed image node lists for id and format
@@ -14,14 +34,18 @@ class ImageNodeFormatChecker:
         self.PIN_ID = []
         self.PIN_FORMAT = []
         self.validation_output_graph = [None, None]
+        # Dictionary with a (prototype node id, input image formats) tuple as key and the list of output image formats
+        # as value, for the function nodes in subgraph templates that have been checked
+        self.template_output_formats = {}
+        # List of (node id, text, highlight color, resize) tuples for the validation graph, from the component being checked
+        self.annotations = []
 
     # ========================================
     # Graph image format check related methods
     # ========================================
-    def check_graph_image_formats(self, graph, image_nodes, function_nodes, library):
+    def check_graph_image_formats(self, graph, image_nodes, function_nodes, library, subgraph_templates):
         """Parses the graph and checks that all function nodes' input and output image formats are consistent
 
-        parse graph xml for all function nodes with id not on processed fkn nodes (PFN) list
         The code assumes the check that all input images have specified formats, has been done already
         The code also assumes that the number of input/output legs for the node is consistent with the node requirements
         (and thus the function node library)
@@ -29,67 +53,234 @@ class ImageNodeFormatChecker:
         OBS when matching, need to match per In1/In2 and Out1/Out2 for multiple legs
         What about other formats than images, algo. should handle this as well...
 
+        The check of a component stops at the first function node with incompatible formats,
+        the other components are still checked so that all their errors are shown in the validation graph.
+
+        Function nodes in copies of a subgraph template are not checked again if the corresponding
+        prototype node has been checked with the same input image formats, the output image formats are reused.
+
         Return a tuple (has_errors, validation_output_graph)
         """
         self.validation_output_graph = graph.cloneNode(True)
+        self.template_output_formats = {}
         has_errors = False
 
-        #Create processed image node [id,format] list and initialize Processed Function Nodes list (PFN)
-        [PIN_ID, PIN_FORMAT, PFN] = self.create_processed_nodes_lists(graph, image_nodes)
+        #Create processed image node [id,format] list
+        [PIN_ID, PIN_FORMAT] = self.create_processed_nodes_lists(graph, image_nodes)
         if self.debug_mode:
             print "Input node list: " + str(PIN_ID)
 
+        nodes = dict([(node.attributes["id"].value, node) for node in graph.getElementsByTagName('node')])
+        components = self.get_components(graph, function_nodes, subgraph_templates, PIN_ID, PIN_FORMAT)
+        function_names = set([function_name for component in components for node_id, function_name, input_ids, output_ids,
+                              prototype_id in component[0]])
+        valid_formats = dict([(function_name, (library.VALID_INPUT_IMAGE_FORMATS.get(function_name, [[]]),
+                                               library.VALID_OUTPUT_IMAGE_FORMATS.get(function_name, [[]])))
+                              for function_name in function_names])
+
+        for component_has_errors, image_ids, image_formats, annotations in self.run_component_checks(components, valid_formats):
+            has_errors |= component_has_errors
+            PIN_ID += image_ids
+            PIN_FORMAT += image_formats
+            for node_id, text, highlight_color, resize in annotations:
+                parse_common.set_text_on_node(self.validation_output_graph, nodes[node_id], text, highlight_color, resize)
+
+        # Save the unique format lists for use when we generate the code
+        # with explicit image formats.
+        self.PIN_ID = PIN_ID
+        self.PIN_FORMAT = PIN_FORMAT
+        return has_errors, self.validation_output_graph
+
+    def get_components(self, graph, function_nodes, subgraph_templates, PIN_ID, PIN_FORMAT):
+        """Splits the function nodes of the graph into weakly connected components.
+
+        Returns a list with a (nodes, specified_formats, input_formats) tuple for each component,
+        in the order of the first function node of each component in the graph.
+        nodes is a list with a (node id, function name, input image ids, output image ids, prototype id) tuple for each
+        function node of the component in graph order, where the prototype id is None if the node is not in a subgraph template.
+        specified_formats is a dictionary with the image format specified in the graph (or VIRT) for each image id,
+        and input_formats a dictionary with the format of each already processed image (e.g. the input images).
+        """
+        specified_formats = {}
+        parents = {}
+        nodes = []
+        for node in graph.getElementsByTagName('node'):
+            specified_formats[node.attributes["id"].value] = self.get_image_format_from_datatext(parse_common.get_node_datatext(node))
+            if not self.node_is_function_node(node):
+                continue
+            node_id = node.attributes["id"].value
+            node_info = function_nodes.get_node_info(node)
+            nodes.append((node_id, function_nodes.get_function_node_name(node), list(node_info.input_image_node_ids),
+                          list(node_info.output_image_node_ids), self.get_prototype_id(subgraph_templates, node_id, node_info)))
+            # Union of the node and its images
+            root = self.find_component_root(parents, node_id)
+            for image_id in node_info.input_image_node_ids + node_info.output_image_node_ids:
+                parents[self.find_component_root(parents, image_id)] = root
+
+        processed_formats = dict(zip(PIN_ID, PIN_FORMAT))
+        components = {}
+        roots = []
+        for node in nodes:
+            root = self.find_component_root(parents, node[0])
+            if root not in components:
+                components[root] = ([], {}, {})
+                roots.append(root)
+            component_nodes, component_specified_formats, component_input_formats = components[root]
+            component_nodes.append(node)
+            for image_id in node[2] + node[3]:
+                component_specified_formats[image_id] = specified_formats[image_id]
+                if image_id in processed_formats:
+                    component_input_formats[image_id] = processed_formats[image_id]
+        return [components[root] for root in roots]
+
+    def find_component_root(self, parents, node_id):
+        """Returns the root of the component of node_id in the union-find forest given by parents."""
+        parents.setdefault(node_id, node_id)
+        while parents[node_id] != node_id:
+            parents[node_id] = parents[parents[node_id]]
+            node_id = parents[node_id]
+        return node_id
+
+    def get_prototype_id(self, subgraph_templates, node_id, node_info):
+        """Returns the id of the prototype of the function node, or None if the node is not in a subgraph template.
+
+        The output image formats only depend on the template if the output images are in the template as well.
+        """
+        for image_id in [node_id] + node_info.output_image_node_ids:
+            if image_id not in subgraph_templates.group_member_ids:
+                return None
+        return subgraph_templates.get_prototype_id(node_id)
+
+    def run_component_checks(self, components, valid_formats):
+        """Checks the components, in a process pool if the graph is large, and returns their results in component order.
+
+        Each process checks a contiguous batch of components with about the same number of function nodes,
+        so that copies of a subgraph template in the batch reuse the checked output image formats.
+        """
+        nbr_function_nodes = sum([len(component[0]) for component in components])
+        nbr_processes = min(multiprocessing.cpu_count(), len(components))
+        if nbr_processes < 2 or nbr_function_nodes < MIN_PARALLEL_FUNCTION_NODES:
+            return self.check_components(components, valid_formats)
+
+        batches = [[]]
+        nbr_batch_function_nodes = 0
+        for component in components:
+            if nbr_batch_function_nodes * nbr_processes >= nbr_function_nodes * len(batches):
+                batches.append([])
+            batches[-1].append(component)
+            nbr_batch_function_nodes += len(component[0])
+        if self.debug_mode:
+            print "Checking the image formats of {} components in {} processes".format(len(components), len(batches))
+
+        pool = multiprocessing.Pool(len(batches))
+        try:
+            results = pool.map(check_components, [(self.debug_mode, batch, valid_formats) for batch in batches])
+        finally:
+            pool.close()
+            pool.join()
+        return [result for batch_results in results for result in batch_results]
+
+    def check_components(self, components, valid_formats):
+        """Returns a list with the result of check_component for each of the components."""
+        return [self.check_component(component, valid_formats) for component in components]
+
+    def check_component(self, component, valid_formats):
+        """Checks the image formats of the function nodes of a component, see get_components.
+
+        The function nodes are processed in graph order as soon as the formats of all their input images are known.
+        valid_formats is a dictionary with the function name as key and the valid
+        (input image formats, output image formats) of the function node library as value.
+        Returns a (has_errors, image ids, image formats, annotations) tuple with the processed output images
+        and the annotations of the validation graph.
+        """
+        nodes, specified_formats, processed_formats = component
+        processed_formats = dict(processed_formats)
+        PIN_ID = []
+        PIN_FORMAT = []
+        PFN = set()
+        self.annotations = []
+
         unprocessed_function_node_found = True
         while unprocessed_function_node_found == True:
             unprocessed_function_node_found = False
-            for node in graph.getElementsByTagName('node'):
-                if self.node_is_unprocessed_function_node(node, PFN) and self.node_input_image_formats_fully_specified(function_nodes, node, PIN_ID):
-                    if self.debug_mode:
-                        print "\nPARSING NEW NODE*******************************************************************"
-                    unprocessed_function_node_found = True
-                    node_info = function_nodes.get_node_info(node)
-                    PFN.append(node.attributes["id"].value)
-                    input_image_specified_format_list = self.create_image_format_list_from_image_id_list(graph, image_nodes, node_info, PIN_ID, PIN_FORMAT)
-                    output_image_specified_format_list = self.create_output_image_specified_format_list(graph, image_nodes, node_info)
-                    valid_input_formats = library.VALID_INPUT_IMAGE_FORMATS.get(function_nodes.get_function_node_name(node), [[]])
-                    valid_output_formats = library.VALID_OUTPUT_IMAGE_FORMATS.get(function_nodes.get_function_node_name(node), [[]])
-                    [compatible_input_formats, compatible_output_formats, dim_check_ok] = self.create_compatible_io_lists(node, valid_input_formats, valid_output_formats, input_image_specified_format_list)
-
-                    if not dim_check_ok:
-                        has_errors = True
-                        return has_errors, self.validation_output_graph
-
-                    #Do this fkn call from inside the set fkn on the line below.
-                    [explicit_format_list, virt_format_list] = self.separate_virt_from_explicit_formats(compatible_output_formats)
-                    success = self.set_unique_output_image_format_list(graph, node_info, output_image_specified_format_list, virt_format_list, explicit_format_list, PIN_ID, PIN_FORMAT)
-
-                    if success:
-                        # Save the unique format lists for use when we generate the code
-                        # with explicit image formats.
-                        self.PIN_ID = PIN_ID
-                        self.PIN_FORMAT = PIN_FORMAT
-                    else:
-                        # Stop and return if incompatible function node image formats found.
-                        has_errors = True
-                        return has_errors, self.validation_output_graph
-
-                    if self.debug_mode:
-                        print "NODE FULLY SPECIFIED. id = " + node.attributes["id"].value
-                        print "node_info.input_image_node_ids = " + str(node_info.input_image_node_ids)
-                        print "valid_input_formats" + str(valid_input_formats)
-                        print "valid_output_formats" + str(valid_output_formats)
-
-                        print "INPUT IMAGE SPECIFIED (by graph or previous parsing) FORMAT LIST = " + str(input_image_specified_format_list)
-                        print "OUTPUT IMAGE SPECIFIED (by graph or previous parsing) FORMAT LIST = " + str(output_image_specified_format_list)
-                        print "COMPATIBLE INPUT IMAGE FORMAT LIST = " + str(compatible_input_formats)
-                        print "COMPATIBLE OUTPUT IMAGE FORMAT LIST = " + str(compatible_output_formats)
-                        print "virt format list is: " + str(virt_format_list)
-                        print "explicit format list is: " + str(explicit_format_list)
-
-                        print "PIN_ID = " + str(PIN_ID)
-                        print "PIN_FORMAT = " + str(PIN_FORMAT)
+            for node_id, function_name, input_ids, output_ids, prototype_id in nodes:
+                if node_id in PFN or not self.node_input_image_formats_fully_specified(node_id, input_ids, processed_formats):
+                    continue
+                if self.debug_mode:
+                    print "\nPARSING NEW NODE*******************************************************************"
+                unprocessed_function_node_found = True
+                PFN.add(node_id)
+                template_key = None
+                if prototype_id is not None:
+                    template_key = prototype_id, tuple([processed_formats[image_id] for image_id in input_ids])
+                if template_key in self.template_output_formats:
+                    output_formats = self.template_output_formats[template_key]
+                    for image_id, output_image_format in zip(output_ids, output_formats):
+                        self.annotations.append((image_id, output_image_format, 'Green', False))
+                    self.add_processed_images(output_ids, output_formats, processed_formats, PIN_ID, PIN_FORMAT)
+                    continue
+                input_image_specified_format_list = self.create_image_format_list_from_image_id_list(input_ids, specified_formats, processed_formats)
+                output_image_specified_format_list = [specified_formats[image_id] for image_id in output_ids]
+                valid_input_formats, valid_output_formats = valid_formats[function_name]
+                [compatible_input_formats, compatible_output_formats, dim_check_ok] = self.create_compatible_io_lists(node_id, valid_input_formats, valid_output_formats, input_image_specified_format_list)
+
+                if not dim_check_ok:
+                    return True, PIN_ID, PIN_FORMAT, self.annotations
+
+                #Do this fkn call from inside the set fkn on the line below.
+                [explicit_format_list, virt_format_list] = self.separate_virt_from_explicit_formats(compatible_output_formats)
+                success = self.set_unique_output_image_format_list(output_ids, output_image_specified_format_list, virt_format_list, explicit_format_list, processed_formats, PIN_ID, PIN_FORMAT)
+
+                if not success:
+                    # Stop and return if incompatible function node image formats found.
+                    return True, PIN_ID, PIN_FORMAT, self.annotations
+                if template_key is not None:
+                    self.template_output_formats[template_key] = [processed_formats[image_id] for image_id in output_ids]
 
-        return has_errors, self.validation_output_graph
+                if self.debug_mode:
+                    print "NODE FULLY SPECIFIED. id = " + node_id
+                    print "node_info.input_image_node_ids = " + str(input_ids)
+                    print "valid_input_formats" + str(valid_input_formats)
+                    print "valid_output_formats" + str(valid_output_formats)
+
+                    print "INPUT IMAGE SPECIFIED (by graph or previous parsing) FORMAT LIST = " + str(input_image_specified_format_list)
+                    print "OUTPUT IMAGE SPECIFIED (by graph or previous parsing) FORMAT LIST = " + str(output_image_specified_format_list)
+                    print "COMPATIBLE INPUT IMAGE FORMAT LIST = " + str(compatible_input_formats)
+                    print "COMPATIBLE OUTPUT IMAGE FORMAT LIST = " + str(compatible_output_formats)
+                    print "virt format list is: " + str(virt_format_list)
+                    print "explicit format list is: " + str(explicit_format_list)
+
+                    print "PIN_ID = " + str(PIN_ID)
+                    print "PIN_FORMAT = " + str(PIN_FORMAT)
+
+        return False, PIN_ID, PIN_FORMAT, self.annotations
+
+    def add_processed_images(self, image_ids, image_formats, processed_formats, PIN_ID, PIN_FORMAT):
+        """Adds the output images of a function node with their formats to the processed image lists."""
+        for image_id, image_format in zip(image_ids, image_formats):
+            if image_id not in processed_formats:
+                processed_formats[image_id] = image_format
+                PIN_ID.append(image_id)
+                PIN_FORMAT.append(image_format)
+            else:
+                raise NameError('Duplicate ids in PIN_ID list.')
+
+    def check_function_node_targets(self, function_nodes, userdata, library):
+        """Warns about function nodes with an execution target they are not known to be supported on.
+
+        The known supported function nodes for each target are given by TARGET_SUPPORTED_NODES
+        in the function node library. Targets that are not in the table are not checked.
+        Unsupported targets only give warnings, since the OpenVX
+        implementation decides which kernels are available on which target.
+        """
+        for node in function_nodes.indexed_function_nodes:
+            target = parse_common.get_function_node_target(node, userdata)
+            if target not in library.TARGET_SUPPORTED_NODES:
+                continue
+            function_name = function_nodes.get_function_node_name(node)
+            if function_name not in library.TARGET_SUPPORTED_NODES[target]:
+                print "WARNING: Function node {} ({}) is not known to be supported on target {}".format(
+                    node.attributes["id"].value, function_name, target)
 
     def create_processed_nodes_lists(self, graph, image_nodes):
         """Creates the initial Processed Image Nodes (PIN) lists
@@ -107,7 +298,6 @@ class ImageNodeFormatChecker:
             parse_common.set_text_on_node(self.validation_output_graph, node, image_format, 'Green', False)
             PIN_ID.append(item)
             PIN_FORMAT.append(image_format)
-            PFN = []
 
 
         for item in image_nodes.uniform_input_image_indexed_names:
@@ -117,9 +307,8 @@ class ImageNodeFormatChecker:
             parse_common.set_text_on_node(self.validation_output_graph, node, image_format, 'Green', False)
             PIN_ID.append(item)
             PIN_FORMAT.append(image_format)
-            PFN = []
 
-        return [PIN_ID, PIN_FORMAT, PFN]
+        return [PIN_ID, PIN_FORMAT]
 
     def get_node_with_id(self, graph, node_id):
         """Returns the node with the id number specified in 'node_id'."""
@@ -145,53 +334,42 @@ class ImageNodeFormatChecker:
             image_format = temp.group(1)
         return image_format
 
-    def node_is_unprocessed_function_node(self, node, PFN):
-        """Checks if a function node is currently unprocessed by the image format parser
+    def node_is_function_node(self, node):
+        """Checks if a node is a function node, i.e. drawn with one of the function node shapes."""
+        node_appearance_list = node.getElementsByTagName('y:GenericNode')
+        if len(node_appearance_list) > 0:
+            configuration = node_appearance_list[0].attributes["configuration"].value
+            return configuration in ["com.yworks.flowchart.start1", "com.yworks.flowchart.start2"]
+        return False
 
-        All processed function nodes are stored in the Processed Function Nodes (PFN) list.
-        """
-        unprocessed_function_node_found = False
-        if node.attributes["id"].value not in PFN:
-            node_appearance_list = node.getElementsByTagName('y:GenericNode')
-            if len(node_appearance_list) > 0:
-                node_appearance = node_appearance_list[0]
-                if (node_appearance.attributes["configuration"].value == "com.yworks.flowchart.start1")\
-                        or (node_appearance.attributes["configuration"].value == "com.yworks.flowchart.start2"):
-                    unprocessed_function_node_found = True
-
-        return unprocessed_function_node_found
-
-    def node_input_image_formats_fully_specified(self, function_nodes, node, PIN_ID):
+    def node_input_image_formats_fully_specified(self, node_id, input_ids, processed_formats):
         """Checks if all input image formats for a function node are fully specified
 
-        Returns True if the function node specified by 'node'
-        has uniquely defined image formats, stored in the PIN_ID vector.
+        Returns True if all input images of the function node
+        have uniquely defined image formats, stored in processed_formats.
         """
-        node_info = function_nodes.get_node_info(node)
         missing_input_format_spec = False
-        for node_id in node_info.input_image_node_ids:
-            #print "INPUT: " + node_id
-            if node_id not in PIN_ID:
+        for image_id in input_ids:
+            if image_id not in processed_formats:
                 missing_input_format_spec = True
                 if self.debug_mode:
-                    print "MISSING INPUT FOR NODE " + node.attributes["id"].value + " IS IMAGE NODE: " + node_id
+                    print "MISSING INPUT FOR NODE " + node_id + " IS IMAGE NODE: " + image_id
         return not missing_input_format_spec
 
-    def create_image_format_list_from_image_id_list(self, graph, image_nodes, node_info, PIN_ID, PIN_FORMAT):
+    def create_image_format_list_from_image_id_list(self, input_ids, specified_formats, processed_formats):
         """Create list of in image formats as they are specified in the graph
 
         (Or as specified by the output from the
         previous function node if they are specified as Virt)
-        If they are not specified in the graph,
-        get_image_format_from_image_node_id should return the format as VIRT by default.
+        If they are not specified in the graph, the specified format is VIRT.
         """
         input_image_format_list = []
-        for node_id in node_info.input_image_node_ids:
-            input_image_format = self.get_image_format_from_image_node_id(graph, image_nodes, node_id)
+        for image_id in input_ids:
+            input_image_format = specified_formats[image_id]
             if self.debug_mode:
                 print "INPUT IMAGE FORMAT = " + input_image_format
-            if input_image_format == 'VIRT' and node_id in PIN_ID:
-                input_image_format = PIN_FORMAT[PIN_ID.index(node_id)]
+            if input_image_format == 'VIRT' and image_id in processed_formats:
+                input_image_format = processed_formats[image_id]
                 if self.debug_mode:
                     print "MODIFIED INPUT IMAGE FORMAT = " + input_image_format
             input_image_format_list.append(input_image_format)
@@ -204,18 +382,7 @@ class ImageNodeFormatChecker:
         datatext = parse_common.get_node_datatext(node)
         return self.get_image_format_from_datatext(datatext)
 
-    def create_output_image_specified_format_list(self, graph, image_nodes, node_info):
-        """Create list of output image formats as they are specified in the graph
-
-        Uses VIRT for every image node that does not specify a format in the graph.
-        """
-        output_image_specified_format_list = []
-        for node_id in node_info.output_image_node_ids:
-            output_image_specified_format_list.append(self.get_image_format_from_image_node_id(graph, image_nodes, node_id))
-
-        return output_image_specified_format_list
-
-    def create_compatible_io_lists(self, node, valid_input_formats, valid_output_formats, input_image_format_list):
+    def create_compatible_io_lists(self, node_id, valid_input_formats, valid_output_formats, input_image_format_list):
         """Creates the compatible io lists from the input_image_format_list
 
         It takes the list named valid_input_formats and picks out the compatible format list entries,
@@ -242,10 +409,10 @@ class ImageNodeFormatChecker:
 
         #Length checks for io image formats. output must have at least two entries, one explicit and one virtual.
         if len(compatible_input_formats) < 1:
-            parse_common.set_text_on_node(self.validation_output_graph, node, "Input image format not valid.", 'Red', True)
+            self.annotations.append((node_id, "Input image format not valid.", 'Red', True))
             dim_check_ok = False
         elif len(compatible_output_formats) < 2:
-            parse_common.set_text_on_node(self.validation_output_graph, node, "No compatible output image format found.", 'Red', True)
+            self.annotations.append((node_id, "No compatible output image format found.", 'Red', True))
             dim_check_ok = False
 
         return [compatible_input_formats, compatible_output_formats, dim_check_ok]
@@ -277,30 +444,26 @@ class ImageNodeFormatChecker:
 
         return [explicit_format_list, virt_format_list]
 
-    def set_unique_output_image_format_list(self, graph, node_info, output_image_specified_format_list, virt_format_list, explicit_format_list, PIN_ID, PIN_FORMAT):
-        """Sets the final unique output image format for each output image node of the node that generated 'node_info'
+    def set_unique_output_image_format_list(self, output_ids, output_image_specified_format_list, virt_format_list, explicit_format_list, processed_formats, PIN_ID, PIN_FORMAT):
+        """Sets the final unique output image format for each output image node in output_ids
 
         The id's of the output images and their corresponding formats are stored
         in the Processed Imaged Nodes ID list (PIN_ID) and
         in the Processed Imaged Nodes format list (PIN_FORMAT) respectively.
         """
         success = True
+        output_formats = []
         for idx, specified_image_format in enumerate(output_image_specified_format_list):
-            image_node = self.get_node_with_id(graph, node_info.output_image_node_ids[idx])
             output_image_format = self.get_valid_output_format(idx, virt_format_list, explicit_format_list, specified_image_format)
             if output_image_format == "":
-                parse_common.set_text_on_node(self.validation_output_graph, image_node, "Output image\nformat\n" + specified_image_format + "\nerror.", 'Red', False)
+                self.annotations.append((output_ids[idx], "Output image\nformat\n" + specified_image_format + "\nerror.", 'Red', False))
                 success = False
             else:
-                parse_common.set_text_on_node(self.validation_output_graph, image_node, output_image_format, 'Green', False)
-
-            #Add format and image node id to processed lists.(indexing is the same as for the node_info still)
-            if node_info.output_image_node_ids[idx] not in PIN_ID:
-                PIN_ID.append(node_info.output_image_node_ids[idx])
-                PIN_FORMAT.append(output_image_format)
-            else:
-                raise NameError('Duplicate ids in PIN_ID list.')
+                self.annotations.append((output_ids[idx], output_image_format, 'Green', False))
+            output_formats.append(output_image_format)
 
+        #Add format and image node id to processed lists.(indexing is the same as for the node_info still)
+        self.add_processed_images(output_ids, output_formats, processed_formats, PIN_ID, PIN_FORMAT)
         return success
 
     def get_valid_output_format(self, idx, virt_format_list, explicit_format_list, specified_image_format):
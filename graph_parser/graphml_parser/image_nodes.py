@@ -10,7 +10,7 @@ IMAGE_ATTRIBUTES_VALID = {'width': (int, 0),
                           'vx_df_image_e': (str, 'VX_DF_IMAGE_VIRT'),
                           'uniform_value': (int, 0)}
 
-class ImageAttributes:
+class ImageAttributes(object):
     """ Class that contains id and explicitly set attributes for an image node.
     Image attributes are specific properties set on images in the graph.
     Image attributes do not include image format and image type (e.g. input or debug image).
@@ -22,7 +22,10 @@ class ImageAttributes:
     Examples of how to specify image attributes in graph on an image node's data field:
     [width 100]
     [width ref_value*7] (Assuming ref_value is defined in userdata node)
+
+    The values of all valid attributes are resolved once by resolve_attributes when the graph is parsed.
     """
+    __slots__ = ['node_id', 'attributes', 'resolved_values', 'code_values']
 
     def __init__(self, node_id):
         # Node id for the image node corresponding to the image attributes
@@ -30,6 +33,21 @@ class ImageAttributes:
         # Dictionary of image attributes for this node
         # with attribute names mapping to corresponding attribute values.
         self.attributes = {}
+        # Dictionary with every valid attribute name as key and the resolved (is_userdata, value) tuple as value
+        self.resolved_values = {}
+        # Dictionary with the values used in the generated code for width, height and vx_df_image_e,
+        # where the userdata references are prefixed with opts->
+        self.code_values = {}
+
+    def resolve_attributes(self, userdata):
+        """Resolves the values of all valid attributes, including the default values and the userdata references."""
+        self.resolved_values = {}
+        for attribute in IMAGE_ATTRIBUTES_VALID:
+            self.resolved_values[attribute] = self.get_image_attribute(userdata, attribute)
+        for attribute in ['width', 'height', 'vx_df_image_e']:
+            (is_userdata, value) = self.resolved_values[attribute]
+            # TODO: Do we need to handle more general case when userdata reference isn't at beginning of line?
+            self.code_values[attribute] = "opts->" + value if is_userdata else value
 
     def get_image_attribute(self, userdata, attribute):
         """ Get the value of a specific image attribute.
@@ -39,6 +57,8 @@ class ImageAttributes:
         is_userdata is True if value contains reference to userdata
         value is the value of of the attribute or default value if attribute is not set.
         """
+        if attribute in self.resolved_values:
+            return self.resolved_values[attribute]
 
         if attribute not in self.attributes:
             if attribute not in IMAGE_ATTRIBUTES_VALID:
@@ -124,11 +144,13 @@ class ImageNodes:
         self.nbr_debug_images = -1
 
         self.image_attributes = []
+        # Dictionary with the node id as key and the ImageAttributes object as value
+        self.image_attributes_by_id = {}
 
-    def populate_image_nodes_lists(self, graph, userdata, validation_output_graph):
+    def populate_image_nodes_lists(self, graph, userdata, validation_output_graph, subgraph_templates):
         graph_has_errors = False
 
-        if(self.populate_image_attributes(graph, userdata, validation_output_graph)):
+        if(self.populate_image_attributes(graph, userdata, validation_output_graph, subgraph_templates)):
             graph_has_errors = True
         if(self.populate_uniform_input_image_names_list(graph, validation_output_graph)):
             graph_has_errors = True
@@ -249,41 +271,60 @@ class ImageNodes:
 
         return graph_has_errors
 
-    def populate_image_attributes(self, graph, userdata, validation_output_graph):
-        """Populates the image_attributes list.
-        All image nodes will get an ImageAttributes instance even if they have no explicitly set attributes. """
+    def populate_image_attributes(self, graph, userdata, validation_output_graph, subgraph_templates):
+        """Populates the image_attributes list and the image_attributes_by_id dictionary.
+        All image nodes will get an ImageAttributes instance even if they have no explicitly set attributes.
+        Nodes in copies of a subgraph template get the attributes parsed for the corresponding prototype node. """
         graph_has_errors = False
+        # Dictionary with the id of each parsed prototype node as key and a tuple with its ImageAttributes object
+        # and its error strings as value
+        parsed_prototypes = {}
 
         for node in graph.getElementsByTagName('node'):
             image_attributes = ImageAttributes(node.attributes["id"].value)
-            datatext = parse_common.get_node_datatext(node)
-            for attribute in IMAGE_ATTRIBUTES_VALID:
-                values = re.findall('\['+attribute+' (.+)\]', datatext)
-                if len(values) > 1:
-                    graph_has_errors = True
-                    parse_common.set_text_on_node(validation_output_graph, node, "Image\nattribute\nnot unique", 'Red', False)
-                elif len(values) == 1:
-                    (valid, err_string) = image_attributes.is_valid_attribute(userdata, attribute, values[0])
-                    if valid:
-                        image_attributes.attributes[attribute] = values[0]
-                    else:
-                        graph_has_errors = True
-                        parse_common.set_text_on_node(validation_output_graph, node, err_string, 'Red', False)
+            prototype_id = subgraph_templates.get_prototype_id(image_attributes.node_id)
+            if prototype_id in parsed_prototypes:
+                (prototype_attributes, err_strings) = parsed_prototypes[prototype_id]
+                image_attributes.attributes = dict(prototype_attributes.attributes)
+                image_attributes.resolved_values = dict(prototype_attributes.resolved_values)
+                image_attributes.code_values = dict(prototype_attributes.code_values)
+            else:
+                err_strings = self.parse_image_attributes(userdata, node, image_attributes)
+                image_attributes.resolve_attributes(userdata)
+                parsed_prototypes[image_attributes.node_id] = (image_attributes, err_strings)
+
+            for err_string in err_strings:
+                graph_has_errors = True
+                parse_common.set_text_on_node(validation_output_graph, node, err_string, 'Red', False)
 
             self.image_attributes.append(image_attributes)
+            self.image_attributes_by_id[image_attributes.node_id] = image_attributes
 
         return graph_has_errors
 
+    def parse_image_attributes(self, userdata, node, image_attributes):
+        """Parses the attributes in the data text of node into image_attributes, returns a list of error strings."""
+        err_strings = []
+        datatext = parse_common.get_node_datatext(node)
+        for attribute in IMAGE_ATTRIBUTES_VALID:
+            values = re.findall('\['+attribute+' (.+)\]', datatext)
+            if len(values) > 1:
+                err_strings.append("Image\nattribute\nnot unique")
+            elif len(values) == 1:
+                (valid, err_string) = image_attributes.is_valid_attribute(userdata, attribute, values[0])
+                if valid:
+                    image_attributes.attributes[attribute] = values[0]
+                else:
+                    err_strings.append(err_string)
+
+        return err_strings
+
     def get_image_attributes(self, node_id):
         """ Get the image attributes for a node with specific id.
         :param node_id: The node id
         :return: The ImageAttributes object for the node or None if node has no image attributes set
         """
-        for image_attributes in self.image_attributes:
-            if image_attributes.node_id == node_id:
-                return image_attributes
-
-        return None
+        return self.image_attributes_by_id.get(node_id)
 
     def get_uniform_image_index(self, image_id):
         """Gets the list index in uniform_input_nodes_indexed_names for the image node with id = image_id."""
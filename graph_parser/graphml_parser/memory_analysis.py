@@ -0,0 +1,193 @@
+"""Memory Analysis Class
+"""
+
+# Largest number of partial schedules kept for each number of processed function nodes
+# when searching for the schedule with the smallest peak. The search is exhaustive below this number.
+MAX_SCHEDULE_STATES = 100
+
+class Schedule:
+    """Class that contains a schedule of the function nodes and the memory needed by the internal images.
+
+    node_ids contains the function node ids in processing order.
+    buffers contains a (size, image ids) tuple for each buffer, with the images that can share the buffer
+    since they are not live at the same time.
+    """
+
+    def __init__(self, node_ids, peak_live_bytes, buffers):
+        self.node_ids = node_ids
+        self.peak_live_bytes = peak_live_bytes
+        self.buffers = buffers
+
+    def get_buffer_bytes(self):
+        return sum([size for size, image_ids in self.buffers])
+
+    def get_report(self):
+        return {'order': self.node_ids,
+                'peak_live_bytes': self.peak_live_bytes,
+                'buffer_bytes': self.get_buffer_bytes(),
+                'buffers': [{'bytes': size, 'images': image_ids} for size, image_ids in self.buffers]}
+
+class MemoryAnalysis:
+    """Class that analyses the memory needed by the internal (virtual) images of a graph.
+
+    An internal image is live from the processing of the function node that writes it until the processing
+    of the last function node that reads it, both included. The live bytes when a function node is processed
+    are the bytes of all live internal images. Images that are not live at the same time can share storage.
+    Uniform and debug images are not included, since they are kept during the whole graph processing.
+
+    The peak is computed for the topological order of the graph, and the order with the smallest peak
+    is searched for. The search keeps the MAX_SCHEDULE_STATES best partial schedules for each number of
+    processed nodes, so it is exhaustive for small graphs and a beam search for large graphs.
+    """
+
+    def __init__(self, debug_mode):
+        self.debug_mode = debug_mode
+        self.reset()
+
+    def reset(self):
+        # Dictionary with the id of each internal image as key and its size in bytes as value
+        self.image_bytes = {}
+        self.topological_schedule = None
+        self.min_peak_schedule = None
+        # True if all schedules were considered in the search for the smallest peak
+        self.exhaustive_search = True
+
+    def run(self, function_nodes, image_nodes, image_bytes):
+        """Analyses the graph, image_bytes is a dictionary with image ids as keys and sizes in bytes as values."""
+        self.reset()
+        persistent_image_ids = set(image_nodes.uniform_input_image_indexed_names + image_nodes.debug_nodes_indexed_names)
+        internal_image_ids = [image_id for image_id in image_nodes.virtual_nodes_indexed_names
+                              if image_id not in persistent_image_ids]
+        self.image_bytes = dict([(image_id, image_bytes[image_id]) for image_id in internal_image_ids
+                                 if image_id in image_bytes])
+
+        node_infos = dict(zip(function_nodes.indexed_function_nodes, function_nodes.indexed_node_info_list))
+        self.outputs = {}
+        self.inputs = {}
+        self.consumers = dict([(image_id, set()) for image_id in self.image_bytes])
+        for node, node_info in node_infos.items():
+            node_id = node.attributes["id"].value
+            self.outputs[node_id] = [image_id for image_id in node_info.output_image_node_ids if image_id in self.image_bytes]
+            self.inputs[node_id] = [image_id for image_id in set(node_info.input_image_node_ids) if image_id in self.image_bytes]
+            for image_id in self.inputs[node_id]:
+                self.consumers[image_id].add(node_id)
+
+        order = [node.attributes["id"].value for node in function_nodes.get_execution_order()]
+        self.topological_schedule = self.create_schedule(order)
+        self.min_peak_schedule = self.create_schedule(self.search_min_peak_order(function_nodes))
+        if self.min_peak_schedule.peak_live_bytes >= self.topological_schedule.peak_live_bytes:
+            self.min_peak_schedule = self.topological_schedule
+
+        if self.debug_mode:
+            print "Peak live bytes {} for the topological order and {} for the order {}".format(
+                self.topological_schedule.peak_live_bytes, self.min_peak_schedule.peak_live_bytes,
+                self.min_peak_schedule.node_ids)
+
+    def get_live_intervals(self, order):
+        """Returns a dictionary with the id of each internal image as key and the (first, last) index
+        in order of the function nodes where it is live as value."""
+        intervals = {}
+        for index, node_id in enumerate(order):
+            for image_id in self.outputs[node_id]:
+                intervals[image_id] = (index, index)
+            for image_id in self.inputs[node_id]:
+                intervals[image_id] = (intervals[image_id][0], index)
+        return intervals
+
+    def create_schedule(self, order):
+        """Creates the schedule for the order, with the peak live bytes and the images that can share storage."""
+        intervals = self.get_live_intervals(order)
+        live_bytes = [0] * len(order)
+        for image_id, (first, last) in intervals.items():
+            for index in range(first, last + 1):
+                live_bytes[index] += self.image_bytes[image_id]
+
+        # Assign the images to buffers in order of their first use, reusing the free buffer that fits best
+        buffers = []
+        buffer_last_use = []
+        for image_id in sorted(intervals, key=lambda image_id: (intervals[image_id], image_id)):
+            first, last = intervals[image_id]
+            size = self.image_bytes[image_id]
+            free_buffers = [index for index in range(len(buffers)) if buffer_last_use[index] < first]
+            fitting_buffers = [index for index in free_buffers if buffers[index][0] >= size]
+            if fitting_buffers:
+                index = min(fitting_buffers, key=lambda index: buffers[index][0])
+            elif free_buffers:
+                index = max(free_buffers, key=lambda index: buffers[index][0])
+            else:
+                buffers.append((0, []))
+                buffer_last_use.append(-1)
+                index = len(buffers) - 1
+            buffers[index] = (max(buffers[index][0], size), buffers[index][1] + [image_id])
+            buffer_last_use[index] = last
+
+        return Schedule(order, max(live_bytes + [0]), buffers)
+
+    def search_min_peak_order(self, function_nodes):
+        """Searches for the order of the function nodes with the smallest peak live bytes.
+
+        A partial schedule is given by the set of processed nodes, which determines the live images.
+        For each set the order with the smallest peak so far is kept.
+        """
+        predecessors = function_nodes.get_predecessors()
+        node_predecessors = dict([(node.attributes["id"].value,
+                                   set([predecessor.attributes["id"].value for predecessor in predecessors[node]]))
+                                  for node in function_nodes.indexed_function_nodes])
+
+        output_bytes = dict([(node_id, sum([self.image_bytes[image_id] for image_id in self.outputs[node_id]]))
+                             for node_id in node_predecessors])
+
+        # Each partial schedule is (peak live bytes, live bytes after the last node, order), where the order
+        # is stored as a (last node id, order before the last node) tuple so that it is not copied for each state
+        states = {frozenset(): (0, 0, None)}
+        for step in range(len(node_predecessors)):
+            next_states = {}
+            for processed, (peak, live, order) in states.items():
+                for node_id, node_predecessor_ids in node_predecessors.items():
+                    if node_id in processed or not node_predecessor_ids <= processed:
+                        continue
+                    now_processed = processed | frozenset([node_id])
+                    # Images that are not read by any later node are freed after the node
+                    freed_bytes = sum([self.image_bytes[image_id] for image_id in self.inputs[node_id] + self.outputs[node_id]
+                                       if self.consumers[image_id] <= now_processed])
+                    new_live = live + output_bytes[node_id]
+                    state = (max(peak, new_live), new_live - freed_bytes, (node_id, order))
+                    if now_processed not in next_states or state[:2] < next_states[now_processed][:2]:
+                        next_states[now_processed] = state
+            if len(next_states) > MAX_SCHEDULE_STATES:
+                self.exhaustive_search = False
+                next_states = dict(sorted(next_states.items(), key=lambda item: item[1][:2])[:MAX_SCHEDULE_STATES])
+            states = next_states
+
+        order = min(states.values(), key=lambda state: state[:2])[2] if states else None
+        node_ids = []
+        while order is not None:
+            node_ids.append(order[0])
+            order = order[1]
+        node_ids.reverse()
+        return node_ids
+
+    def get_total_bytes(self):
+        """Returns the bytes of all internal images if every image is materialized."""
+        return sum(self.image_bytes.values())
+
+    def get_report(self):
+        """Returns the result of the analysis as a dictionary, e.g. for writing as JSON."""
+        return {'nbr_internal_images': len(self.image_bytes),
+                'total_bytes': self.get_total_bytes(),
+                'topological_schedule': self.topological_schedule.get_report(),
+                'min_peak_schedule': self.min_peak_schedule.get_report(),
+                'exhaustive_search': self.exhaustive_search}
+
+    def get_text_report(self):
+        """Returns the result of the analysis as text."""
+        text = "Memory analysis of {} internal images\n".format(len(self.image_bytes))
+        text += "  Total bytes if every image is materialized: {}\n".format(self.get_total_bytes())
+        for name, schedule in [("topological order", self.topological_schedule),
+                               ("smallest peak order" + ("" if self.exhaustive_search else " found"), self.min_peak_schedule)]:
+            text += "  Peak live bytes for the {}: {}\n".format(name, schedule.peak_live_bytes)
+            text += "    Order: {}\n".format(" ".join(schedule.node_ids))
+            text += "    Shared buffers ({} bytes):\n".format(schedule.get_buffer_bytes())
+            for size, image_ids in schedule.buffers:
+                text += "      {} bytes: {}\n".format(size, " ".join(image_ids))
+        return text.rstrip("\n")
@@ -0,0 +1,208 @@
+"""Morphology Chain Fusion Class
+"""
+
+import parse_common
+
+# Morphology function nodes that can be fused, mapped to their non-linear filter function
+# and the structuring element offsets (relative to the origin) in both x and y.
+# The 2x2 offsets follow the masks used for the 2x2 nodes in node_parse_info.
+MORPHOLOGY_NODES = {'Erode3x3'  : ('VX_NONLINEAR_FILTER_MIN', (-1, 1)),
+                    'Dilate3x3' : ('VX_NONLINEAR_FILTER_MAX', (-1, 1)),
+                    'Erode2x2'  : ('VX_NONLINEAR_FILTER_MIN', (-1, 0)),
+                    'Dilate2x2' : ('VX_NONLINEAR_FILTER_MAX', (0, 1))}
+
+# The function node name used for a fused chain of morphology nodes
+FUSED_NODE_NAME = 'MorphologyChain'
+
+# Largest mask dimension of vxNonLinearFilterNode that all OpenVX implementations must support
+# (the minimum value of VX_CONTEXT_NONLINEAR_MAX_DIMENSION according to the standard).
+NONLINEAR_MAX_DIMENSION = 9
+
+class MorphologyChainInfo:
+    """Class that contains information about a fused chain of morphology function nodes.
+
+    function_nodes contains the fused function nodes in processing order,
+    the first one is kept in the graph and represents the whole chain.
+
+    function is the non-linear filter function (VX_NONLINEAR_FILTER_MIN or VX_NONLINEAR_FILTER_MAX)
+    and offsets is the (first, last) offset of the fused square structuring element relative to its origin.
+    """
+
+    def __init__(self, function, offsets):
+        self.function = function
+        self.offsets = offsets
+        self.function_nodes = []
+        self.removed_image_node_ids = []
+
+    def get_mask_dimension(self):
+        """Returns the dimension of the (odd sized and centered) mask for the fused structuring element."""
+        return 2 * max(abs(self.offsets[0]), abs(self.offsets[1])) + 1
+
+    def get_mask(self):
+        """Returns the mask as a list of rows with 255 for pixels in the structuring element and 0 otherwise."""
+        dimension = self.get_mask_dimension()
+        origin = dimension // 2
+        mask = []
+        for y in range(dimension):
+            row = []
+            for x in range(dimension):
+                inside = self.offsets[0] <= x - origin <= self.offsets[1] and \
+                         self.offsets[0] <= y - origin <= self.offsets[1]
+                row.append(255 if inside else 0)
+            mask.append(row)
+        return mask
+
+class MorphologyChainFusion:
+    """Graph optimization pass that fuses chains of morphology function nodes.
+
+    A chain is a sequence of Erode3x3/Erode2x2 (or Dilate3x3/Dilate2x2) nodes where every intermediate image
+    is an internal image with no other consumers. Each chain is replaced with a single vxNonLinearFilterNode
+    with a mask for the combined structuring element, which saves one virtual image and one
+    memory pass per fused node.
+
+    The pass must only run after the image format check and only for OpenVX 1.1 and later,
+    since vxNonLinearFilterNode is not available in OpenVX 1.0.1.
+    """
+
+    def __init__(self, debug_mode):
+        self.debug_mode = debug_mode
+        # Dictionary with the id of the first function node of each fused chain as key
+        # and the corresponding MorphologyChainInfo object as value.
+        self.fused_chains = {}
+
+    def run(self, function_nodes, image_nodes, library):
+        """Finds and fuses the morphology chains of the graph.
+
+        The fused chains replace the first function node of the chain,
+        and the other function nodes and the intermediate images are removed from the graph lists.
+        Returns the number of removed function nodes.
+        """
+        consumers = self.get_image_consumers(function_nodes)
+        producers = function_nodes.get_producers()
+        # The internal images that can be removed by fusing their producer and consumer
+        fusable_image_ids = set(image_nodes.virtual_nodes_indexed_names) - set(image_nodes.debug_nodes_indexed_names) - \
+                            set(image_nodes.uniform_input_image_indexed_names)
+        removed_nodes = []
+        removed_image_node_ids = set()
+
+        for chain in self.find_chains(function_nodes, fusable_image_ids, consumers, producers):
+            first_node = chain.function_nodes[0]
+            first_node_info = function_nodes.get_node_info(first_node)
+            last_node_info = function_nodes.get_node_info(chain.function_nodes[-1])
+            first_node_info.output_image_node_ids = list(last_node_info.output_image_node_ids)
+            first_node_info.output_edge_labels = list(last_node_info.output_edge_labels)
+            function_nodes.function_nodes_indexed_names[function_nodes.get_function_node_position(first_node)] = FUSED_NODE_NAME
+
+            removed_nodes += chain.function_nodes[1:]
+            removed_image_node_ids.update(chain.removed_image_node_ids)
+
+            self.fused_chains[first_node.attributes["id"].value] = chain
+            if self.debug_mode:
+                print "Fused morphology chain {} into a {}x{} {} mask".format(
+                    [node.attributes["id"].value for node in chain.function_nodes],
+                    chain.get_mask_dimension(), chain.get_mask_dimension(), chain.function)
+
+        if removed_nodes:
+            function_nodes.remove_function_nodes(removed_nodes)
+            image_nodes.virtual_nodes_indexed_names[:] = [image_id for image_id in image_nodes.virtual_nodes_indexed_names
+                                                          if image_id not in removed_image_node_ids]
+            function_nodes.populate_io_and_debug_function_node_indexed_lists(library, image_nodes)
+
+        return len(removed_nodes)
+
+    def get_image_consumers(self, function_nodes):
+        """Returns a dictionary with image node ids as keys and lists of the consuming function nodes as values."""
+        consumers = {}
+        for node in function_nodes.indexed_function_nodes:
+            for image_id in function_nodes.get_node_info(node).input_image_node_ids:
+                consumers.setdefault(image_id, []).append(node)
+        return consumers
+
+    def find_chains(self, function_nodes, fusable_image_ids, consumers, producers):
+        """Returns a list of MorphologyChainInfo objects with at least two function nodes each.
+
+        consumers and producers are the dictionaries given by get_image_consumers and FunctionNodes.get_producers.
+        """
+        chains = []
+        visited = set()
+        for node in function_nodes.indexed_function_nodes:
+            if node in visited or not self.is_morphology_node(function_nodes, node):
+                continue
+            # Only start chains at nodes that can not be fused with a preceding node
+            if self.get_fusable_successor(function_nodes, fusable_image_ids, consumers,
+                                          self.get_producer(function_nodes, producers, node)) is node:
+                continue
+
+            function, offsets = MORPHOLOGY_NODES[function_nodes.get_function_node_name(node)]
+            chain = MorphologyChainInfo(function, offsets)
+            chain.function_nodes.append(node)
+            visited.add(node)
+            successor = self.get_fusable_successor(function_nodes, fusable_image_ids, consumers, node)
+            while successor is not None:
+                successor_offsets = MORPHOLOGY_NODES[function_nodes.get_function_node_name(successor)][1]
+                new_offsets = (chain.offsets[0] + successor_offsets[0], chain.offsets[1] + successor_offsets[1])
+                if 2 * max(abs(new_offsets[0]), abs(new_offsets[1])) + 1 > NONLINEAR_MAX_DIMENSION:
+                    # Mask would be too large, start a new chain from the successor
+                    if len(chain.function_nodes) > 1:
+                        chains.append(chain)
+                    function, offsets = MORPHOLOGY_NODES[function_nodes.get_function_node_name(successor)]
+                    chain = MorphologyChainInfo(function, offsets)
+                else:
+                    chain.offsets = new_offsets
+                    chain.removed_image_node_ids.append(function_nodes.get_node_info(node).output_image_node_ids[0])
+                chain.function_nodes.append(successor)
+                visited.add(successor)
+                node = successor
+                successor = self.get_fusable_successor(function_nodes, fusable_image_ids, consumers, node)
+
+            if len(chain.function_nodes) > 1:
+                chains.append(chain)
+
+        return chains
+
+    def is_morphology_node(self, function_nodes, node):
+        return function_nodes.get_function_node_name(node) in MORPHOLOGY_NODES
+
+    def get_producer(self, function_nodes, producers, node):
+        """Returns the function node producing the (single) input image of node, or None."""
+        node_info = function_nodes.get_node_info(node)
+        if len(node_info.input_image_node_ids) != 1:
+            return None
+        return producers.get(node_info.input_image_node_ids[0])
+
+    def get_fusable_successor(self, function_nodes, fusable_image_ids, consumers, node):
+        """Returns the function node that can be fused after node, or None if there is no such node.
+
+        The output image of node must be an internal image that is neither a debug image nor a uniform image,
+        and it must only be consumed by a morphology node with the same filter function and border mode.
+        """
+        if node is None or not self.is_morphology_node(function_nodes, node):
+            return None
+        node_info = function_nodes.get_node_info(node)
+        if len(node_info.output_image_node_ids) != 1:
+            return None
+        image_id = node_info.output_image_node_ids[0]
+        if image_id not in fusable_image_ids:
+            return None
+        if len(consumers.get(image_id, [])) != 1:
+            return None
+
+        successor = consumers[image_id][0]
+        if not self.is_morphology_node(function_nodes, successor):
+            return None
+        if MORPHOLOGY_NODES[function_nodes.get_function_node_name(node)][0] != \
+                MORPHOLOGY_NODES[function_nodes.get_function_node_name(successor)][0]:
+            return None
+        # A constant border can not be fused, since the constant is applied once per node.
+        border_mode = parse_common.parse_parameter('vx_border_mode_e', node)
+        if border_mode == 'VX_BORDER_MODE_CONSTANT' or \
+                border_mode != parse_common.parse_parameter('vx_border_mode_e', successor):
+            return None
+        if function_nodes.get_node_info(successor).input_image_node_ids != [image_id]:
+            return None
+
+        return successor
+
+    def get_chain(self, node_id):
+        """Returns the MorphologyChainInfo object for the fused function node with id node_id, or None."""
+        return self.fused_chains.get(node_id)
@@ -0,0 +1,37 @@
+"""Node Id Table Class
+"""
+
+class NodeIdTable(object):
+    """Class that interns the node ids of a graph to dense integer indices.
+
+    The index of a node id is its position in the ids list, which is the reverse table used for output.
+    intern returns the same string object for equal node ids, so that lists of node ids share the strings
+    instead of keeping a copy per edge.
+    """
+    __slots__ = ['ids', 'indices']
+
+    def __init__(self):
+        # List of the node ids, where the list index is the integer index of the node id
+        self.ids = []
+        # Dictionary with the node id as key and its integer index as value
+        self.indices = {}
+
+    def add(self, node_id):
+        """Returns the integer index of node_id, adding it to the table if it is new."""
+        index = self.indices.get(node_id)
+        if index is None:
+            index = len(self.ids)
+            self.indices[node_id] = index
+            self.ids.append(node_id)
+        return index
+
+    def get_index(self, node_id):
+        """Returns the integer index of node_id, or None if it is not in the table."""
+        return self.indices.get(node_id)
+
+    def get_id(self, index):
+        return self.ids[index]
+
+    def intern(self, node_id):
+        """Returns the string object of the table for node_id, adding it to the table if it is new."""
+        return self.ids[self.add(node_id)]
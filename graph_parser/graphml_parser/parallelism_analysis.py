@@ -0,0 +1,149 @@
+"""Parallelism Analysis Class
+"""
+
+# Number of fan-in/fan-out hot spots listed in the text report
+NBR_REPORTED_HOT_SPOTS = 10
+
+class ParallelismAnalysis:
+    """Class that analyses how many function nodes of a graph can be processed in parallel.
+
+    Each function node gets a topological level, one more than the highest level of the function nodes
+    that produce its input images, so all nodes on the same level can be processed in parallel.
+    The critical path is the longest chain of dependent function nodes, both by the number of nodes
+    and by the estimated operations of the nodes (from the CostModel).
+    The fan-in of a function node is its number of input images and the fan-out is the number of
+    function nodes that consume its output images.
+
+    The analysis runs in time linear in the number of nodes and edges.
+    """
+
+    def __init__(self, debug_mode):
+        self.debug_mode = debug_mode
+        self.reset()
+
+    def reset(self):
+        # List with the list of function node ids on each topological level
+        self.levels = []
+        # Function node ids of the critical path by node count and by cost, in processing order
+        self.critical_path_nodes = []
+        self.critical_path_cost_nodes = []
+        self.critical_path_cost = 0
+        # Dictionary with the id of each function node as key and its (function name, fan-in, fan-out) as value
+        self.node_degrees = {}
+        # Ids of the image nodes between the function nodes of the critical path by cost
+        self.critical_path_image_ids = []
+
+    def run(self, function_nodes, node_costs):
+        """Analyses the graph, node_costs is a dictionary with function node ids as keys and operations as values."""
+        self.reset()
+
+        order = function_nodes.get_execution_order()
+        predecessors = function_nodes.get_predecessors()
+        producers = function_nodes.get_producers()
+        node_infos = dict(zip(function_nodes.indexed_function_nodes, function_nodes.indexed_node_info_list))
+        node_names = dict(zip(function_nodes.indexed_function_nodes, function_nodes.function_nodes_indexed_names))
+
+        nbr_consumers = {}
+        for node in order:
+            for predecessor in predecessors[node]:
+                nbr_consumers[predecessor] = nbr_consumers.get(predecessor, 0) + 1
+
+        level = {}
+        # Longest path ending in each node, by node count and by cost, with the previous node on the path
+        path_length = {}
+        path_cost = {}
+        previous_by_length = {}
+        previous_by_cost = {}
+        for node in order:
+            node_id = node.attributes["id"].value
+            cost = node_costs.get(node_id) or 0
+            level[node] = 0
+            path_length[node] = 1
+            path_cost[node] = cost
+            previous_by_length[node] = None
+            previous_by_cost[node] = None
+            for predecessor in predecessors[node]:
+                level[node] = max(level[node], level[predecessor] + 1)
+                if path_length[predecessor] + 1 > path_length[node]:
+                    path_length[node] = path_length[predecessor] + 1
+                    previous_by_length[node] = predecessor
+                if path_cost[predecessor] + cost > path_cost[node]:
+                    path_cost[node] = path_cost[predecessor] + cost
+                    previous_by_cost[node] = predecessor
+
+            while len(self.levels) <= level[node]:
+                self.levels.append([])
+            self.levels[level[node]].append(node_id)
+            self.node_degrees[node_id] = (node_names[node], len(node_infos[node].input_image_node_ids),
+                                          nbr_consumers.get(node, 0))
+
+        if order:
+            self.critical_path_nodes = self.get_path(max(order, key=lambda node: path_length[node]), previous_by_length)
+            last_node = max(order, key=lambda node: path_cost[node])
+            self.critical_path_cost = path_cost[last_node]
+            self.critical_path_cost_nodes = self.get_path(last_node, previous_by_cost)
+            # The images that connect the nodes of the critical path by cost
+            path_node_ids = set(self.critical_path_cost_nodes)
+            for node in order:
+                if node.attributes["id"].value in path_node_ids:
+                    for image_id in node_infos[node].input_image_node_ids:
+                        producer = producers.get(image_id)
+                        if producer is not None and producer.attributes["id"].value in path_node_ids:
+                            self.critical_path_image_ids.append(image_id)
+
+        if self.debug_mode:
+            print "Topological levels: " + str(self.levels)
+
+    def get_path(self, last_node, previous):
+        """Returns the ids of the function nodes on the path that ends in last_node, in processing order."""
+        path = []
+        node = last_node
+        while node is not None:
+            path.append(node.attributes["id"].value)
+            node = previous[node]
+        path.reverse()
+        return path
+
+    def get_max_level_width(self):
+        return max([len(level_node_ids) for level_node_ids in self.levels] + [0])
+
+    def get_hot_spots(self):
+        """Returns the (node id, function name, fan-in, fan-out) of the function nodes with a fan-in or fan-out
+        larger than one, the largest first."""
+        hot_spots = [(node_id, ) + degrees for node_id, degrees in self.node_degrees.items()
+                     if degrees[1] > 1 or degrees[2] > 1]
+        return sorted(hot_spots, key=lambda hot_spot: (-max(hot_spot[2], hot_spot[3]), hot_spot[0]))
+
+    def get_report(self):
+        """Returns the result of the analysis as a dictionary, e.g. for writing as JSON."""
+        nbr_nodes = len(self.node_degrees)
+        return {'nbr_nodes': nbr_nodes,
+                'levels': self.levels,
+                'nbr_levels': len(self.levels),
+                'max_level_width': self.get_max_level_width(),
+                'average_parallelism': float(nbr_nodes) / len(self.levels) if self.levels else 0.0,
+                'critical_path': {'nodes': self.critical_path_nodes,
+                                  'length': len(self.critical_path_nodes)},
+                'critical_path_by_cost': {'nodes': self.critical_path_cost_nodes,
+                                          'ops': self.critical_path_cost},
+                'hot_spots': [{'id': node_id, 'function': function_name, 'fan_in': fan_in, 'fan_out': fan_out}
+                              for node_id, function_name, fan_in, fan_out in self.get_hot_spots()]}
+
+    def get_text_report(self):
+        """Returns the result of the analysis as text."""
+        report = self.get_report()
+        text = "Parallelism analysis of {} function nodes\n".format(report['nbr_nodes'])
+        text += "  Topological levels: {}, maximum level width: {}, average parallelism: {:.2f}\n".format(
+            report['nbr_levels'], report['max_level_width'], report['average_parallelism'])
+        for index, level_node_ids in enumerate(self.levels):
+            text += "    Level {}: {}\n".format(index, " ".join(level_node_ids))
+        text += "  Critical path by node count ({} nodes): {}\n".format(len(self.critical_path_nodes),
+                                                                      " -> ".join(self.critical_path_nodes))
+        text += "  Critical path by cost ({} operations): {}\n".format(self.critical_path_cost,
+                                                                     " -> ".join(self.critical_path_cost_nodes))
+        hot_spots = self.get_hot_spots()
+        if hot_spots:
+            text += "  Fan-in/fan-out hot spots:\n"
+            for node_id, function_name, fan_in, fan_out in hot_spots[:NBR_REPORTED_HOT_SPOTS]:
+                text += "    {} ({}): fan-in {}, fan-out {}\n".format(node_id, function_name, fan_in, fan_out)
+        return text.rstrip("\n")
@@ -0,0 +1,87 @@
+"""Parameter Object Pool Class
+"""
+
+# Supported parameter object types, mapped to the prefix of the generated C variable names
+# and the OpenVX function used to release the objects.
+PARAMETER_OBJECT_TYPES = {'vx_threshold' : ('threshold', 'vxReleaseThreshold'),
+                          'vx_lut'       : ('lut', 'vxReleaseLUT'),
+                          'vx_matrix'    : ('matrix', 'vxReleaseMatrix'),
+                          'vx_scalar'    : ('scalar', 'vxReleaseScalar')}
+
+class ParameterObjectPool:
+    """Class that keeps track of the OpenVX parameter objects (vx_threshold, vx_lut, vx_matrix and vx_scalar)
+    that the function nodes use during code generation.
+
+    The function node parse classes ask the pool for an object with a given type and definition,
+    where the definition is the C code that creates the object (and sets its value),
+    using %(name)s for the name of the object. Objects with the same type and definition are only
+    created once, at the top of the create function, shared by all nodes that use them,
+    and released once at the end of the create function.
+
+    Objects used by nodes with dynamic parameters are never shared, since their values can be changed at runtime.
+
+    The pool must be reset before each code generation of the create function.
+    """
+
+    def __init__(self, debug_mode):
+        self.debug_mode = debug_mode
+        self.reset()
+
+    def reset(self):
+        """Removes all objects from the pool."""
+        # Index-synched lists with the C variable name, type, definition and sharing of the objects in the pool
+        self.object_names = []
+        self.object_types = []
+        self.object_definitions = []
+        self.object_shared = []
+
+    def get_object_name(self, object_type, definition, shared=True):
+        """Returns the C variable name of the object with the given type and definition.
+
+        The object is added to the pool if no object with the same type and definition is found,
+        or if shared is False.
+        """
+        if object_type not in PARAMETER_OBJECT_TYPES:
+            raise NameError('Parameter object type {} is not supported by the parameter object pool.'.format(object_type))
+
+        if shared:
+            for index, name in enumerate(self.object_names):
+                if self.object_types[index] == object_type and self.object_definitions[index] == definition:
+                    return name
+
+        name = PARAMETER_OBJECT_TYPES[object_type][0] + str(self.object_types.count(object_type))
+        self.object_names.append(name)
+        self.object_types.append(object_type)
+        self.object_definitions.append(definition)
+        self.object_shared.append(shared)
+        if self.debug_mode:
+            print "Added parameter object {} to the parameter object pool".format(name)
+        return name
+
+    def get_object_indices(self, shared):
+        """Returns the indices of the shared or non-shared objects in the pool."""
+        return [index for index in range(len(self.object_names)) if self.object_shared[index] == shared]
+
+    def get_definitions_string(self, shared):
+        """Returns the C code that creates the shared or non-shared objects in the pool.
+
+        The shared and non-shared objects are written as separate blocks, since they have different headings.
+        """
+        parsed_string = ""
+        indices = self.get_object_indices(shared)
+        if len(indices) > 0:
+            if shared:
+                parsed_string += "    /* Parameter objects shared by the function nodes */\n"
+            else:
+                parsed_string += "    /* Parameter objects of the dynamic function nodes */\n"
+            for index in indices:
+                parsed_string += self.object_definitions[index] % {'name': self.object_names[index]}
+            parsed_string += "\n"
+        return parsed_string
+
+    def get_releases_string(self, shared):
+        """Returns the C code that releases the shared or non-shared objects in the pool."""
+        parsed_string = ""
+        for index in self.get_object_indices(shared):
+            parsed_string += "    {}(&{});\n".format(PARAMETER_OBJECT_TYPES[self.object_types[index]][1], self.object_names[index])
+        return parsed_string
@@ -2,6 +2,10 @@
 
 """
 
+# Key of the DOM user data that marks the nodes annotated in the validation/error graph,
+# only these nodes are rewritten when the graph is written (see validation_graph_writer)
+ANNOTATED = 'annotated'
+
 def set_text_on_node(graph, current_node, errorstring, highlight_color, resize):
     """Sets an error string on the current_node in graph.
 
@@ -13,19 +17,11 @@ def set_text_on_node(graph, current_node, errorstring, highlight_color, resize):
     """
     for node in graph.getElementsByTagName('node'):
         if node.attributes["id"].value == current_node.attributes["id"].value:
+            node.setUserData(ANNOTATED, True, None)
             node.getElementsByTagName(
                 'y:NodeLabel')[0].firstChild.replaceWholeText(errorstring)
 
-            if highlight_color == 'Red':
-                node.getElementsByTagName(
-                    'y:Fill')[0].attributes["color"].value = "#FF9090"
-                node.getElementsByTagName(
-                    'y:Fill')[0].attributes["color2"].value = "#CC0000"
-            elif highlight_color == 'Green':
-                node.getElementsByTagName(
-                    'y:Fill')[0].attributes["color"].value = "#90FF90"
-                node.getElementsByTagName(
-                    'y:Fill')[0].attributes["color2"].value = "#008800"
+            set_fill_color(node, highlight_color)
             if resize == True:
                 old_width = node.getElementsByTagName(
                     'y:Geometry')[0].attributes["width"].value
@@ -37,6 +33,24 @@ def set_text_on_node(graph, current_node, errorstring, highlight_color, resize):
                 node.getElementsByTagName('y:Geometry')[0].attributes["x"].value = str(
                     float(old_x) - (new_width - float(old_width)) / 2)
 
+# Fill colors (color, color2) of the highlight colors used on nodes in the validation/error graph
+HIGHLIGHT_COLORS = {'Red': ("#FF9090", "#CC0000"),
+                    'Green': ("#90FF90", "#008800"),
+                    'Yellow': ("#FFFF90", "#CCAA00")}
+
+def set_fill_color(node, highlight_color):
+    """Changes the fill color of node to highlight_color, if it is one of HIGHLIGHT_COLORS."""
+    if highlight_color in HIGHLIGHT_COLORS:
+        node.setUserData(ANNOTATED, True, None)
+        node.getElementsByTagName('y:Fill')[0].attributes["color"].value = HIGHLIGHT_COLORS[highlight_color][0]
+        node.getElementsByTagName('y:Fill')[0].attributes["color2"].value = HIGHLIGHT_COLORS[highlight_color][1]
+
+def set_color_on_nodes(graph, node_ids, highlight_color):
+    """Changes the color of the nodes with the given ids in graph, without changing their text."""
+    for node in graph.getElementsByTagName('node'):
+        if node.attributes["id"].value in node_ids:
+            set_fill_color(node, highlight_color)
+
 def get_node_datatext(node):
     """Returns a string with data node text if it exists on the node, otherwise returns an empty string"""
     datatext = ""
@@ -70,3 +84,16 @@ def parse_parameter(parameter, node):
                     parameter_value = (datatext_after_parameter.split("]", 1)[0]).strip()
 
     return parameter_value
+
+def get_function_node_target(node, userdata):
+    """Gets the execution target of a function node.
+
+    The target given by [vx_target ...] in the node data is used if present,
+    otherwise the graph-wide target given in the userdata node.
+    If no target is given, the function returns an empty string.
+    """
+    target = parse_parameter('vx_target', node)
+    if target == "":
+        target = userdata.get_graph_option('vx_target', "")
+
+    return target
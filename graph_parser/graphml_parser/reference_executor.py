@@ -0,0 +1,431 @@
+"""Reference Executor Class
+"""
+
+import re
+from morphology_fusion import MORPHOLOGY_NODES
+from uniform_folding import FOLDED_NODE_NAME
+import parse_common
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Image formats supported by the reference executor, mapped to the NumPy data types
+IMAGE_DTYPES = {'U8'  : 'uint8',
+                'U16' : 'uint16',
+                'S16' : 'int16',
+                'U32' : 'uint32',
+                'S32' : 'int32'}
+
+# Kernels of vxHalfScaleGaussianNode, for each kernel size
+GAUSSIAN_KERNELS = {3: [1, 2, 1],
+                    5: [1, 4, 6, 4, 1]}
+
+SOBEL_KERNEL_X = [[-1, 0, 1],
+                  [-2, 0, 2],
+                  [-1, 0, 1]]
+
+def require_numpy():
+    if numpy is None:
+        raise RuntimeError("The reference executor requires NumPy, install it with 'pip install numpy'.")
+
+def load_image(filename):
+    """Loads an image from a .npy file."""
+    require_numpy()
+    return numpy.load(filename)
+
+def save_image(filename, image):
+    """Saves an image to a .npy file."""
+    require_numpy()
+    numpy.save(filename, image)
+
+def evaluate_expression(expression, userdata_values):
+    """Evaluates a parameter or attribute value from the graph, e.g. 128, 1.5f or opts->ref_width/2,
+    with the values of the userdata fields."""
+    expression = expression.replace("opts->", "")
+    expression = re.sub(r'(\d)[fF]\b', r'\1', expression)
+    try:
+        return eval(expression, {'__builtins__': {}}, dict(userdata_values))
+    except NameError as error:
+        raise RuntimeError("Can not evaluate '{}', a value is missing for a userdata field ({})".format(expression, error))
+    except SyntaxError:
+        raise RuntimeError("Can not evaluate '{}'".format(expression))
+
+def convert(values, dtype, policy):
+    """Converts integer values to dtype with the given vx_convert_policy_e (saturate if no policy is given)."""
+    values = numpy.asarray(values, dtype='int64')
+    if policy == 'VX_CONVERT_POLICY_WRAP':
+        return values.astype(dtype)
+    info = numpy.iinfo(dtype)
+    return numpy.clip(values, info.min, info.max).astype(dtype)
+
+def round_to_nearest(values):
+    return numpy.floor(values + 0.5).astype('int64')
+
+class ReferenceExecutor:
+    """Class that executes a parsed graph on NumPy arrays, without an OpenVX implementation.
+
+    The function nodes are executed in topological order with vectorized NumPy implementations
+    that follow the OpenVX specification, including the convert and round policies and the border modes,
+    so the result of a graph can be checked e.g. in CI. The optimized graph is executed,
+    i.e. MorphologyChain and FoldedTableLookup nodes created by the optimization passes are also supported.
+
+    Internal (virtual) images are freed as soon as the last function node that reads them has been executed.
+    Output and debug images are kept.
+
+    Border pixels are computed as with VX_BORDER_MODE_REPLICATE if the border mode is undefined,
+    except for WarpAffine, where pixels outside the input image get the value 0.
+    Parameter values and image attributes that reference userdata fields are evaluated
+    with the values given to run().
+    """
+
+    def __init__(self, debug_mode):
+        self.debug_mode = debug_mode
+        self.reset()
+
+    def reset(self):
+        # Dictionary with the id of each image node that has been computed and not yet freed as key
+        # and the image as value
+        self.images = {}
+        # Dictionary with the id of each debug image node as key and the image as value
+        self.debug_images = {}
+        # Largest number of bytes of the images held at the same time
+        self.peak_bytes = 0
+
+    def run(self, graphparser, input_images, userdata_values=None):
+        """Executes the graph with the list of input images, in the order of the input image indices,
+        and returns the list of output images, in the order of the output image indices.
+
+        userdata_values is a dictionary with the name of each userdata field as key and its value as value.
+        Must only be called after the image format check and the optimization passes.
+        """
+        require_numpy()
+        self.reset()
+        self.graphparser = graphparser
+        self.userdata_values = userdata_values or {}
+        function_nodes = graphparser.function_nodes
+        image_nodes = graphparser.image_nodes
+
+        if len(input_images) != len(image_nodes.input_nodes_indexed_names):
+            raise RuntimeError("The graph has {} input images, but {} images were given".format(
+                len(image_nodes.input_nodes_indexed_names), len(input_images)))
+        for image_id, image in zip(image_nodes.input_nodes_indexed_names, input_images):
+            image = numpy.asarray(image)
+            if image.ndim != 2:
+                raise RuntimeError("Input image {} must be a 2-dimensional array".format(image_id))
+            if image.dtype != self.get_dtype(image_id):
+                raise RuntimeError("Input image {} must have data type {}, not {}".format(image_id,
+                                                                                        self.get_dtype(image_id),
+                                                                                        image.dtype))
+            self.check_image_size(image_id, image)
+            self.images[image_id] = image
+        for index, image_id in enumerate(image_nodes.uniform_input_image_indexed_names):
+            self.images[image_id] = self.create_uniform_image(image_id, image_nodes.uniform_input_image_indexed_values[index])
+
+        order = function_nodes.get_execution_order()
+        last_consumer = {}
+        for index, node in enumerate(order):
+            for image_id in function_nodes.get_node_info(node).input_image_node_ids:
+                last_consumer[image_id] = index
+        kept_image_ids = set(image_nodes.output_nodes_indexed_names + image_nodes.debug_nodes_indexed_names)
+
+        for index, node in enumerate(order):
+            function_name = function_nodes.get_function_node_name(node)
+            node_info = function_nodes.get_node_info(node)
+            inputs = [self.images[image_id] for image_id in self.get_ordered_ids(node_info.input_image_node_ids,
+                                                                                   node_info.input_edge_labels, 'in')]
+            output_ids = self.get_ordered_ids(node_info.output_image_node_ids, node_info.output_edge_labels, 'out')
+            if function_name not in self.NODE_FUNCTIONS:
+                raise RuntimeError("{} node {} has no reference implementation".format(function_name,
+                                                                                       node.attributes["id"].value))
+            outputs = self.NODE_FUNCTIONS[function_name](self, node, function_name, inputs, output_ids)
+            for image_id, image in zip(output_ids, outputs):
+                self.check_image_size(image_id, image)
+                self.images[image_id] = image
+            self.peak_bytes = max(self.peak_bytes, sum([image.nbytes for image in self.images.values()]))
+
+            for image_id in set(node_info.input_image_node_ids):
+                if last_consumer[image_id] == index and image_id not in kept_image_ids:
+                    del self.images[image_id]
+            if self.debug_mode:
+                print "Executed {} node {}, {} images held".format(function_name, node.attributes["id"].value,
+                                                                   len(self.images))
+
+        for image_id in image_nodes.debug_nodes_indexed_names:
+            if image_id in self.images:
+                self.debug_images[image_id] = self.images[image_id]
+
+        return [self.images[image_id] for image_id in image_nodes.output_nodes_indexed_names]
+
+    def get_ordered_ids(self, image_ids, edge_labels, label_prefix):
+        """Returns the image ids of two inputs or outputs in the order of their edge labels (in1/in2 or out1/out2)."""
+        if len(image_ids) == 2:
+            return [image_ids[edge_labels.index(label_prefix + '1')], image_ids[edge_labels.index(label_prefix + '2')]]
+        return list(image_ids)
+
+    def get_dtype(self, image_id):
+        image_format = self.graphparser.get_image_format(image_id)
+        if image_format not in IMAGE_DTYPES:
+            raise RuntimeError("Image {} has format {}, which is not supported by the reference executor".format(
+                image_id, image_format))
+        return numpy.dtype(IMAGE_DTYPES[image_format])
+
+    def get_image_size(self, image_id):
+        """Returns (width, height) of the image from its attributes, 0 if not given."""
+        sizes = []
+        for attribute in ['width', 'height']:
+            (value_from_opts, value) = self.graphparser.get_value_for_attribute(image_id, attribute)
+            sizes.append(int(evaluate_expression(str(value), self.userdata_values)))
+        return sizes[0], sizes[1]
+
+    def check_image_size(self, image_id, image):
+        width, height = self.get_image_size(image_id)
+        if image.ndim == 2 and ((width != 0 and width != image.shape[1]) or (height != 0 and height != image.shape[0])):
+            raise RuntimeError("Image {} is {}x{}, but has the size {}x{} in the graph".format(
+                image_id, image.shape[1], image.shape[0], width, height))
+
+    def create_uniform_image(self, image_id, value):
+        """Creates a uniform image, with the size given in the graph, otherwise as a scalar that broadcasts to any size."""
+        width, height = self.get_image_size(image_id)
+        value = evaluate_expression(str(value), self.userdata_values)
+        if width == 0 or height == 0:
+            return numpy.array(value, dtype=self.get_dtype(image_id))
+        return numpy.full((height, width), value, dtype=self.get_dtype(image_id))
+
+    def get_parameter(self, node, parameter):
+        return parse_common.parse_parameter(parameter, node)
+
+    def get_numeric_parameter(self, node, parameter):
+        value = self.get_parameter(node, parameter)
+        if value == "":
+            raise RuntimeError("Node {} has no {} parameter".format(node.attributes["id"].value, parameter))
+        return evaluate_expression(value, self.userdata_values)
+
+    def get_border(self, node):
+        """Returns the border mode of the node as (mode, constant value)."""
+        border_mode = self.get_parameter(node, 'vx_border_mode_e')
+        if border_mode == 'VX_BORDER_MODE_CONSTANT':
+            return border_mode, int(self.get_numeric_parameter(node, 'constant_value'))
+        return border_mode or 'VX_BORDER_MODE_UNDEFINED', 0
+
+    def pad(self, image, before, after, border):
+        """Pads the image with before and after pixels in both dimensions according to the border mode."""
+        widths = ((before, after), (before, after))
+        if border[0] == 'VX_BORDER_MODE_CONSTANT':
+            return numpy.pad(image, widths, mode='constant', constant_values=border[1])
+        return numpy.pad(image, widths, mode='edge')
+
+    def get_shifted(self, padded, radius, shape, dx, dy):
+        """Returns the view of the padded image that is shifted dx, dy pixels relative to the original image."""
+        return padded[radius + dy:radius + dy + shape[0], radius + dx:radius + dx + shape[1]]
+
+    def nonlinear_filter(self, image, function, offsets, border):
+        """Applies a min or max filter with a square structuring element from offsets[0] to offsets[1]."""
+        radius = max(abs(offsets[0]), abs(offsets[1]))
+        padded = self.pad(image, radius, radius, border)
+        combine = numpy.minimum if function == 'VX_NONLINEAR_FILTER_MIN' else numpy.maximum
+        result = None
+        for dy in range(offsets[0], offsets[1] + 1):
+            for dx in range(offsets[0], offsets[1] + 1):
+                shifted = self.get_shifted(padded, radius, image.shape, dx, dy)
+                result = shifted.copy() if result is None else combine(result, shifted)
+        return result
+
+    def sample(self, image, ys, xs, border):
+        """Returns the pixels of the image at integer coordinates, outside the image according to the border mode."""
+        height, width = image.shape
+        inside = (xs >= 0) & (xs < width) & (ys >= 0) & (ys < height)
+        values = image[numpy.clip(ys, 0, height - 1), numpy.clip(xs, 0, width - 1)].astype('float64')
+        if border[0] != 'VX_BORDER_MODE_REPLICATE':
+            values[~inside] = border[1]
+        return values
+
+    def interpolate(self, image, ys, xs, interpolation, border):
+        """Returns the interpolated pixels of the image at real coordinates."""
+        if 'BILINEAR' in interpolation:
+            x0 = numpy.floor(xs).astype('int64')
+            y0 = numpy.floor(ys).astype('int64')
+            fx = xs - x0
+            fy = ys - y0
+            values = (1 - fx) * (1 - fy) * self.sample(image, y0, x0, border) + \
+                     fx * (1 - fy) * self.sample(image, y0, x0 + 1, border) + \
+                     (1 - fx) * fy * self.sample(image, y0 + 1, x0, border) + \
+                     fx * fy * self.sample(image, y0 + 1, x0 + 1, border)
+            return round_to_nearest(values)
+        return round_to_nearest(self.sample(image, round_to_nearest(ys), round_to_nearest(xs), border))
+
+    #===================
+    # FUNCTION NODES
+    #===================
+    def run_arithmetic(self, node, function_name, inputs, output_ids):
+        dtype = self.get_dtype(output_ids[0])
+        policy = self.get_parameter(node, 'vx_convert_policy_e')
+        first = inputs[0].astype('int64')
+        second = inputs[1].astype('int64')
+        if function_name == 'Add':
+            return [convert(first + second, dtype, policy)]
+        elif function_name == 'Subtract':
+            return [convert(first - second, dtype, policy)]
+        elif function_name == 'AbsDiff':
+            return [convert(numpy.abs(first - second), dtype, None)]
+        elif function_name == 'And':
+            return [(first & second).astype(dtype)]
+        elif function_name == 'Or':
+            return [(first | second).astype(dtype)]
+
+    def run_multiply(self, node, function_name, inputs, output_ids):
+        scale = float(self.get_numeric_parameter(node, 'vx_float32'))
+        values = inputs[0].astype('float64') * inputs[1].astype('float64') * scale
+        if self.get_parameter(node, 'vx_round_policy_e') == 'VX_ROUND_POLICY_TO_ZERO':
+            values = numpy.trunc(values)
+        else:
+            values = numpy.rint(values) # Rounds half to even
+        return [convert(values, self.get_dtype(output_ids[0]), self.get_parameter(node, 'vx_convert_policy_e'))]
+
+    def run_threshold(self, node, function_name, inputs, output_ids):
+        threshold_type = self.get_parameter(node, 'vx_threshold_type_e')
+        if threshold_type != 'VX_THRESHOLD_TYPE_BINARY':
+            raise RuntimeError("Threshold node {} has type {}, only VX_THRESHOLD_TYPE_BINARY is supported".format(
+                node.attributes["id"].value, threshold_type))
+        # The threshold value is given by [vx_pixel_value_t ...] for OpenVX 1.2, otherwise by the type given in vx_size
+        if self.get_parameter(node, 'vx_pixel_value_t'):
+            value = self.get_numeric_parameter(node, 'vx_pixel_value_t')
+        else:
+            value = self.get_numeric_parameter(node, self.get_parameter(node, 'vx_size'))
+        dtype = self.get_dtype(output_ids[0])
+        return [numpy.where(inputs[0] > value, numpy.iinfo(dtype).max, 0).astype(dtype)]
+
+    def run_convert_depth(self, node, function_name, inputs, output_ids):
+        dtype = self.get_dtype(output_ids[0])
+        shift = int(self.get_numeric_parameter(node, 'vx_int32'))
+        values = inputs[0].astype('int64')
+        if dtype.itemsize > inputs[0].dtype.itemsize:
+            return [convert(values << shift, dtype, 'VX_CONVERT_POLICY_WRAP')]
+        return [convert(values >> shift, dtype, self.get_parameter(node, 'vx_convert_policy_e'))]
+
+    def run_table_lookup(self, node, function_name, inputs, output_ids):
+        if function_name == FOLDED_NODE_NAME:
+            lut = numpy.array(self.graphparser.uniform_folding.get_lut(node.attributes["id"].value))
+        else:
+            lut_type = self.get_parameter(node, 'vx_lut')
+            if lut_type == 'LUT_IDENTITY':
+                lut = numpy.arange(256)
+            elif lut_type in ['LUT_ZERO', 'LUT_DUMMY']:
+                lut = numpy.zeros(256)
+            else:
+                raise RuntimeError("LUT implementation for {} not found".format(lut_type))
+        return [lut.astype(self.get_dtype(output_ids[0]))[inputs[0]]]
+
+    def run_morphology(self, node, function_name, inputs, output_ids):
+        if function_name in MORPHOLOGY_NODES:
+            function, offsets = MORPHOLOGY_NODES[function_name]
+        else:
+            chain = self.graphparser.morphology_fusion.get_chain(node.attributes["id"].value)
+            function, offsets = chain.function, chain.offsets
+        return [self.nonlinear_filter(inputs[0], function, offsets, self.get_border(node))]
+
+    def run_sobel3x3(self, node, function_name, inputs, output_ids):
+        padded = self.pad(inputs[0].astype('int64'), 1, 1, self.get_border(node))
+        gradient_x = numpy.zeros(inputs[0].shape, dtype='int64')
+        gradient_y = numpy.zeros(inputs[0].shape, dtype='int64')
+        for dy in range(-1, 2):
+            for dx in range(-1, 2):
+                shifted = self.get_shifted(padded, 1, inputs[0].shape, dx, dy)
+                gradient_x += SOBEL_KERNEL_X[dy + 1][dx + 1] * shifted
+                gradient_y += SOBEL_KERNEL_X[dx + 1][dy + 1] * shifted
+        return [convert(gradient_x, self.get_dtype(output_ids[0]), None),
+                convert(gradient_y, self.get_dtype(output_ids[1]), None)]
+
+    def run_magnitude(self, node, function_name, inputs, output_ids):
+        values = numpy.sqrt(inputs[0].astype('float64') ** 2 + inputs[1].astype('float64') ** 2)
+        return [convert(round_to_nearest(values), self.get_dtype(output_ids[0]), None)]
+
+    def run_half_scale_gaussian(self, node, function_name, inputs, output_ids):
+        kernel_size = int(self.get_numeric_parameter(node, 'vx_int32'))
+        if kernel_size == 1:
+            return [inputs[0][::2, ::2].copy()]
+        if kernel_size not in GAUSSIAN_KERNELS:
+            raise RuntimeError("HalfScaleGaussian node {} has an invalid kernel size {}".format(
+                node.attributes["id"].value, kernel_size))
+        kernel = GAUSSIAN_KERNELS[kernel_size]
+        radius = kernel_size // 2
+        padded = self.pad(inputs[0].astype('int64'), radius, radius, self.get_border(node))
+        values = numpy.zeros(inputs[0].shape, dtype='int64')
+        for dy in range(-radius, radius + 1):
+            for dx in range(-radius, radius + 1):
+                values += kernel[dy + radius] * kernel[dx + radius] * self.get_shifted(padded, radius, inputs[0].shape, dx, dy)
+        # The kernel is normalized with truncation, as by vxConvolveNode
+        values //= sum(kernel) ** 2
+        return [convert(values[::2, ::2], self.get_dtype(output_ids[0]), None)]
+
+    def run_scale_image(self, node, function_name, inputs, output_ids):
+        width, height = self.get_image_size(output_ids[0])
+        if width == 0 or height == 0:
+            raise RuntimeError("The output image {} of ScaleImage node {} needs a width and height".format(
+                output_ids[0], node.attributes["id"].value))
+        image = inputs[0]
+        interpolation = self.get_parameter(node, 'vx_interpolation_type_e')
+        dtype = self.get_dtype(output_ids[0])
+        if 'AREA' in interpolation and image.shape[0] % height == 0 and image.shape[1] % width == 0:
+            factor_y = image.shape[0] // height
+            factor_x = image.shape[1] // width
+            blocks = image.astype('float64').reshape(height, factor_y, width, factor_x)
+            return [convert(round_to_nearest(blocks.mean(axis=(1, 3))), dtype, None)]
+        if 'AREA' in interpolation:
+            # Non-integer scale factors are approximated with bilinear interpolation
+            interpolation = 'BILINEAR'
+        ys, xs = numpy.mgrid[0:height, 0:width].astype('float64')
+        xs = (xs + 0.5) * image.shape[1] / width - 0.5
+        ys = (ys + 0.5) * image.shape[0] / height - 0.5
+        border = self.get_border(node)
+        if border[0] == 'VX_BORDER_MODE_UNDEFINED':
+            border = ('VX_BORDER_MODE_REPLICATE', 0)
+        return [convert(self.interpolate(image, ys, xs, interpolation, border), dtype, None)]
+
+    def run_warp_affine(self, node, function_name, inputs, output_ids):
+        # Imported here, since the node_parse_info package imports the graphml_parser package
+        from node_parse_info import warp_affine
+        matrix_type = self.get_parameter(node, 'vx_matrix') or 'MATRIX_UNITY'
+        if matrix_type not in warp_affine.DEFAULT_MATRIXs:
+            raise RuntimeError("Matrix implementation for {} not found".format(matrix_type))
+        # The matrix is given as C code, {{x coefficients}, {y coefficients}, {offsets}}
+        matrix_string = re.sub(r'/\*.*?\*/', '', warp_affine.DEFAULT_MATRIXs[matrix_type])
+        matrix = [[float(evaluate_expression(value, self.userdata_values)) for value in row.split(',')]
+                  for row in re.findall(r'\{([^{}]*)\}', matrix_string)]
+
+        width, height = self.get_image_size(output_ids[0])
+        height = height or inputs[0].shape[0]
+        width = width or inputs[0].shape[1]
+        ys, xs = numpy.mgrid[0:height, 0:width].astype('float64')
+        source_xs = matrix[0][0] * xs + matrix[1][0] * ys + matrix[2][0]
+        source_ys = matrix[0][1] * xs + matrix[1][1] * ys + matrix[2][1]
+        border = self.get_border(node)
+        if border[0] == 'VX_BORDER_MODE_UNDEFINED':
+            border = ('VX_BORDER_MODE_CONSTANT', 0)
+        interpolation = self.get_parameter(node, 'vx_interpolation_type_e')
+        return [convert(self.interpolate(inputs[0], source_ys, source_xs, interpolation, border),
+                        self.get_dtype(output_ids[0]), None)]
+
+    # The reference implementation of each function node
+    NODE_FUNCTIONS = {'HalfScaleGaussian'  : run_half_scale_gaussian,
+                      'Subtract'           : run_arithmetic,
+                      'Threshold'          : run_threshold,
+                      'Sobel3x3'           : run_sobel3x3,
+                      'AbsDiff'            : run_arithmetic,
+                      'ConvertDepth'       : run_convert_depth,
+                      'Dilate3x3'          : run_morphology,
+                      'Erode3x3'           : run_morphology,
+                      'Add'                : run_arithmetic,
+                      'Multiply'           : run_multiply,
+                      'ScaleImage'         : run_scale_image,
+                      'Magnitude'          : run_magnitude,
+                      'TableLookup'        : run_table_lookup,
+                      'Or'                 : run_arithmetic,
+                      'And'                : run_arithmetic,
+                      'WarpAffine'         : run_warp_affine,
+                      'Dilate2x2'          : run_morphology,
+                      'Erode2x2'           : run_morphology,
+                      'MorphologyChain'    : run_morphology,
+                      'FoldedTableLookup'  : run_table_lookup
+                      }
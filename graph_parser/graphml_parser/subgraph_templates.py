@@ -0,0 +1,159 @@
+"""Subgraph Templates Class
+"""
+
+import hashlib
+
+def is_group_node(node):
+    """Returns True if node is a yEd group node, i.e. a node that contains a nested graph."""
+    for child in node.childNodes:
+        if child.nodeName == 'graph':
+            return True
+    return False
+
+def get_own_elements_by_tag_name(node, tag_name):
+    """Returns the elements with tag_name in node, excluding the elements in nested graphs of group nodes."""
+    elements = []
+    for child in node.childNodes:
+        if child.nodeType != child.ELEMENT_NODE or child.nodeName == 'graph':
+            continue
+        if child.nodeName == tag_name:
+            elements.append(child)
+        elements += get_own_elements_by_tag_name(child, tag_name)
+    return elements
+
+class SubgraphTemplates:
+    """Class that finds the yEd group nodes of a graph and treats them as subgraph templates.
+
+    Group nodes contain a nested graph, and yEd gives the nodes in it ids prefixed with the id of the group,
+    e.g. n0::n3. Groups with the same structure, i.e. the same nodes with the same configuration, label
+    and data text, connected by the same edges, get the same structural hash and are copies of one template.
+    The first copy of each template in the graph is its prototype, and each node of the other copies is
+    mapped to the corresponding node of the prototype, so that the result of parsing a prototype node
+    can be reused for all its copies.
+
+    The group nodes themselves are not part of the processing, flatten() moves their contents
+    to the top level graph so that the rest of the parser handles them as any other node.
+    """
+
+    def __init__(self, debug_mode):
+        self.debug_mode = debug_mode
+        self.reset()
+
+    def reset(self):
+        # Dictionary with the structural hash as key and the list of group node ids with that hash as value
+        self.templates = {}
+        # Dictionary with the id of each group node as key and its structural hash as value
+        self.group_hashes = {}
+        # Dictionary with the id of each node in a copy of a template as key
+        # and the id of the corresponding node in the prototype of the template as value
+        self.prototype_ids = {}
+        # Ids of all nodes in group nodes
+        self.group_member_ids = set()
+
+    def run(self, graph):
+        """Finds the templates of the group nodes in graph and flattens the graph."""
+        self.reset()
+        group_nodes = [node for node in graph.getElementsByTagName('node') if is_group_node(node)]
+        if not group_nodes:
+            return
+
+        # Dictionary with the source node id of each edge as key and the list of its edges as value,
+        # so that hashing a group only visits the edges of its own nodes
+        edges_by_source = {}
+        for edge in graph.getElementsByTagName('edge'):
+            edges_by_source.setdefault(edge.attributes["source"].value, []).append(edge)
+        group_node_ids = {}
+        for group_node in group_nodes:
+            group_id = group_node.attributes["id"].value
+            node_ids = [node.attributes["id"].value for node in group_node.getElementsByTagName('node')]
+            group_node_ids[group_id] = node_ids
+            self.group_member_ids.update(node_ids)
+            structural_hash = self.get_structural_hash(group_node, node_ids, edges_by_source)
+            self.group_hashes[group_id] = structural_hash
+            if structural_hash not in self.templates:
+                self.templates[structural_hash] = []
+            instances = self.templates[structural_hash]
+            instances.append(group_id)
+            if len(instances) > 1:
+                for node_id, prototype_node_id in zip(node_ids, group_node_ids[instances[0]]):
+                    # Nodes in nested groups are mapped by their outermost group
+                    if node_id not in self.prototype_ids:
+                        self.prototype_ids[node_id] = self.prototype_ids.get(prototype_node_id, prototype_node_id)
+
+        self.flatten(graph)
+
+        if self.debug_mode:
+            print "Subgraph templates: " + str(self.templates.values())
+
+    def get_structural_hash(self, group_node, node_ids, edges_by_source):
+        """Returns a hash of the nodes and edges in the group, independent of their ids and positions.
+
+        edges_by_source is a dictionary with a node id as key and the list of edges from the node as value.
+        """
+        node_indices = dict([(node_id, index) for index, node_id in enumerate(node_ids)])
+        description = []
+        edge_description = []
+        for node in group_node.getElementsByTagName('node'):
+            if is_group_node(node):
+                description.append("group")
+                continue
+            configuration = ""
+            label = ""
+            for node_appearance in get_own_elements_by_tag_name(node, 'y:GenericNode'):
+                configuration = node_appearance.attributes["configuration"].value
+                labels = node_appearance.getElementsByTagName('y:NodeLabel')
+                if labels and labels[0].firstChild:
+                    label = labels[0].firstChild.wholeText
+            description.append(u"node {} {} {}".format(configuration, label, self.get_own_datatext(node)))
+        for source in node_ids:
+            for edge in edges_by_source.get(source, []):
+                target = edge.attributes["target"].value
+                if target in node_indices:
+                    labels = edge.getElementsByTagName('y:EdgeLabel')
+                    label = labels[0].firstChild.wholeText if labels and labels[0].firstChild else ""
+                    edge_description.append(u"edge {} {} {}".format(node_indices[source], node_indices[target], label))
+        # The order of the edges in the file does not change the structure
+        description += sorted(edge_description)
+        return hashlib.sha1(u"\n".join(description).encode('utf-8')).hexdigest()
+
+    def get_own_datatext(self, node):
+        """Returns the data text of node itself, like parse_common.get_node_datatext but not from nested nodes."""
+        datatext = ""
+        for data_node in get_own_elements_by_tag_name(node, 'data'):
+            if data_node.attributes["key"].value == "d5" and data_node.firstChild:
+                datatext = data_node.firstChild.wholeText
+        return datatext
+
+    def flatten(self, graph):
+        """Moves all nodes and edges in the nested graphs to the top level graph and removes the group nodes.
+
+        The nodes and edges keep their order in the file, so the generated code does not depend on the grouping.
+        """
+        top_graph = graph.getElementsByTagName('graph')[0]
+        elements = [element for element in self.get_elements_in_order(top_graph)
+                    if element.nodeName == 'edge' or not is_group_node(element)]
+        for element in elements:
+            element.parentNode.removeChild(element)
+        for group_node in [node for node in top_graph.getElementsByTagName('node') if is_group_node(node)]:
+            if group_node.parentNode is not None:
+                group_node.parentNode.removeChild(group_node)
+        for element in elements:
+            top_graph.appendChild(element)
+
+    def get_elements_in_order(self, graph_element):
+        """Returns the node and edge elements in graph_element and its nested graphs, in file order."""
+        elements = []
+        for child in graph_element.childNodes:
+            if child.nodeName in ['node', 'edge']:
+                elements.append(child)
+                if child.nodeName == 'node':
+                    for nested_graph in [grandchild for grandchild in child.childNodes if grandchild.nodeName == 'graph']:
+                        elements += self.get_elements_in_order(nested_graph)
+        return elements
+
+    def get_prototype_id(self, node_id):
+        """Returns the id of the corresponding prototype node if the node is in a copy of a template, otherwise node_id."""
+        return self.prototype_ids.get(node_id, node_id)
+
+    def get_nbr_copies(self):
+        return sum([len(instances) for instances in self.templates.values()])
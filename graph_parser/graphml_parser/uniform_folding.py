@@ -0,0 +1,200 @@
+"""Uniform Image Folding Class
+"""
+
+import math
+import parse_common
+
+# Arithmetic function nodes that can be folded when one of the inputs is a uniform image
+FOLDABLE_NODES = ['Add', 'Subtract', 'Multiply', 'And', 'Or', 'AbsDiff']
+
+# The function node name used for a node folded into a lookup table
+FOLDED_NODE_NAME = 'FoldedTableLookup'
+
+def convert_u8(value, policy):
+    """Converts value to the U8 range with the given vx_convert_policy_e."""
+    if policy == 'VX_CONVERT_POLICY_WRAP':
+        return int(value) & 0xFF
+    return min(max(int(value), 0), 255)
+
+def round_value(value, policy):
+    """Rounds value with the given vx_round_policy_e."""
+    if policy == 'VX_ROUND_POLICY_TO_ZERO':
+        return int(value)
+    # VX_ROUND_POLICY_TO_NEAREST_EVEN
+    floor_value = math.floor(value)
+    diff = value - floor_value
+    if diff > 0.5 or (diff == 0.5 and floor_value % 2 == 1):
+        return int(floor_value) + 1
+    return int(floor_value)
+
+class UniformImageFolding:
+    """Graph optimization pass that folds arithmetic nodes with a uniform input image.
+
+    Add, Subtract, Multiply, And, Or and AbsDiff nodes where one input is a uniform image
+    are evaluated at generation time using the uniform image value:
+
+      - If the node is an identity (e.g. add 0, and 255, or 0) and the output is an internal image,
+        the node is dropped and the consumers of the output use the other input image directly.
+      - Otherwise, if the other input and the output are U8 images,
+        the node is replaced with a TableLookup node with a generated lookup table.
+
+    Uniform images that are no longer used by any function node are removed from the graph,
+    so they are never created. The pass must only run after the image format check.
+    """
+
+    def __init__(self, debug_mode):
+        self.debug_mode = debug_mode
+        # Dictionary with the id of each function node folded into a lookup table as key
+        # and a list of the 256 lookup table values as value.
+        self.folded_luts = {}
+
+    def run(self, function_nodes, image_nodes, image_format_checker, library):
+        """Folds the foldable function nodes of the graph.
+
+        Returns the number of removed function nodes and the number of folded function nodes.
+        """
+        nbr_removed_nodes = 0
+        nbr_folded_nodes = 0
+
+        for node in list(function_nodes.indexed_function_nodes):
+            folding = self.get_folding(function_nodes, image_nodes, image_format_checker, node)
+            if folding is None:
+                continue
+            uniform_id, other_id, lut = folding
+            node_info = function_nodes.get_node_info(node)
+            output_id = node_info.output_image_node_ids[0]
+
+            if lut == range(256) and self.can_alias(image_nodes, output_id) and \
+                    image_format_checker.PIN_FORMAT[image_format_checker.PIN_ID.index(other_id)] == \
+                    image_format_checker.PIN_FORMAT[image_format_checker.PIN_ID.index(output_id)]:
+                # Identity: drop the node and let the consumers use the other input directly
+                for other_node in function_nodes.indexed_function_nodes:
+                    other_node_info = function_nodes.get_node_info(other_node)
+                    other_node_info.input_image_node_ids = [other_id if image_id == output_id else image_id
+                                                            for image_id in other_node_info.input_image_node_ids]
+                function_nodes.remove_function_node(node)
+                image_nodes.virtual_nodes_indexed_names.remove(output_id)
+                nbr_removed_nodes += 1
+                if self.debug_mode:
+                    print "Folded identity node {} into an alias of image {}".format(node.attributes["id"].value, other_id)
+            elif lut is not None and self.is_u8_image(image_format_checker, other_id) and \
+                    self.is_u8_image(image_format_checker, output_id):
+                node_info.input_image_node_ids = [other_id]
+                node_info.input_edge_labels = ["NO_LABEL"]
+                function_nodes.function_nodes_indexed_names[function_nodes.get_function_node_position(node)] = FOLDED_NODE_NAME
+                self.folded_luts[node.attributes["id"].value] = lut
+                nbr_folded_nodes += 1
+                if self.debug_mode:
+                    print "Folded node {} into a lookup table".format(node.attributes["id"].value)
+
+        self.remove_unused_uniform_images(function_nodes, image_nodes)
+        if nbr_removed_nodes > 0 or nbr_folded_nodes > 0:
+            function_nodes.populate_io_and_debug_function_node_indexed_lists(library, image_nodes)
+
+        return nbr_removed_nodes, nbr_folded_nodes
+
+    def get_folding(self, function_nodes, image_nodes, image_format_checker, node):
+        """Returns a tuple (uniform_id, other_id, lut) if node can be folded, otherwise None.
+
+        uniform_id is the id of the uniform input image and other_id the id of the other input image.
+        lut is the list of the 256 output values for all U8 input values, or None if the
+        node can not be folded into a lookup table.
+        """
+        function_name = function_nodes.get_function_node_name(node)
+        if function_name not in FOLDABLE_NODES:
+            return None
+        if any(item[0] == node for item in function_nodes.dynamic_nodes_info):
+            return None
+        node_info = function_nodes.get_node_info(node)
+        if len(node_info.input_image_node_ids) != 2 or len(node_info.output_image_node_ids) != 1:
+            return None
+
+        uniform_labels = [label for image_id, label in zip(node_info.input_image_node_ids, node_info.input_edge_labels)
+                          if image_id in image_nodes.uniform_input_image_indexed_names]
+        if len(uniform_labels) != 1:
+            return None
+        uniform_id = node_info.input_image_node_ids[node_info.input_edge_labels.index(uniform_labels[0])]
+        other_id = node_info.input_image_node_ids[1 - node_info.input_edge_labels.index(uniform_labels[0])]
+        try:
+            uniform_value = int(image_nodes.uniform_input_image_indexed_values[image_nodes.get_uniform_image_index(uniform_id)])
+        except ValueError:
+            # The uniform value is a userdata reference, and is not known at generation time
+            return None
+
+        if not self.is_u8_image(image_format_checker, other_id) or not self.is_u8_image(image_format_checker, uniform_id):
+            if self.is_identity(function_name, node, uniform_labels[0], uniform_value):
+                return uniform_id, other_id, range(256)
+            return None
+
+        lut = []
+        for value in range(256):
+            lut.append(self.evaluate(function_name, node, uniform_labels[0], uniform_value, value))
+            if lut[-1] is None:
+                return None
+        return uniform_id, other_id, lut
+
+    def evaluate(self, function_name, node, uniform_label, uniform_value, value):
+        """Evaluates the U8 output of the function node for the U8 input value of the non-uniform input."""
+        policy = parse_common.parse_parameter("vx_convert_policy_e", node)
+        if function_name == 'Add':
+            return convert_u8(value + uniform_value, policy)
+        elif function_name == 'Subtract':
+            if uniform_label == 'in2':
+                return convert_u8(value - uniform_value, policy)
+            return convert_u8(uniform_value - value, policy)
+        elif function_name == 'Multiply':
+            try:
+                scale = float(parse_common.parse_parameter("vx_float32", node).rstrip("fF"))
+            except ValueError:
+                return None
+            rounding_policy = parse_common.parse_parameter("vx_round_policy_e", node)
+            return convert_u8(round_value(value * uniform_value * scale, rounding_policy), policy)
+        elif function_name == 'And':
+            return value & uniform_value
+        elif function_name == 'Or':
+            return value | uniform_value
+        elif function_name == 'AbsDiff':
+            return abs(value - uniform_value)
+        return None
+
+    def is_identity(self, function_name, node, uniform_label, uniform_value):
+        """Checks if the function node is an identity for non-U8 images."""
+        if function_name in ['Add', 'Or']:
+            return uniform_value == 0
+        elif function_name == 'Subtract':
+            return uniform_label == 'in2' and uniform_value == 0
+        elif function_name == 'Multiply':
+            try:
+                scale = float(parse_common.parse_parameter("vx_float32", node).rstrip("fF"))
+            except ValueError:
+                return False
+            return uniform_value * scale == 1.0
+        return False
+
+    def is_u8_image(self, image_format_checker, image_id):
+        return image_format_checker.PIN_FORMAT[image_format_checker.PIN_ID.index(image_id)] == 'U8'
+
+    def can_alias(self, image_nodes, image_id):
+        """Checks if the image can be replaced by another image, i.e. if it is an internal image."""
+        return image_id in image_nodes.virtual_nodes_indexed_names and \
+               image_id not in image_nodes.debug_nodes_indexed_names
+
+    def remove_unused_uniform_images(self, function_nodes, image_nodes):
+        """Removes the uniform images that are not input to any function node."""
+        used_image_ids = set()
+        for node in function_nodes.indexed_function_nodes:
+            used_image_ids.update(function_nodes.get_node_info(node).input_image_node_ids)
+
+        for image_id in list(image_nodes.uniform_input_image_indexed_names):
+            if image_id not in used_image_ids:
+                index = image_nodes.get_uniform_image_index(image_id)
+                del image_nodes.uniform_input_image_indexed_names[index]
+                del image_nodes.uniform_input_image_indexed_values[index]
+                del image_nodes.uniform_input_image_indexed_formats[index]
+                image_nodes.virtual_nodes_indexed_names.remove(image_id)
+                if self.debug_mode:
+                    print "Removed unused uniform image " + image_id
+
+    def get_lut(self, node_id):
+        """Returns the lookup table values for the folded function node with id node_id, or None."""
+        return self.folded_luts.get(node_id)
@@ -2,20 +2,35 @@
 
 import parse_common
 
+# Dictionary of currently supported graph options and their corresponding valid values.
+# Graph options are set in the userdata node with the same notation as the userdata attributes,
+# but they control the code generation for the graph instead of ending up in the userdata struct.
+# Options with None as valid values accept any value.
+GRAPH_OPTIONS_VALID = {'fuse_morphology': ['true', 'false'],
+                       'fold_uniform_images': ['true', 'false'],
+                       'vx_target': None}
+
 class Userdata:
     """ Class for handling the special userdata node for adding custom attributes to graph creation.
     NOTE: The userdata attributes are assumed to be specified on separate lines in the userdata node's data field.
     Example of userdata node data field:
     [unsigned ref_width]
     [int ref_height]'
+
+    Lines where the first word is a graph option name (see GRAPH_OPTIONS_VALID) are graph options,
+    e.g. [fuse_morphology false], and are not added to the userdata attributes.
     """
 
     def __init__(self, debug_mode):
         self.debug_mode = debug_mode
+        # True if the userdata node has attributes, i.e. if a userdata struct is needed
         self.has_userdata = False
+        self.has_userdata_node = False
         self.attributes_populated = False
         # A dictionary containing userdata attributes with names as keys and types as values
         self.attributes = {}
+        # A dictionary containing the graph options set in the userdata node with names as keys
+        self.graph_options = {}
 
     def populate_userdata(self, graph, validation_output_graph):
         """ Populates the userdata attributes dictionary """
@@ -26,13 +41,13 @@ class Userdata:
         for node in graph.getElementsByTagName('node'):
             for nodeAppearance in node.getElementsByTagName('y:GenericNode'):
                 if nodeAppearance.attributes["configuration"].value == "com.yworks.flowchart.userMessage":
-                    if self.has_userdata:
+                    if self.has_userdata_node:
                         print "ERROR: Found multiple userdata nodes, only one is allowed"
                         graph_has_errors = True
                         parse_common.set_text_on_node(validation_output_graph, node,
                                                       "Userdata\nis not\nunique", 'Red', True)
                     else:
-                        self.has_userdata = True
+                        self.has_userdata_node = True
                         userdata_node = node
                         datatext = parse_common.get_node_datatext(node)
 
@@ -48,7 +63,15 @@ class Userdata:
                 parse_common.set_text_on_node(validation_output_graph, userdata_node,
                                               "Userdata\nnot\nformatted\ncorrectly", 'Red', True)
             else:
-                if attribute_name in self.attributes:
+                if data_type in GRAPH_OPTIONS_VALID:
+                    if GRAPH_OPTIONS_VALID[data_type] is not None and attribute_name not in GRAPH_OPTIONS_VALID[data_type]:
+                        print "ERROR: invalid value {} for graph option {}".format(attribute_name, data_type)
+                        graph_has_errors = True
+                        parse_common.set_text_on_node(validation_output_graph, userdata_node,
+                                                      "Userdata\nhas invalid\ngraph option", 'Red', True)
+                    else:
+                        self.graph_options[data_type] = attribute_name
+                elif attribute_name in self.attributes:
                     print "ERROR: userdata cannot contain several entries with same name"
                     graph_has_errors = True
                     parse_common.set_text_on_node(validation_output_graph, userdata_node,
@@ -57,5 +80,10 @@ class Userdata:
                     # TODO: Should add check that attribute_name is valid C-variable name
                     self.attributes[attribute_name] = data_type
 
+        self.has_userdata = len(self.attributes) > 0
         self.attributes_populated = True
         return graph_has_errors
+
+    def get_graph_option(self, option, default=None):
+        """ Get the value of a graph option, or default if the option is not set in the userdata node."""
+        return self.graph_options.get(option, default)
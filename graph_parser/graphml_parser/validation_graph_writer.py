@@ -0,0 +1,161 @@
+"""Functions for writing the validation/error graph
+
+The validation graph is written by a streaming pass over the original graphml file, which is read in chunks
+and split into text, CDATA sections, other markup (comments, processing instructions) and tags.
+Only the y:NodeLabel text and the y:Fill and y:Geometry attributes of the nodes that
+have been annotated in the validation graph (see parse_common.set_text_on_node) are rewritten,
+everything else is copied verbatim, so the written graph keeps the formatting of yEd.
+"""
+
+import re
+import shutil
+from xml.sax.saxutils import escape, unescape
+import parse_common
+
+CHUNK_SIZE = 65536
+
+# Kinds of the parts of the graphml file given by read_tokens
+TEXT = 'text'
+CDATA = 'cdata'
+MARKUP = 'markup'
+TAG = 'tag'
+
+# Markup that is copied without looking inside it, with its start and end strings
+SKIPPED_MARKUP = [(CDATA, '<![CDATA[', ']]>'), (MARKUP, '<!--', '-->'), (MARKUP, '<?', '?>')]
+# A tag, with quoted attribute values that may contain >
+TAG_PATTERN = re.compile(r'<(?:[^>"\']|"[^"]*"|\'[^\']*\')*>')
+TAG_NAME = re.compile(r'</?([^\s/>]+)')
+# The rewritten elements of an annotated node
+REWRITTEN_TAGS = ['y:NodeLabel', 'y:Fill', 'y:Geometry']
+ATTRIBUTE = r'(\s{}=)(["\'])(.*?)\2'
+CHARACTER_REFERENCE = re.compile(r'&#(x?)([0-9a-fA-F]+);')
+
+def unescape_xml(text):
+    """Returns text with the XML entity and character references replaced."""
+    text = CHARACTER_REFERENCE.sub(lambda match: unichr(int(match.group(2), 16 if match.group(1) else 10)), text)
+    return unescape(text, {'&quot;': '"', '&apos;': "'"})
+
+def get_annotated_nodes(validation_graph):
+    """Returns a dictionary with the id of each annotated node in validation_graph as key and the node as value."""
+    return dict([(node.attributes["id"].value, node) for node in validation_graph.getElementsByTagName('node')
+                 if node.getUserData(parse_common.ANNOTATED)])
+
+def read_tokens(source_file):
+    """Yields the parts of source_file as (kind, source bytes) tuples, reading the file in chunks of CHUNK_SIZE.
+
+    Only the part that is being split is kept in memory, together with the rest of the last chunk.
+    """
+    buffer = ''
+    position = 0
+    at_end = False
+    while True:
+        token = get_token(buffer, position, at_end)
+        if token is None:
+            if at_end:
+                return
+            chunk = source_file.read(CHUNK_SIZE)
+            at_end = not chunk
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        kind, end = token
+        yield kind, buffer[position:end]
+        position = end
+
+def get_token(buffer, position, at_end):
+    """Returns the (kind, end position) tuple of the part that starts at position in buffer,
+    or None if the end of the part is not in buffer and more data must be read.
+
+    Incomplete parts at the end of the file are returned as TEXT, so that they are copied verbatim.
+    """
+    if position == len(buffer):
+        return None
+    if buffer[position] != '<':
+        end = buffer.find('<', position)
+        if end >= 0:
+            return TEXT, end
+        return (TEXT, len(buffer)) if at_end else None
+    if not at_end and len(buffer) - position < len('<![CDATA['):
+        return None
+    for kind, start_string, end_string in SKIPPED_MARKUP:
+        if buffer.startswith(start_string, position):
+            end = buffer.find(end_string, position + len(start_string))
+            if end >= 0:
+                return kind, end + len(end_string)
+            return (TEXT, len(buffer)) if at_end else None
+    match = TAG_PATTERN.match(buffer, position)
+    if match:
+        return TAG, match.end()
+    return (TEXT, len(buffer)) if at_end else None
+
+def write_validation_graph(source_path, validation_graph, output_path):
+    """Writes the graphml file source_path to output_path, with the annotations of validation_graph.
+
+    As in set_text_on_node, the first y:NodeLabel, y:Fill and y:Geometry elements of an annotated node are rewritten.
+    The elements of the node itself come before the next node or edge, also for group nodes.
+    """
+    annotated_nodes = get_annotated_nodes(validation_graph)
+    if not annotated_nodes:
+        shutil.copyfile(source_path, output_path)
+        return
+
+    with open(source_path, 'rb') as source_file, open(output_path, 'wb') as output_file:
+        # The annotated node whose own elements come next, and the tags of it that have not been rewritten yet
+        node = None
+        pending_tags = []
+        # The y:NodeLabel element of node and the TEXT and CDATA tokens of its label text, while they are read
+        label = None
+        label_tokens = []
+        for kind, data in read_tokens(source_file):
+            if label is not None:
+                if kind in [TEXT, CDATA]:
+                    label_tokens.append((kind, data))
+                    continue
+                output_file.write(get_label_text(label_tokens, label))
+                label = None
+            if kind == TAG and not data.startswith('</'):
+                name = TAG_NAME.match(data).group(1)
+                if name in ['node', 'edge']:
+                    id_match = re.search(ATTRIBUTE.format('id'), data)
+                    node = annotated_nodes.get(id_match.group(3).decode('utf-8')) \
+                        if name == 'node' and id_match else None
+                    pending_tags = list(REWRITTEN_TAGS) if node else []
+                elif name in pending_tags:
+                    pending_tags.remove(name)
+                    elements = node.getElementsByTagName(name)
+                    if elements:
+                        data = get_start_tag(data, elements[0])
+                        if name == 'y:NodeLabel' and elements[0].firstChild:
+                            if data.endswith('/>'):
+                                # An empty label element gets the label text
+                                data = data[:-2] + '>' + escape(elements[0].firstChild.wholeText).encode('utf-8') + \
+                                       '</y:NodeLabel>'
+                            else:
+                                label = elements[0]
+                                label_tokens = []
+            output_file.write(data)
+        if label is not None:
+            output_file.write(get_label_text(label_tokens, label))
+
+def get_label_text(tokens, element):
+    """Returns the label text given by the TEXT and CDATA tokens, replaced by the text of element if it differs."""
+    text = u''.join([unescape_xml(data.decode('utf-8')) if kind == TEXT else
+                     data[len('<![CDATA['):-len(']]>')].decode('utf-8') for kind, data in tokens])
+    if text == element.firstChild.wholeText:
+        return ''.join([data for kind, data in tokens])
+    return escape(element.firstChild.wholeText).encode('utf-8')
+
+def get_start_tag(start_tag, element):
+    """Returns start_tag with the attribute values that differ from the attributes of element replaced."""
+    for name, value in element.attributes.items():
+        match = re.search(ATTRIBUTE.format(re.escape(name)), start_tag)
+        if match and unescape_xml(match.group(3).decode('utf-8')) == value:
+            continue
+        quote = match.group(2) if match else '"'
+        quoted_value = quote + escape(value, {quote: '&quot;' if quote == '"' else '&apos;'}).encode('utf-8') + quote
+        if match:
+            start_tag = start_tag[:match.start()] + match.group(1) + quoted_value + start_tag[match.end():]
+        else:
+            tag_end = len(start_tag) - (2 if start_tag.endswith('/>') else 1)
+            start_tag = start_tag[:tag_end] + ' ' + name.encode('utf-8') + '=' + quoted_value + start_tag[tag_end:]
+    return start_tag
@@ -10,41 +10,40 @@ To add support for a new OpenVX function node type to the graph parser, follow t
      to be used by the graph parser.\n
      E.g. if the node is named: "vxMyNodeNameNode",
      the graph parser should use the name "MyNodeName".
-  2. In the file function_node_library.py, add a new entry for the new node
-     in the different dictionaries as follows:
+  2. In the file node_specs.py, add a NodeSpec for the new node to NODE_SPECS:
 
-       - B{Dictionary for the constructor name:}
-           - NODE_DICTIONARY:                     'MyNodeName' : MyNodeName()
+       - B{Node creation function and arguments:}\n
+         Give the name of the node creation function and its arguments in the order of the OpenVX API.
+         Note that the first parameter (the graph object) is not given.
+         Input and output images are given by INPUT and OUTPUT, the other arguments by Parameter objects:
+           - ENUM: a value given in the node data as [data_type value], e.g. Parameter(ENUM, 'vx_convert_policy_e')
+           - SCALAR: a vx_scalar created from a value given in the node data,
+             e.g. Parameter(SCALAR, 'vx_scalar', data_type='vx_int32', vx_type='VX_TYPE_INT32')
+           - OBJECT: a parameter object created by a node class, see step 3
+           - FIXED: a constant argument
+         The image indices and the parameter names and indices in function_node_library.py
+         are created from the arguments.
 
-       - B{Dictionaries for I/O image indices:}\n
-         Look up the parameter index of the first input and the first output images in the OpenVX API
-         Note that the first parameter (the graph object) is not counted,
-         and indexing starts from 0.
-           - FIRST_INPUT_IMAGE_INDEX_DICT         'MyNodeName' :    0
-           - FIRST_OUTPUT_IMAGE_INDEX_DICT        'MyNodeName':    1
-
-       - B{Dictionary for non-image parameters and indices:}\n
-         Add an entry for each of the non-image parameters in the node API,
-         and add the corresponding parameter indices in the respective dictionaries:
-           - PARAMETER_NAMES_DICT                 'MyNodeName':    ["vx_convert_policy_e", "vx_scalar"],
-           - PARAMETER_INDICES_DICT               'MyNodeName':    [2, 3]
-
-       - B{Dictionary for I/O image formats:}\n
-         Add the allowed input and output image formats as lists of format lists in the respective dictionaries.
-         Note that the inputs ans outputs are coupled. So an input list of image formats should
-         correspond in index position to the related output list of image formats.
+       - B{I/O image formats:}\n
+         Add the allowed combinations of input and output image formats as (inputs, outputs) tuples.
          The Or node is given as an example here:
-           - VALID_INPUT_IMAGE_FORMATS            'Or' :[['U8','U8'],['U8','U8']]
-           - VALID_OUTPUT_IMAGE_FORMATS           'Or' :[['U8'],['VIRT->U8']]
+           - [(['U8','U8'], ['U8']), (['U8','U8'], ['VIRT->U8'])]
          If no format is specified in the yEd graph, the image is treated as a virtual image.
-         When the parser checks the image formats, it will then look for a match in the valid formats arrays
+         When the parser checks the image formats, it will then look for a match in the valid formats
          containing an entry beginning with I{VIRT} and will generate code with the image having the format
          given after the arrow (i.e. here U8). Other nodes, taking this image as input will then treat the input
          as U8. Thus, the parser never sees virtual input images, only virtual output images.
-         See further details about this formatting in function_node_library.py.
-  3. Add a class object for the new node. For an example of a simple node, see e.g. the file or_node.py.
+         Note that two combinations with the same output formats must have different input formats.
+
+       - B{Tiling and cost:}\n
+         Give the (radius, vertical downscale) tuple if the node can be processed in tiles,
+         and the number of operations per output pixel used by the cost model.
+
+  3. The code of nodes with only ENUM, SCALAR and FIXED parameters is generated from the spec by SpecNode.
+     For nodes with OBJECT parameters, add a class object for the new node (see e.g. the file threshold.py)
+     and add it to NODE_CLASSES in function_node_library.py.
      The class object inherits from a base class providing common functionality for all nodes,
-     such as parsing for image parameters.The new class node must contain an __init__ function and a parse function.
+     such as parsing for image parameters. The new class node must contain an __init__ function and a parse function.
      The latter is used by the graphml_parser to generate the code for a node creation function
      according to the OpenVX API.
 """
@@ -91,6 +91,23 @@ class BaseNode:
 
         return parsed_string
 
+    def parse_target(self, graphparser, current_node, node_ref_string, dry_run=False):
+        """Parsing of the execution target from xml, given by [vx_target ...] in the node data
+        or by the graph-wide vx_target option in the userdata node.
+        The function node C-name is given by node_ref_string
+        Returns C code for setting the target on the function node.
+        vxSetNodeTarget is not available in OpenVX 1.0.1, so the target is ignored for that version."""
+        parsed_string = ""
+        target = graphparser.get_function_node_target(current_node)
+        if target and not dry_run and graphparser.vx_version != graphml_parser.VX_VERSION_1_0_1:
+            logging.debug('target: ' + target)
+            if target == "VX_TARGET_ANY":
+                parsed_string += "    vxSetNodeTarget({}, VX_TARGET_ANY, NULL);\n".format(node_ref_string)
+            else:
+                parsed_string += "    vxSetNodeTarget({}, VX_TARGET_STRING, \"{}\");\n".format(node_ref_string, target)
+
+        return parsed_string
+
     def set_graph_has_errors(self, graphparser, current_node, errorstring):
         """Sets an error text on the given function node."""
         self.node_has_errors = True
@@ -129,17 +146,10 @@ class BaseNode:
         """
         parsed_string = ""
 
-        if graphparser.strip_io: # Also set I/O images
-            if any(e in self.node_info.input_image_node_ids for e in
-                   graphparser.get_indexed_names('input_image_nodes')):
-                parsed_string += "    (io_nodes->input_nodes)[" + \
-                                 str(graphparser.get_index_for_function_node_in_list('input',
-                                                                                     current_node)) + "] = function_node;\n"
-            if any(e in self.node_info.output_image_node_ids for e in
-                   graphparser.get_indexed_names('output_image_nodes')):
-                parsed_string += "    (io_nodes->output_nodes)[" + \
-                                 str(graphparser.get_index_for_function_node_in_list('output',
-                                                                                     current_node)) + "] = function_node;\n"
+        if graphparser.strip_io or graphparser.pipeline_depth > 0: # I/O images are set with graph parameters
+            for parameter_index, io_graph_index in graphparser.get_io_graph_parameters_for_node(current_node):
+                parsed_string += "    io_parameters[" + str(io_graph_index) + "] = vxGetParameterByIndex(function_node, " + \
+                                 str(parameter_index) + ");\n"
 
         for idx, itemlist in enumerate(graphparser.get_dynamic_function_nodes_info()):
             if itemlist[0] == current_node:
@@ -249,6 +259,15 @@ class BaseNode:
         """
         return parse_common.parse_parameter(parameter, current_node)
 
+    def get_parameter_object(self, graphparser, current_node, object_type, definition):
+        """Gets the C variable name of a parameter object from the parameter object pool of the graphparser.
+
+        The definition is the C code that creates the object, using %(name)s for the object name.
+        Objects of nodes with dynamic parameters are not shared with other nodes.
+        """
+        return graphparser.parameter_pool.get_object_name(object_type, definition,
+                                                          shared=not graphparser.is_function_dynamic_node(current_node))
+
 # Helper functions to generate code for different OpenVX versions
 def get_border_mode_type(vx_version):
     if vx_version == graphml_parser.VX_VERSION_1_0_1:
@@ -13,7 +13,6 @@ class Erode2x2(BaseNode):
     def __init__(self):
         """Initialization of Class object"""
         BaseNode.__init__(self)
-        self.matrix_count = 0
 
     def parse(self, graphparser, current_node, assignment_string, dry_run = False):
         """Parsing of xml and C code for creation of the function node."""
@@ -43,26 +42,22 @@ class Erode2x2(BaseNode):
         else: # ...otherwise we use the more generic vxNonLinearFilterNode
             # Create the matrix object
             # TODO: Figure out how to change the VX_MATRIX_ORIGIN attribute and use vxCreateMatrixFromPattern instead
-            if self.matrix_count == 0 and not dry_run:
-                self.matrix_count += 1
-                parsed_string += "    vx_matrix matrix_erode2x2;\n"
-
-            parsed_string += "    matrix_erode2x2 = vxCreateMatrix(graphmanager_get_context(graph_manager), VX_TYPE_UINT8, 3, 3);\n"
-            parsed_string += "    vx_uint8 buf_erode2x2[9] = { 255, 255, 0,\n"
-            parsed_string += "                                 255, 255, 0,\n"
-            parsed_string += "                                  0,    0, 0 };\n"
-            parsed_string += "    vxCopyMatrix(matrix_erode2x2, buf_erode2x2, VX_WRITE_ONLY, VX_MEMORY_TYPE_HOST);\n"
+            definition = "    vx_matrix %(name)s = vxCreateMatrix(graphmanager_get_context(graph_manager), VX_TYPE_UINT8, 3, 3);\n"
+            definition += """\
+    vx_uint8 %(name)s_values[9] = { 255, 255, 0,
+                                   255, 255, 0,
+                                    0,    0, 0 };
+"""
+            definition += "    vxCopyMatrix(%(name)s, %(name)s_values, VX_WRITE_ONLY, VX_MEMORY_TYPE_HOST);\n"
+            matrix_name = self.get_parameter_object(graphparser, current_node, "vx_matrix", definition)
 
             # Create the vxNonLinearFilterNode to do erosion with the created matrix
             parsed_string += "    " + assignment_string + "vxNonLinearFilterNode(graph_skeleton"
             parsed_string += ", VX_NONLINEAR_FILTER_MIN"
             parsed_string += input_image
-            parsed_string += ", matrix_erode2x2"
+            parsed_string += ", " + matrix_name
             parsed_string += output_image + ");\n"
 
-            # Release the matrix object
-            parsed_string += "    vxReleaseMatrix(&matrix_erode2x2);\n"
-
         parsed_string += self.append_to_io_arrays(graphparser, current_node)
 
         return parsed_string
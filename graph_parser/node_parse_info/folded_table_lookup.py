@@ -0,0 +1,67 @@
+"""Class for writing C-code to create a vxTableLookupNode object for a folded arithmetic node.
+
+The node is never drawn in a graph, it replaces arithmetic nodes with a uniform input image
+when the uniform image folding pass is enabled (see graphml_parser.uniform_folding).
+
+parsed_string contains the C code to be written to file
+"""
+from base_node import BaseNode
+from graphml_parser import graphml_parser
+
+class FoldedTableLookup(BaseNode):
+    """Class for parsing node with the given class name."""
+
+    def __init__(self):
+        """Initialization of Class object"""
+        BaseNode.__init__(self)
+
+    def parse(self, graphparser, current_node, assignment_string, dry_run = False):
+        """Parsing of xml and C code for creation of the function node."""
+        self.reset_parameters(graphparser, current_node, dry_run)
+        parsed_string = ""
+
+        #===============
+        # ERROR CHECKING
+        #===============
+        self.require_nbr_input_edges(graphparser, current_node, 1)
+        self.require_nbr_output_edges(graphparser, current_node, 1)
+
+        lut_values = graphparser.uniform_folding.get_lut(current_node.attributes["id"].value)
+        if lut_values is None:
+            self.set_graph_has_errors(graphparser, current_node, "ERROR: Node is not a folded arithmetic node\n")
+
+        # Early escape if errors
+        if self.node_has_errors:
+            return parsed_string
+
+        #=================
+        # PARSE PARAMETERS
+        #=================
+        definition = "    vx_uint8 %(name)s_values[256] = {\n"
+        definition += ",\n".join("        " + ", ".join("%3d" % value for value in lut_values[row:row + 16])
+                                  for row in range(0, 256, 16))
+        definition += " };\n"
+        definition += "    vx_lut %(name)s = vxCreateLUT(graphmanager_get_context(graph_manager), VX_TYPE_UINT8, 256);\n"
+        if graphparser.vx_version == graphml_parser.VX_VERSION_1_0_1:
+            definition += "    {\n"
+            definition += "        void *lut_ptr = NULL;\n"
+            definition += "        vx_uint32 lut_index;\n"
+            definition += "        vxAccessLUT(%(name)s, &lut_ptr, VX_WRITE_ONLY);\n"
+            definition += "        for (lut_index = 0; lut_index < 256; lut_index++) {\n"
+            definition += "            ((vx_uint8 *)lut_ptr)[lut_index] = %(name)s_values[lut_index];\n"
+            definition += "        }\n"
+            definition += "        vxCommitLUT(%(name)s, lut_ptr);\n"
+            definition += "    }\n"
+        else:
+            definition += "    vxCopyLUT(%(name)s, %(name)s_values, VX_WRITE_ONLY, VX_MEMORY_TYPE_HOST);\n"
+        lut_name = self.get_parameter_object(graphparser, current_node, "vx_lut", definition)
+
+        parsed_string += "    /* Arithmetic node folded with its uniform input image */\n"
+        parsed_string += "    " + assignment_string + "vxTableLookupNode(graph_skeleton"
+        parsed_string += self.parse_input_parameters(graphparser, current_node)
+        parsed_string += ", " + lut_name
+        parsed_string += self.parse_output_parameters(graphparser, current_node)
+        parsed_string += ");\n"
+        parsed_string += self.append_to_io_arrays(graphparser, current_node)
+
+        return parsed_string
@@ -1,193 +1,87 @@
 """Module with library method for accessing function node objects."""
 
 from base_node import BaseNode
-from half_scale_gaussian import HalfScaleGaussian
-from subtract import Subtract
+from spec_node import SpecNode
 from threshold import Threshold
-from sobel3x3 import Sobel3x3
-from abs_diff import AbsDiff
-from convert_depth import ConvertDepth
-from dilate3x3 import Dilate3x3
 from dilate2x2 import Dilate2x2
-from erode3x3 import Erode3x3
 from erode2x2 import Erode2x2
-from add import Add
-from multiply import Multiply
-from scale_image import ScaleImage
-from magnitude import Magnitude
 from table_lookup import TableLookup
-from or_node import Or
-from and_node import And
 from warp_affine import WarpAffine
-from dubbel_io_test import DubbelIoTest
+from morphology_chain import MorphologyChain
+from folded_table_lookup import FoldedTableLookup
+import node_specs
+from node_specs import NODE_SPECS
 
 #Only create node classes once, when module is first loaded
 DEFAULT_DUMMY_NODE = BaseNode() #Used if name of node is not in the dictionary
 
-NODE_DICTIONARY = {'HalfScaleGaussian'  : HalfScaleGaussian(),
-                   'Subtract'           : Subtract(),
-                   'Threshold'          : Threshold(),
-                   'Sobel3x3'           : Sobel3x3(),
-                   'AbsDiff'            : AbsDiff(),
-                   'ConvertDepth'       : ConvertDepth(),
-                   'Dilate3x3'          : Dilate3x3(),
-                   'Erode3x3'           : Erode3x3(),
-                   'Add'                : Add(),
-                   'Multiply'           : Multiply(),
-                   'ScaleImage'         : ScaleImage(),
-                   'Magnitude'          : Magnitude(),
-                   'TableLookup'        : TableLookup(),
-                   'Or'                 : Or(),
-                   'And'                : And(),
-                   'WarpAffine'         : WarpAffine(),
-                   'DubbelIoTest'       : DubbelIoTest(), #This is a dummy node used only for testing the parser.
-                   'Dilate2x2'          : Dilate2x2(),
-                   'Erode2x2'           : Erode2x2()
-                   }
+#Nodes that create parameter objects have their own node classes,
+#the code of all other nodes is generated from their NodeSpec in node_specs.py.
+NODE_CLASSES = {'Threshold'          : Threshold,
+                'TableLookup'        : TableLookup,
+                'WarpAffine'         : WarpAffine,
+                'Dilate2x2'          : Dilate2x2,
+                'Erode2x2'           : Erode2x2,
+                'MorphologyChain'    : MorphologyChain, #Only created by the morphology fusion pass.
+                'FoldedTableLookup'  : FoldedTableLookup #Only created by the uniform image folding pass.
+                }
 
-#This dict gives the first parameter index for the first input image in the vxCreateXXXNode function call
-#Note that the vx_graph parameter is not counted when accessing node parameters
-#Therefore the first index starts on 0, for the first parameter AFTER vx_graph.
-FIRST_INPUT_IMAGE_INDEX_DICT = {'HalfScaleGaussian' :    0,
-                                'Subtract'          :    0,
-                                'Threshold'         :    0,
-                                'Sobel3x3'          :    0,
-                                'AbsDiff'           :    0,
-                                'ConvertDepth'      :    0,
-                                'Dilate3x3'         :    0,
-                                'Erode3x3'          :    0,
-                                'Add'               :    0,
-                                'Multiply'          :    0,
-                                'ScaleImage'        :    0,
-                                'Magnitude'         :    0,
-                                'TableLookup'       :    0,
-                                'Or'                :    0,
-                                'And'               :    0,
-                                'WarpAffine'        :    0,
-                                'DubbelIoTest'      :    0,
-                                'Dilate2x2'         :    1,
-                                'Erode2x2'          :    1
-                                }
+NODE_DICTIONARY = dict([(name, NODE_CLASSES[name]() if name in NODE_CLASSES else SpecNode(spec))
+                        for name, spec in NODE_SPECS.items()])
+
+#The dictionaries below are created from the node specs.
 
 #This dict gives the first parameter index for the first input image in the vxCreateXXXNode function call
 #Note that the vx_graph parameter is not counted when accessing node parameters
 #Therefore the first index starts on 0, for the first parameter AFTER vx_graph.
-FIRST_OUTPUT_IMAGE_INDEX_DICT = {'HalfScaleGaussian':    1,
-                                 'Subtract'         :    3,
-                                 'Threshold'        :    2,
-                                 'Sobel3x3'         :    1,
-                                 'AbsDiff'          :    2,
-                                 'ConvertDepth'     :    1,
-                                 'Dilate3x3'        :    1,
-                                 'Erode3x3'         :    1,
-                                 'Add'              :    3,
-                                 'Multiply'         :    5,
-                                 'ScaleImage'       :    1,
-                                 'Magnitude'        :    2,
-                                 'TableLookup'      :    2,
-                                 'Or'               :    2,
-                                 'And'              :    2,
-                                 'WarpAffine'       :    3,
-                                 'DubbelIoTest'     :    2,
-                                 'Dilate2x2'        :    3,
-                                 'Erode2x2'         :    3
-                                 }
+FIRST_INPUT_IMAGE_INDEX_DICT = dict([(name, spec.get_first_input_index()) for name, spec in NODE_SPECS.items()])
+
+#This dict gives the first parameter index for the first output image in the vxCreateXXXNode function call
+FIRST_OUTPUT_IMAGE_INDEX_DICT = dict([(name, spec.get_first_output_index()) for name, spec in NODE_SPECS.items()])
 
 #PARAMETER_NAMES_DICT and PARAMETER_INDICES_DICT are synced dictionaries,
 #so the position of the parameter name in the first dictionary gives
 #the index to use in the list in the second dictionary.
 #I.e. the vx_scalar parameter for ConvertDepth gets the second
 #index in the list for ConvertDepth in PARAMETER_INDICES_DICT, that is, index = 3.
-PARAMETER_NAMES_DICT =          {'HalfScaleGaussian':    ["vx_int32"],
-                                 'Subtract'         :    ["vx_convert_policy_e"],
-                                 'Threshold'        :    ["vx_threshold"],
-                                 'Sobel3x3'         :    [],
-                                 'AbsDiff'          :    [],
-                                 'ConvertDepth'     :    ["vx_convert_policy_e", "vx_scalar"],
-                                 'Dilate3x3'        :    [],
-                                 'Erode3x3'         :    [],
-                                 'Add'              :    ["vx_convert_policy_e"],
-                                 'Multiply'         :    ["vx_scalar", "vx_convert_policy_e", "vx_round_policy_e"],
-                                 'ScaleImage'       :    ["vx_interpolation_type_e"],
-                                 'Magnitude'        :    [],
-                                 'TableLookup'      :    ["vx_lut"],
-                                 'Or'               :    [],
-                                 'And'              :    [],
-                                 'WarpAffine'       :    ["vx_matrix", "vx_interpolation_type"],
-                                 'DubbelIoTest'     :    [],
-                                 'Dilate2x2'        :    [],
-                                 'Erode2x2'         :    [],
-                                 }
+PARAMETER_NAMES_DICT = dict([(name, [parameter.name for index, parameter in spec.get_parameters()])
+                             for name, spec in NODE_SPECS.items()])
 
 #Note that the vx_graph parameter is not counted when accessing node parameters
 #Therefore the first index starts on 0, for the first parameter AFTER vx_graph.
-PARAMETER_INDICES_DICT =        {'HalfScaleGaussian':    [2],
-                                 'Subtract'         :    [2],
-                                 'Threshold'        :    [1],
-                                 'Sobel3x3'         :    [],
-                                 'AbsDiff'          :    [],
-                                 'ConvertDepth'     :    [2,3],
-                                 'Dilate3x3'        :    [],
-                                 'Erode3x3'         :    [],
-                                 'Add'              :    [2],
-                                 'Multiply'         :    [2,3,4],
-                                 'ScaleImage'       :    [2],
-                                 'Magnitude'        :    [],
-                                 'TableLookup'      :    [1],
-                                 'Or'               :    [],
-                                 'And'              :    [],
-                                 'WarpAffine'       :    [1,2],
-                                 'DubbelIoTest'     :    [],
-                                 'Dilate2x2'        :    [],
-                                 'Erode2x2'         :    [],
-                                 }
+PARAMETER_INDICES_DICT = dict([(name, [index for index, parameter in spec.get_parameters()])
+                               for name, spec in NODE_SPECS.items()])
 
 #Input is always known when the parser checks for validity
 #VALID_INPUT_IMAGE_FORMATS and VALID_OUTPUT_IMAGE_FORMATS are index-synced dictionaries,
-VALID_INPUT_IMAGE_FORMATS =    {'HalfScaleGaussian' :[['U8'],['U8']],
-                                'Subtract'          :[['U8','U8'],['U8','U8'],['S16','S16'],['U8','U8'],['S16','S16'],['U8','S16'],['S16','U8'],['U8','S16'],['S16','U8']],
-                                'Threshold'         :[['U8'],['U8']],
-                                'Sobel3x3'          :[['U8'],['U8']],
-                                'AbsDiff'           :[['U8','U8'],['U8','U8']],
-                                'ConvertDepth'      :[['U8'],['S16'],['U8'],['S16']],
-                                'Dilate3x3'         :[['U8'],['U8']],
-                                'Erode3x3'          :[['U8'],['U8']],
-                                'Add'               :[['U8','U8'],['U8','U8'],['S16','S16'],['U8','U8'],['S16','S16'],['U8','S16'],['S16','U8'],['U8','S16'],['S16','U8']],
-                                'Multiply'          :[['U8','U8'],['U8','U8'],['S16','S16'],['U8','U8'],['S16','S16'],['U8','S16'],['S16','U8'],['U8','S16'],['S16','U8']],
-                                'ScaleImage'        :[['U8'],['U8']],
-                                'Magnitude'         :[['S16','S16'],['S16','S16']],
-                                'TableLookup'       :[['U8'],['U8']],
-                                'Or'                :[['U8','U8'],['U8','U8']],
-                                'And'               :[['U8','U8'],['U8','U8']],
-                                'WarpAffine'        :[['U8'],['U8']],
-                                'DubbelIoTest'      :[['U8','U8'],['U8','U8']],
-                                'Dilate2x2'         :[['U8'],['U8']],
-                                'Erode2x2'          :[['U8'],['U8']]
-                                }
+VALID_INPUT_IMAGE_FORMATS = dict([(name, [inputs for inputs, outputs in spec.formats])
+                                  for name, spec in NODE_SPECS.items()])
 
 #Output can be unknown, i.e. VIRT when the parser checks for validity, but should result in some definite format
 #note that two similar output format lists must have different input format lists otherwise the mapping between
 #input and output is not uniquely defined (i.e. this spec. is then wrong).
-VALID_OUTPUT_IMAGE_FORMATS =   {'HalfScaleGaussian' :[['U8'],['VIRT->U8']],
-                                'Subtract'          :[['U8'],['S16'],['S16'],['VIRT->S16'],['VIRT->S16'],['S16'],['S16'],['VIRT->S16'],['VIRT->S16']],
-                                'Threshold'         :[['U8'],['VIRT->U8']], # Boolean U8 values are either 0 or 255
-                                'Sobel3x3'          :[['S16','S16'],['VIRT->S16','VIRT->S16']],
-                                'AbsDiff'           :[['U8'],['VIRT->U8']],
-                                'ConvertDepth'      :[['S16'],['U8'],['VIRT->S16'],['VIRT->U8']],
-                                'Dilate3x3'         :[['U8'],['VIRT->U8']],
-                                'Erode3x3'          :[['U8'],['VIRT->U8']],
-                                'Add'               :[['U8'],['S16'],['S16'],['VIRT->S16'],['VIRT->S16'],['S16'],['S16'],['VIRT->S16'],['VIRT->S16']],
-                                'Multiply'          :[['U8'],['S16'],['S16'],['VIRT->S16'],['VIRT->S16'],['S16'],['S16'],['VIRT->S16'],['VIRT->S16']],
-                                'ScaleImage'        :[['U8'],['VIRT->U8']],
-                                'Magnitude'         :[['S16'],['VIRT->S16']],
-                                'TableLookup'       :[['U8'],['VIRT->U8']],
-                                'Or'                :[['U8'],['VIRT->U8']],
-                                'And'               :[['U8'],['VIRT->U8']],
-                                'WarpAffine'        :[['U8'],['VIRT->U8']],
-                                'DubbelIoTest'      :[['U8','U8'],['VIRT->U8','VIRT->U8']],
-                                'Dilate2x2'         :[['U8'],['VIRT->U8']],
-                                'Erode2x2'          :[['U8'],['VIRT->U8']]
-                                }
+VALID_OUTPUT_IMAGE_FORMATS = dict([(name, [outputs for inputs, outputs in spec.formats])
+                                   for name, spec in NODE_SPECS.items()])
+
+#Function nodes known to be supported on each execution target given by [vx_target ...].
+#The format checker warns about nodes with a target that they are not listed for,
+#targets that are not in the table are not checked.
+#VX_TARGET_ANY lets the OpenVX implementation choose the target, so all nodes are supported.
+#Add the targets of a specific platform here, with the names used by vxSetNodeTarget.
+TARGET_SUPPORTED_NODES = {'VX_TARGET_ANY' : NODE_DICTIONARY.keys()}
+
+#Function nodes that can be processed in horizontal bands (tiles), with the neighbourhood radius in rows
+#of the input images needed for one output row, and the vertical downscale factor from input to output.
+#A radius of None means that the radius depends on the node parameters (see GraphTiling).
+#Nodes without tiling in their spec (e.g. WarpAffine and ScaleImage) can not be tiled.
+TILING_NODES = dict([(name, spec.tiling) for name, spec in NODE_SPECS.items() if spec.tiling is not None])
+
+#Estimated number of arithmetic operations per pixel of the output images of each function node,
+#including saturation and rounding, used by the static cost model.
+#None means that the number depends on the node parameters (see CostModel).
+#Nodes without cost in their spec are reported without an operation count.
+COST_NODES = dict([(name, None if spec.cost == node_specs.PARAMETER_DEPENDENT else spec.cost)
+                   for name, spec in NODE_SPECS.items() if spec.cost is not None])
 
 def get_node(nodename):
     """Create the relevant function node based on the input string
@@ -207,6 +101,9 @@ class Library:
         self.PARAMETER_INDICES_DICT = PARAMETER_INDICES_DICT
         self.VALID_INPUT_IMAGE_FORMATS = VALID_INPUT_IMAGE_FORMATS
         self.VALID_OUTPUT_IMAGE_FORMATS = VALID_OUTPUT_IMAGE_FORMATS
+        self.TARGET_SUPPORTED_NODES = TARGET_SUPPORTED_NODES
+        self.TILING_NODES = TILING_NODES
+        self.COST_NODES = COST_NODES
 
         # Certain overrides has to be done if not default OpenVX version
         if vx_version is graphml_parser.VX_VERSION_1_0_1:
@@ -0,0 +1,57 @@
+"""Class for writing C-code to create a vxNonLinearFilterNode object for a fused chain of morphology nodes.
+
+The node is never drawn in a graph, it replaces chains of Erode/Dilate nodes
+when the morphology fusion pass is enabled (see graphml_parser.morphology_fusion).
+
+parsed_string contains the C code to be written to file
+"""
+from base_node import BaseNode
+
+class MorphologyChain(BaseNode):
+    """Class for parsing node with the given class name."""
+
+    def __init__(self):
+        """Initialization of Class object"""
+        BaseNode.__init__(self)
+
+    def parse(self, graphparser, current_node, assignment_string, dry_run = False):
+        """Parsing of xml and C code for creation of the function node."""
+        self.reset_parameters(graphparser, current_node, dry_run)
+        parsed_string = ""
+
+        #===============
+        # ERROR CHECKING
+        #===============
+        self.require_nbr_input_edges(graphparser, current_node, 1)
+        self.require_nbr_output_edges(graphparser, current_node, 1)
+
+        chain = graphparser.morphology_fusion.get_chain(current_node.attributes["id"].value)
+        if chain is None:
+            self.set_graph_has_errors(graphparser, current_node, "ERROR: Node is not a fused morphology chain\n")
+
+        # Early escape if errors
+        if self.node_has_errors:
+            return parsed_string
+
+        #=================
+        # PARSE PARAMETERS
+        #=================
+        dimension = chain.get_mask_dimension()
+        definition = "    vx_uint8 %(name)s_values[{}] = {{\n".format(dimension * dimension)
+        definition += ",\n".join("        " + ", ".join("%3d" % value for value in row) for row in chain.get_mask())
+        definition += " };\n"
+        definition += "    vx_matrix %(name)s = vxCreateMatrix(graphmanager_get_context(graph_manager), VX_TYPE_UINT8, {}, {});\n".format(
+            dimension, dimension)
+        definition += "    vxCopyMatrix(%(name)s, %(name)s_values, VX_WRITE_ONLY, VX_MEMORY_TYPE_HOST);\n"
+        matrix_name = self.get_parameter_object(graphparser, current_node, "vx_matrix", definition)
+
+        parsed_string += "    /* Fused chain of {} morphology nodes */\n".format(len(chain.function_nodes))
+        parsed_string += "    " + assignment_string + "vxNonLinearFilterNode(graph_skeleton"
+        parsed_string += ", " + chain.function
+        parsed_string += self.parse_input_parameters(graphparser, current_node)
+        parsed_string += ", " + matrix_name
+        parsed_string += self.parse_output_parameters(graphparser, current_node)
+        parsed_string += ");\n"
+        parsed_string += self.append_to_io_arrays(graphparser, current_node)
+
+        return parsed_string
@@ -0,0 +1,146 @@
+"""Declarative specifications of the supported function nodes.
+
+Each function node has a NodeSpec with the name of its node creation function, the ordered arguments of the
+function, the valid image formats and the facts used by the graph analyses. The dictionaries of the function
+node library are created from the specs, and nodes without a node class get their code generated by SpecNode.
+"""
+
+# Kinds of the node creation function arguments after the vx_graph argument.
+# The input and output images are given by INPUT and OUTPUT, the other arguments by Parameter objects.
+INPUT = 'input'
+OUTPUT = 'output'
+
+# Kinds of Parameter
+# A value given in the node data as [data_type value], the argument is left out if the value is not given
+ENUM = 'enum'
+# A vx_scalar created from the value given in the node data as [data_type value]
+SCALAR = 'scalar'
+# A parameter object created by the node class
+OBJECT = 'object'
+# A constant argument given by the default value
+FIXED = 'fixed'
+
+# Value of NodeSpec.cost for nodes where the number of operations depends on the node parameters (see CostModel)
+PARAMETER_DEPENDENT = 'parameter_dependent'
+
+class Parameter(object):
+    """A non-image argument of a node creation function.
+
+    name is the parameter name used in [dynamic_type name[index]], or None if the parameter can not be dynamic.
+    data_type is the type name of the value in the node data, the same as name if not given.
+    vx_type is the OpenVX type enum of a SCALAR parameter.
+    default is used if the value is not given in the node data, or the constant argument of a FIXED parameter.
+    """
+    __slots__ = ['kind', 'name', 'data_type', 'vx_type', 'default']
+
+    def __init__(self, kind, name, data_type=None, vx_type=None, default=None):
+        self.kind = kind
+        self.name = name
+        self.data_type = data_type or name
+        self.vx_type = vx_type
+        self.default = default
+
+class NodeSpec(object):
+    """Specification of a function node.
+
+    c_function is the name of the node creation function and arguments the list of its arguments after the vx_graph
+    argument, i.e. INPUT, OUTPUT or Parameter objects in parameter order.
+    formats is a list of (input image formats, output image formats) tuples with the valid combinations,
+    in the order they are matched. Output formats VIRT->format give the format of virtual output images.
+    tiling is the (radius, vertical downscale) tuple of the node for tiled processing, see GraphTiling,
+    or None if the node can not be tiled. cost is the estimated operations per output pixel, see CostModel,
+    PARAMETER_DEPENDENT or None if it is not known.
+    """
+    __slots__ = ['c_function', 'arguments', 'formats', 'tiling', 'cost']
+
+    def __init__(self, c_function, arguments, formats, tiling=None, cost=None):
+        self.c_function = c_function
+        self.arguments = arguments
+        self.formats = formats
+        self.tiling = tiling
+        self.cost = cost
+
+    def get_nbr_inputs(self):
+        return self.arguments.count(INPUT)
+
+    def get_nbr_outputs(self):
+        return self.arguments.count(OUTPUT)
+
+    def get_first_input_index(self):
+        return self.arguments.index(INPUT)
+
+    def get_first_output_index(self):
+        return self.arguments.index(OUTPUT)
+
+    def get_parameters(self):
+        """Returns a list with a (parameter index, Parameter) tuple for each parameter that can be dynamic."""
+        return [(index, argument) for index, argument in enumerate(self.arguments)
+                if isinstance(argument, Parameter) and argument.kind != FIXED and argument.name is not None]
+
+# Format combinations shared by several nodes
+U8_TO_U8_FORMATS = [(['U8'], ['U8']), (['U8'], ['VIRT->U8'])]
+U8_U8_TO_U8_FORMATS = [(['U8', 'U8'], ['U8']), (['U8', 'U8'], ['VIRT->U8'])]
+ARITHMETIC_FORMATS = [(['U8', 'U8'], ['U8']), (['U8', 'U8'], ['S16']), (['S16', 'S16'], ['S16']),
+                      (['U8', 'U8'], ['VIRT->S16']), (['S16', 'S16'], ['VIRT->S16']),
+                      (['U8', 'S16'], ['S16']), (['S16', 'U8'], ['S16']),
+                      (['U8', 'S16'], ['VIRT->S16']), (['S16', 'U8'], ['VIRT->S16'])]
+
+CONVERT_POLICY = Parameter(ENUM, 'vx_convert_policy_e')
+
+NODE_SPECS = {
+    'HalfScaleGaussian' : NodeSpec('vxHalfScaleGaussianNode', [INPUT, OUTPUT, Parameter(ENUM, 'vx_int32')],
+                                   U8_TO_U8_FORMATS, tiling=(None, 2), cost=PARAMETER_DEPENDENT),
+    'Subtract'          : NodeSpec('vxSubtractNode', [INPUT, INPUT, CONVERT_POLICY, OUTPUT],
+                                   ARITHMETIC_FORMATS, tiling=(0, 1), cost=2),
+    'Threshold'         : NodeSpec('vxThresholdNode', [INPUT, Parameter(OBJECT, 'vx_threshold'), OUTPUT],
+                                   U8_TO_U8_FORMATS, tiling=(0, 1), cost=1), # Boolean U8 values are either 0 or 255
+    'Sobel3x3'          : NodeSpec('vxSobel3x3Node', [INPUT, OUTPUT, OUTPUT],
+                                   [(['U8'], ['S16', 'S16']), (['U8'], ['VIRT->S16', 'VIRT->S16'])], tiling=(1, 1), cost=8),
+    'AbsDiff'           : NodeSpec('vxAbsDiffNode', [INPUT, INPUT, OUTPUT],
+                                   U8_U8_TO_U8_FORMATS, tiling=(0, 1), cost=2),
+    'ConvertDepth'      : NodeSpec('vxConvertDepthNode',
+                                   [INPUT, OUTPUT, CONVERT_POLICY,
+                                    Parameter(SCALAR, 'vx_scalar', data_type='vx_int32', vx_type='VX_TYPE_INT32')],
+                                   [(['U8'], ['S16']), (['S16'], ['U8']), (['U8'], ['VIRT->S16']), (['S16'], ['VIRT->U8'])],
+                                   tiling=(0, 1), cost=2),
+    'Dilate3x3'         : NodeSpec('vxDilate3x3Node', [INPUT, OUTPUT], U8_TO_U8_FORMATS, tiling=(1, 1), cost=8),
+    'Erode3x3'          : NodeSpec('vxErode3x3Node', [INPUT, OUTPUT], U8_TO_U8_FORMATS, tiling=(1, 1), cost=8),
+    'Add'               : NodeSpec('vxAddNode', [INPUT, INPUT, CONVERT_POLICY, OUTPUT],
+                                   ARITHMETIC_FORMATS, tiling=(0, 1), cost=2),
+    'Multiply'          : NodeSpec('vxMultiplyNode',
+                                   [INPUT, INPUT,
+                                    Parameter(SCALAR, 'vx_scalar', data_type='vx_float32', vx_type='VX_TYPE_FLOAT32'),
+                                    CONVERT_POLICY, Parameter(ENUM, 'vx_round_policy_e'), OUTPUT],
+                                   ARITHMETIC_FORMATS, tiling=(0, 1), cost=4),
+    'ScaleImage'        : NodeSpec('vxScaleImageNode', [INPUT, OUTPUT, Parameter(ENUM, 'vx_interpolation_type_e')],
+                                   U8_TO_U8_FORMATS, cost=PARAMETER_DEPENDENT),
+    'Magnitude'         : NodeSpec('vxMagnitudeNode', [INPUT, INPUT, OUTPUT],
+                                   [(['S16', 'S16'], ['S16']), (['S16', 'S16'], ['VIRT->S16'])], tiling=(0, 1), cost=5),
+    'TableLookup'       : NodeSpec('vxTableLookupNode', [INPUT, Parameter(OBJECT, 'vx_lut'), OUTPUT],
+                                   U8_TO_U8_FORMATS, tiling=(0, 1), cost=1),
+    'Or'                : NodeSpec('vxOrNode', [INPUT, INPUT, OUTPUT], U8_U8_TO_U8_FORMATS, tiling=(0, 1), cost=1),
+    'And'               : NodeSpec('vxAndNode', [INPUT, INPUT, OUTPUT], U8_U8_TO_U8_FORMATS, tiling=(0, 1), cost=1),
+    'WarpAffine'        : NodeSpec('vxWarpAffineNode',
+                                   [INPUT, Parameter(OBJECT, 'vx_matrix'),
+                                    Parameter(ENUM, 'vx_interpolation_type', data_type='vx_interpolation_type_e'), OUTPUT],
+                                   U8_TO_U8_FORMATS, cost=PARAMETER_DEPENDENT),
+    # This is a dummy node used only for testing the parser.
+    'DubbelIoTest'      : NodeSpec('vxDubbelIoTestNode', [INPUT, INPUT, OUTPUT, OUTPUT],
+                                   [(['U8', 'U8'], ['U8', 'U8']), (['U8', 'U8'], ['VIRT->U8', 'VIRT->U8'])]),
+    # The 2x2 morphology nodes use vxNonLinearFilterNode, except for OpenVX 1.0.1 (see Library)
+    'Dilate2x2'         : NodeSpec('vxNonLinearFilterNode',
+                                   [Parameter(FIXED, None, default='VX_NONLINEAR_FILTER_MAX'), INPUT,
+                                    Parameter(OBJECT, None), OUTPUT],
+                                   U8_TO_U8_FORMATS, tiling=(1, 1), cost=3),
+    'Erode2x2'          : NodeSpec('vxNonLinearFilterNode',
+                                   [Parameter(FIXED, None, default='VX_NONLINEAR_FILTER_MIN'), INPUT,
+                                    Parameter(OBJECT, None), OUTPUT],
+                                   U8_TO_U8_FORMATS, tiling=(1, 1), cost=3),
+    # Only created by the morphology fusion pass.
+    'MorphologyChain'   : NodeSpec('vxNonLinearFilterNode',
+                                   [Parameter(OBJECT, None), INPUT, Parameter(OBJECT, None), OUTPUT],
+                                   U8_TO_U8_FORMATS, tiling=(None, 1), cost=PARAMETER_DEPENDENT),
+    # Only created by the uniform image folding pass.
+    'FoldedTableLookup' : NodeSpec('vxTableLookupNode', [INPUT, Parameter(OBJECT, None), OUTPUT],
+                                   U8_TO_U8_FORMATS, tiling=(0, 1), cost=1)
+    }
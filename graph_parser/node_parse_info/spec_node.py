@@ -0,0 +1,85 @@
+"""Class for writing C-code to create a function node object from its NodeSpec.
+
+Done by parsing the graph parameters of the xml description of the node.
+
+parsed_string contains the C code to be written to file
+"""
+from base_node import BaseNode
+import node_specs
+
+class SpecNode(BaseNode):
+    """Class for parsing a node that is fully described by its NodeSpec.
+
+    The C code of the node creation function is compiled to a template when the node is created,
+    so parsing a node only renders the template with the image and parameter arguments of the node.
+    Nodes with OBJECT parameters need a node class that creates the parameter objects.
+    """
+
+    def __init__(self, spec):
+        """Initialization of Class object"""
+        BaseNode.__init__(self)
+        self.spec = spec
+        self.nbr_inputs = spec.get_nbr_inputs()
+        self.nbr_outputs = spec.get_nbr_outputs()
+        self.template = self.compile_template(spec)
+
+    def compile_template(self, spec):
+        """Returns the format string for the node creation function call.
+
+        A run of input or output images is given by {inputs} or {outputs},
+        since they are ordered by their edge labels, and parameter number N by {pN}.
+        """
+        template = "    {assignment}" + spec.c_function + "(graph_skeleton"
+        previous_argument = None
+        for index, argument in enumerate(spec.arguments):
+            if argument in [node_specs.INPUT, node_specs.OUTPUT]:
+                if argument != previous_argument:
+                    template += "{" + argument + "s}"
+            elif argument.kind == node_specs.FIXED:
+                template += ", " + argument.default
+            elif argument.kind in [node_specs.ENUM, node_specs.SCALAR]:
+                template += "{p" + str(index) + "}"
+            else:
+                raise RuntimeError("Node " + spec.c_function + " has an object parameter and needs a node class")
+            previous_argument = argument
+        return template + ");\n"
+
+    def parse(self, graphparser, current_node, assignment_string, dry_run = False):
+        """Parsing of xml and C code for creation of the function node."""
+        self.reset_parameters(graphparser, current_node, dry_run)
+        parsed_string = ""
+
+        #===============
+        # ERROR CHECKING
+        #===============
+        self.require_nbr_input_edges(graphparser, current_node, self.nbr_inputs)
+        self.require_nbr_output_edges(graphparser, current_node, self.nbr_outputs)
+        if self.nbr_inputs == 2 and len(self.node_info.input_image_node_ids) == 2:
+            self.require_2_input_edges_labeled(graphparser, current_node)
+        if self.nbr_outputs == 2 and len(self.node_info.output_image_node_ids) == 2:
+            self.require_2_output_edges_labeled(graphparser, current_node)
+
+        #=================
+        # PARSE PARAMETERS
+        #=================
+        if not self.node_has_errors:
+            arguments = {'assignment' : assignment_string,
+                         'inputs' : self.parse_input_parameters(graphparser, current_node),
+                         'outputs' : self.parse_output_parameters(graphparser, current_node)}
+            for index, parameter in enumerate(self.spec.arguments):
+                if parameter in [node_specs.INPUT, node_specs.OUTPUT]:
+                    continue
+                if parameter.kind == node_specs.SCALAR:
+                    value = self.parse_single_parameter(graphparser, parameter.data_type, current_node)
+                    definition = "    " + parameter.data_type + " %(name)s_value = " + value + ";\n"
+                    definition += "    vx_scalar %(name)s = vxCreateScalar(graphmanager_get_context(graph_manager), " + \
+                                  parameter.vx_type + ", &%(name)s_value);\n"
+                    arguments['p' + str(index)] = ", " + self.get_parameter_object(graphparser, current_node, parameter.name, definition)
+                elif parameter.kind == node_specs.ENUM:
+                    value = self.parse_single_parameter(graphparser, parameter.data_type, current_node) or parameter.default
+                    arguments['p' + str(index)] = ", " + value if value else ""
+
+            parsed_string += self.template.format(**arguments)
+            parsed_string += self.append_to_io_arrays(graphparser, current_node)
+
+        return parsed_string
@@ -18,7 +18,6 @@ class TableLookup(BaseNode):
     def __init__(self):
         """Initialization of Class object"""
         BaseNode.__init__(self)
-        self.table_lookup_count = 0
 
     def parse(self, graphparser, current_node, assignment_string, dry_run = False):
         """Parsing of xml and C code for creation of the function node."""
@@ -35,23 +34,20 @@ class TableLookup(BaseNode):
         # PARSE PARAMETERS
         #=================
         if not self.node_has_errors:
-            if self.table_lookup_count == 0 and not dry_run:
-                self.table_lookup_count += 1
-                parsed_string += "    vx_lut lut;\n"
-
             lut_type = self.parse_single_parameter(graphparser, "vx_lut", current_node)
             if lut_type not in DEFAULT_LUTs:
                 err_string = "ERROR: LUT implementation for {} not found\n".format(lut_type)
                 self.set_graph_has_errors(graphparser, current_node, err_string)
-            else:
-                parsed_string += "    lut = " + DEFAULT_LUTs[lut_type] + ";\n"
+                return parsed_string
+
+            lut_name = self.get_parameter_object(graphparser, current_node, "vx_lut",
+                                                 "    vx_lut %(name)s = " + DEFAULT_LUTs[lut_type] + ";\n")
 
             parsed_string += "    " + assignment_string + "vxTableLookupNode(graph_skeleton"
             parsed_string += self.parse_input_parameters(graphparser, current_node)
-            parsed_string += ", lut"
+            parsed_string += ", " + lut_name
             parsed_string += self.parse_output_parameters(graphparser, current_node)
             parsed_string += ");\n"
-            parsed_string += "    vxReleaseLUT(&lut);\n"
             parsed_string += self.append_to_io_arrays(graphparser, current_node)
 
         return parsed_string
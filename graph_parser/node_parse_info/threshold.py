@@ -14,8 +14,6 @@ class Threshold(BaseNode):
     def __init__(self):
         """Initialization of Class object"""
         BaseNode.__init__(self)
-        self.thresh_count = 0
-        self.thresh_val_count = 0
 
     def parse(self, graphparser, current_node, assignment_string, dry_run = False):
         """Parsing of xml and C code for creation of the function node."""
@@ -34,19 +32,6 @@ class Threshold(BaseNode):
         #=================
         #TODO: Only binary threshold currently supported.
         if not self.node_has_errors:
-            if self.thresh_val_count == 0 and not dry_run:
-                self.thresh_val_count += 1
-                if graphparser.vx_version == graphml_parser.VX_VERSION_1_2:
-                    parsed_string += "    vx_pixel_value_t thresh_value;\n"
-                else:
-                    parsed_string += "    " + self.parse_single_parameter(graphparser, "vx_size", current_node)
-                    parsed_string += " thresh_value;\n"
-
-            #Create the threshold object
-            if self.thresh_count == 0 and not dry_run:
-                self.thresh_count += 1
-                parsed_string += "    vx_threshold thresh;\n"
-
             if graphparser.vx_version == graphml_parser.VX_VERSION_1_2:
                 input_format = graphparser.image_format_checker.get_image_format_from_image_node_id(graphparser.graph,
                                                                                                     graphparser.image_nodes,
@@ -55,43 +40,48 @@ class Threshold(BaseNode):
                                                                                                      graphparser.image_nodes,
                                                                                                      self.node_info.output_image_node_ids[0])
 
-                parsed_string += "    thresh_value.{} = ".format(input_format)
-                parsed_string += self.parse_single_parameter(graphparser, "vx_pixel_value_t", current_node)
-                parsed_string += ";\n"
+                definition = "    vx_pixel_value_t %(name)s_value;\n"
+                definition += "    %(name)s_value.{} = ".format(input_format)
+                definition += self.parse_single_parameter(graphparser, "vx_pixel_value_t", current_node)
+                definition += ";\n"
 
-                parsed_string += "    thresh = vxCreateThresholdForImage(graphmanager_get_context(graph_manager)"
-                parsed_string += self.parse_parameter(graphparser, "vx_threshold_type_e", current_node)
-                parsed_string += ", VX_DF_IMAGE_" + input_format
-                parsed_string += ", VX_DF_IMAGE_" + output_format
-                parsed_string += ");\n"
+                #Create the threshold object
+                definition += "    vx_threshold %(name)s = vxCreateThresholdForImage(graphmanager_get_context(graph_manager)"
+                definition += self.parse_parameter(graphparser, "vx_threshold_type_e", current_node)
+                definition += ", VX_DF_IMAGE_" + input_format
+                definition += ", VX_DF_IMAGE_" + output_format
+                definition += ");\n"
 
                 #Set the threshold pointer value on the threshold object
-                parsed_string += "    vxCopyThresholdValue(thresh, &thresh_value, VX_WRITE_ONLY, VX_MEMORY_TYPE_HOST);\n"
+                definition += "    vxCopyThresholdValue(%(name)s, &%(name)s_value, VX_WRITE_ONLY, VX_MEMORY_TYPE_HOST);\n"
 
             else:
-                parsed_string += "    thresh_value = " #vx_int32 = typedef of int32_t. Maybe find better name than vx_size?
-                parsed_string += self.parse_single_parameter(graphparser, self.parse_single_parameter(graphparser, "vx_size", current_node), current_node)
-                parsed_string += ";\n"
+                definition = "    " + self.parse_single_parameter(graphparser, "vx_size", current_node)
+                definition += " %(name)s_value = " #vx_int32 = typedef of int32_t. Maybe find better name than vx_size?
+                definition += self.parse_single_parameter(graphparser, self.parse_single_parameter(graphparser, "vx_size", current_node), current_node)
+                definition += ";\n"
 
-                parsed_string += "    thresh = vxCreateThreshold(graphmanager_get_context(graph_manager)"
-                parsed_string += self.parse_parameter(graphparser, "vx_threshold_type_e", current_node) #e.g. VX_THRESHOLD_TYPE_BINARY (VX_THRESHOLD_TYPE_RANGE also supported but not yet implemented)
-                parsed_string += self.parse_parameter(graphparser, "vx_type_e", current_node) #Only VX_TYPE_UINT8 supported in vx1.0
-                parsed_string += ");\n"
+                #Create the threshold object
+                definition += "    vx_threshold %(name)s = vxCreateThreshold(graphmanager_get_context(graph_manager)"
+                definition += self.parse_parameter(graphparser, "vx_threshold_type_e", current_node) #e.g. VX_THRESHOLD_TYPE_BINARY (VX_THRESHOLD_TYPE_RANGE also supported but not yet implemented)
+                definition += self.parse_parameter(graphparser, "vx_type_e", current_node) #Only VX_TYPE_UINT8 supported in vx1.0
+                definition += ");\n"
 
                 #Set the threshold pointer value on the threshold object
-                parsed_string += "    vxSetThresholdAttribute(thresh"
-                parsed_string += self.parse_parameter(graphparser, "vx_threshold_attribute_e", current_node) #e.g. VX_THRESHOLD_ATTRIBUTE_THRESHOLD_VALUE (which other are supported?)
-                parsed_string += ", &thresh_value"
-                parsed_string += ", sizeof(" + self.parse_single_parameter(graphparser, "vx_size", current_node) + ")"
-                parsed_string += ");\n"
+                definition += "    vxSetThresholdAttribute(%(name)s"
+                definition += self.parse_parameter(graphparser, "vx_threshold_attribute_e", current_node) #e.g. VX_THRESHOLD_ATTRIBUTE_THRESHOLD_VALUE (which other are supported?)
+                definition += ", &%(name)s_value"
+                definition += ", sizeof(" + self.parse_single_parameter(graphparser, "vx_size", current_node) + ")"
+                definition += ");\n"
+
+            threshold_name = self.get_parameter_object(graphparser, current_node, "vx_threshold", definition)
 
             #Create the threshold node with the attached threshold object
             parsed_string += "    " + assignment_string + "vxThresholdNode(graph_skeleton"
             parsed_string += self.parse_input_parameters(graphparser, current_node)
-            parsed_string += ", thresh"
+            parsed_string += ", " + threshold_name
             parsed_string += self.parse_output_parameters(graphparser, current_node)
             parsed_string += ");\n"
-            parsed_string += "    vxReleaseThreshold(&thresh);\n"
             parsed_string += self.append_to_io_arrays(graphparser, current_node)
 
         return parsed_string
@@ -47,7 +47,6 @@ class WarpAffine(BaseNode):
     def __init__(self):
         """Initialization of Class object"""
         BaseNode.__init__(self)
-        self.mat_count = 0
 
     def parse(self, graphparser, current_node, assignment_string, dry_run = False):
         """Parsing of xml and C code for creation of the function node."""
@@ -72,32 +71,27 @@ class WarpAffine(BaseNode):
                 err_string = "ERROR: Matrix implementation for {} not found\n".format(matrix_type)
                 print err_string
                 self.set_graph_has_errors(graphparser, current_node, err_string)
-            else:
-                matrix_string = DEFAULT_MATRIXs[matrix_type]
-
-            if not dry_run:
-                self.mat_count += 1
+                return parsed_string
 
-                parsed_string += """\
-    vx_float32 mat%s[3][2] = /*%s*/ %s;
-    vx_matrix matrix%s = vxCreateMatrix(graphmanager_get_context(graph_manager), VX_TYPE_FLOAT32, 2, 3);
-""" % (str(self.mat_count), matrix_type, matrix_string, str(self.mat_count))
+            definition = """\
+    vx_float32 %%(name)s_values[3][2] = /*%s*/ %s;
+    vx_matrix %%(name)s = vxCreateMatrix(graphmanager_get_context(graph_manager), VX_TYPE_FLOAT32, 2, 3);
+""" % (matrix_type, DEFAULT_MATRIXs[matrix_type])
 
-                # Writing to matrix object is different from OpenVX1.1
-                if graphparser.vx_version == graphml_parser.VX_VERSION_1_0_1:
-                    parsed_string += "    vxWriteMatrix(matrix%s, mat%s);\n" % (str(self.mat_count), str(self.mat_count))
-                else:
-                    parsed_string += "    vxCopyMatrix(matrix%s, mat%s, VX_WRITE_ONLY, VX_MEMORY_TYPE_HOST);\n" % \
-                                     (str(self.mat_count), str(self.mat_count))
+            # Writing to matrix object is different from OpenVX1.1
+            if graphparser.vx_version == graphml_parser.VX_VERSION_1_0_1:
+                definition += "    vxWriteMatrix(%(name)s, %(name)s_values);\n"
+            else:
+                definition += "    vxCopyMatrix(%(name)s, %(name)s_values, VX_WRITE_ONLY, VX_MEMORY_TYPE_HOST);\n"
+            matrix_name = self.get_parameter_object(graphparser, current_node, "vx_matrix", definition)
 
             parsed_string += "    " + assignment_string + "vxWarpAffineNode(graph_skeleton"
             parsed_string += self.parse_input_parameters(graphparser, current_node)
-            parsed_string += """, matrix%s""" % (str(self.mat_count))
+            parsed_string += ", " + matrix_name
             parsed_string += self.parse_parameter(graphparser, "vx_interpolation_type_e", current_node)
             parsed_string += self.parse_output_parameters(graphparser, current_node)
 
             parsed_string += ");\n"
-            parsed_string += """    vxReleaseMatrix(&matrix%s);\n""" % (str(self.mat_count))
             parsed_string += self.append_to_io_arrays(graphparser, current_node)
 
         return parsed_string
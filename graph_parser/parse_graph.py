@@ -38,7 +38,9 @@ The script calls in turn the following submodules:
 # We use a different documentation format from the other modules here to enable
 # adding the image of call sequence (requires docutils-common package or similar)
 __docformat__ = "restructuredtext en"
+import sys
 import os.path
+import json
 import subprocess
 import argparse
 import logging
@@ -53,6 +55,17 @@ from code_generation import graph_sourcefile_beginning
 from code_generation import graph_create_function
 from code_generation import graph_set_io_images_function
 from code_generation import graph_set_debug_images_function
+from code_generation import graph_bench_file
+from code_generation import graph_harness_file
+from graphml_parser import reference_executor
+
+def frame_size_type(string):
+    """ Converts a WIDTHxHEIGHT command line argument to a (width, height) tuple."""
+    try:
+        width, height = [int(value) for value in string.lower().split('x')]
+    except ValueError:
+        raise argparse.ArgumentTypeError("invalid frame size {}, expected WIDTHxHEIGHT".format(string))
+    return width, height
 
 def argparse_setup():
     """ Function to set up the argParse object with argument options."""
@@ -81,6 +94,75 @@ def argparse_setup():
                         default=graphml_parser.VX_VERSION_DEFAULT)
     parser.add_argument('-O', '--output_dir', dest='output_dir',
                         help="specify output directory for generated files")
+    parser.add_argument('-M', '--fuse-morphology',
+                        action='store_true', dest='fuse_morphology',
+                        help="fuse chains of Erode/Dilate nodes into single vxNonLinearFilterNodes (OpenVX 1.1 and later). "
+                             "Can be overridden per graph with [fuse_morphology true/false] in the userdata node")
+    parser.add_argument('-U', '--fold-uniform-images',
+                        action='store_true', dest='fold_uniform_images',
+                        help="fold Add/Subtract/Multiply/And/Or/AbsDiff nodes with a uniform input image into lookup tables or remove them. "
+                             "Can be overridden per graph with [fold_uniform_images true/false] in the userdata node")
+    parser.add_argument('-P', '--pipelined', dest='pipelined', type=int, default=0, metavar='DEPTH',
+                        help="generate a pipelined graph with DEPTH buffers per I/O image, using the OpenVX pipelining extension. "
+                             "Only valid if -S/--strip is also given and for OpenVX 1.2")
+    parser.add_argument('-Z', '--zero-copy',
+                        action='store_true', dest='zero_copy',
+                        help="also generate functions that create the I/O images from host memory and bind new frames by "
+                             "swapping the image handles. Only valid if -S/--strip is also given and for OpenVX 1.1 and later")
+    parser.add_argument('-N', '--instances', dest='instances', type=int, default=1, metavar='N',
+                        help="also generate functions that create and process N instances of the graph in one context, "
+                             "sharing uniform images and parameter objects. Only valid if -S/--strip is also given")
+    parser.add_argument('-T', '--tiles', dest='tiles', type=int, default=1, metavar='T',
+                        help="also generate functions that split the images into T horizontal bands with a halo, "
+                             "create one graph per band and process the bands in parallel threads. "
+                             "Only valid if -S/--strip is also given and for OpenVX 1.2")
+    parser.add_argument('-R', '--perf-report',
+                        action='store_true', dest='perf_report',
+                        help="keep the function node handles and also generate a function that prints the performance "
+                             "of each node as CSV, keyed by graphml node id. "
+                             "Only valid if -S/--strip is also given and for OpenVX 1.1 and later")
+    parser.add_argument('-A', '--async',
+                        action='store_true', dest='run_async',
+                        help="also generate a double-buffered asynchronous run loop that schedules the graph on one set "
+                             "of I/O images while the caller prepares the other. Only valid if -I/--strip_io is also given")
+    parser.add_argument('-B', '--bench',
+                        action='store_true', dest='bench',
+                        help="also generate a standalone benchmark <graph>_bench.c that runs the graph on synthetic frames "
+                             "and prints the latency percentiles and frames per second as JSON. "
+                             "Only valid if -S/--strip is also given")
+    parser.add_argument('-H', '--harness',
+                        action='store_true', dest='harness',
+                        help="also generate a standalone test harness <graph>_harness.c that runs the graph over memory-mapped "
+                             "raw Y8/Y16 or PGM frame sequences. Only valid if -S/--strip is also given and for OpenVX 1.1 and later")
+    parser.add_argument('-X', '--import-export',
+                        action='store_true', dest='import_export',
+                        help="also generate functions that export the verified graph to a blob and load it from the blob "
+                             "with the OpenVX import/export extension, falling back to creating the graph, and a warm-up function. "
+                             "Only valid if -S/--strip is also given and for OpenVX 1.2")
+    parser.add_argument('-E', '--reference', dest='reference', nargs='+', metavar='ARG',
+                        help="also run the graph with the NumPy reference executor on the input images in the given .npy files, "
+                             "in input image index order, and write the output images to <graph>_reference_<index>.npy. "
+                             "Arguments name=value set userdata fields")
+    parser.add_argument('-C', '--cost-report',
+                        action='store_true', dest='cost_report',
+                        help="write the estimated bytes read and written and the arithmetic operations of each function node "
+                             "and of the whole graph to <graph>_cost.json")
+    parser.add_argument('--max-bytes-per-frame', dest='max_bytes_per_frame', type=int, default=0, metavar='BYTES',
+                        help="fail the generation if the graph reads and writes more than an estimated BYTES bytes per frame")
+    parser.add_argument('--frame-size', dest='frame_size', type=frame_size_type, default=(640, 480), metavar='WIDTHxHEIGHT',
+                        help="size of the input images without a size in the graph, for the cost estimate, default is 640x480")
+    parser.add_argument('-L', '--parallelism',
+                        action='store_true', dest='parallelism',
+                        help="analyse the topological levels, the critical path by node count and by estimated cost, and the "
+                             "fan-in/fan-out hot spots of the function nodes, print the result and write it to <graph>_parallelism.json")
+    parser.add_argument('--highlight-critical-path',
+                        action='store_true', dest='highlight_critical_path',
+                        help="highlight the critical path by cost in the validation graph. Only valid if -L/--parallelism "
+                             "and -e/--error are also given")
+    parser.add_argument('-W', '--memory-report',
+                        action='store_true', dest='memory_report',
+                        help="analyse the peak live bytes of the internal images for the topological order and search for the "
+                             "order with the smallest peak, print the result and write it to <graph>_memory.json")
 
     return parser.parse_args()
 
@@ -103,6 +185,30 @@ def generate_source_code(graphparser, dry_run = False):
 
     return [generated_source_code_h, generated_source_code_c]
 
+def run_reference(graphparser, arguments, graphname):
+    """Runs the graph with the NumPy reference executor on the input images and userdata values in arguments.
+    Returns False if the execution failed."""
+    input_images = []
+    userdata_values = {}
+    try:
+        for argument in arguments:
+            if '=' in argument:
+                name, value = argument.split('=', 1)
+                userdata_values[name] = float(value) if '.' in value else int(value)
+            else:
+                input_images.append(reference_executor.load_image(argument))
+        output_images = graphparser.run_reference(input_images, userdata_values)
+    except (RuntimeError, IOError, ValueError) as error:
+        print "ERROR: Reference execution failed: " + str(error)
+        return False
+
+    for index, image in enumerate(output_images):
+        reference_executor.save_image(graphname + "_reference_" + str(index) + ".npy", image)
+    if graphparser.verbose:
+        print "Reference execution wrote " + str(len(output_images)) + " output images, peak image memory " + \
+              str(graphparser.reference_executor.peak_bytes) + " bytes"
+    return True
+
 def main():
     """ The main function invoked to run the parser."""
 
@@ -110,6 +216,23 @@ def main():
 
     # Initialize the GraphParser.
     graphparser = graphml_parser.GraphParser(args.verbose, args.debug_mode, args.strip_mode, args.strip_io, args.vx_version)
+    try:
+        graphparser.set_pipeline_depth(args.pipelined)
+        graphparser.set_zero_copy(args.zero_copy)
+        graphparser.set_instances(args.instances)
+        graphparser.set_tiles(args.tiles)
+        graphparser.set_perf_report(args.perf_report)
+        graphparser.set_run_async(args.run_async)
+        graphparser.set_bench(args.bench)
+        graphparser.set_harness(args.harness)
+        graphparser.set_import_export(args.import_export)
+        graphparser.set_max_bytes_per_frame(args.max_bytes_per_frame)
+        if args.highlight_critical_path and not (args.parallelism and args.error_graph):
+            raise RuntimeError('Highlighting the critical path requires the parallelism analysis and the validation graph.')
+    except RuntimeError as error:
+        # Invalid combinations of options
+        print "ERROR: " + str(error)
+        sys.exit(1)
 
     # File paths for reading and writing to generated c-files
     # and validation/error visualization graph
@@ -151,6 +274,8 @@ def main():
         print str(args) + "\n"
 
     graphparser.set_function_node_library(function_node_library.Library(vx_version=graphparser.vx_version))
+    graphparser.set_fuse_morphology(args.fuse_morphology)
+    graphparser.set_fold_uniform_images(args.fold_uniform_images)
     graphparser.load_graph(args.filename)
 
     # Open output files
@@ -165,15 +290,68 @@ def main():
     dry_run = True
     generate_source_code(graphparser, dry_run)
 
+    # Set if an additional output requested on the command line could not be generated,
+    # the exit status is then nonzero after the other outputs have been written
+    output_failed = False
+
     if not graphparser.graph_has_errors:
         # Run format checker on image nodes only if function nodes have passed their checks
         graphparser.graph_has_errors |= graphparser.verify_graph_image_formats()
 
+    if not graphparser.graph_has_errors and graphparser.pipeline_depth > 0:
+        graphparser.graph_has_errors |= graphparser.verify_pipeline_io_images()
+
+    if not graphparser.graph_has_errors:
+        # Optimization passes change the node lists, so they are run after all checks are done
+        graphparser.optimize_graph()
+        if graphparser.tiles > 1:
+            graphparser.analyse_tiling()
+        if args.cost_report or graphparser.max_bytes_per_frame > 0 or args.parallelism or args.memory_report:
+            graphparser.graph_has_errors |= graphparser.analyse_cost(args.frame_size)
+            if args.cost_report:
+                cost_output_file = open(graphname + "_cost.json", "w")
+                json.dump(graphparser.get_cost_report(), cost_output_file, indent=4, sort_keys=True, separators=(",", ": "))
+                cost_output_file.close()
+        if args.parallelism:
+            graphparser.analyse_parallelism(args.highlight_critical_path)
+            print graphparser.parallelism_analysis.get_text_report()
+            parallelism_output_file = open(graphname + "_parallelism.json", "w")
+            json.dump(graphparser.get_parallelism_report(), parallelism_output_file, indent=4, sort_keys=True,
+                      separators=(",", ": "))
+            parallelism_output_file.close()
+        if args.memory_report:
+            graphparser.analyse_memory()
+            print graphparser.memory_analysis.get_text_report()
+            memory_output_file = open(graphname + "_memory.json", "w")
+            json.dump(graphparser.get_memory_report(), memory_output_file, indent=4, sort_keys=True, separators=(",", ": "))
+            memory_output_file.close()
+
     if not graphparser.graph_has_errors:
         # Generate C code files for graph registration
         [source_h, source_c] = generate_source_code(graphparser)
         h_output_file.write(source_h)
         c_output_file.write(source_c)
+
+        if graphparser.bench:
+            bench_output_file = open(graphname + "_bench.c", "w")
+            bench_output_file.write(graph_bench_file.parse(graphparser, os.path.basename(h_output_filename)))
+            bench_output_file.close()
+
+        if graphparser.harness:
+            unsupported_images = graph_harness_file.get_unsupported_images(graphparser)
+            for image_id, image_format in unsupported_images:
+                print "ERROR: The test harness only supports U8, U16 and S16 I/O images, image " + image_id + \
+                      " has format " + image_format
+            if unsupported_images:
+                output_failed = True
+            else:
+                harness_output_file = open(graphname + "_harness.c", "w")
+                harness_output_file.write(graph_harness_file.parse(graphparser, os.path.basename(h_output_filename)))
+                harness_output_file.close()
+
+        if args.reference:
+            if not run_reference(graphparser, args.reference, graphname):
+                output_failed = True
     else:
         h_output_file.write("AUTOGENERATION CONTAINS ERRORS!!!!")
         c_output_file.write("AUTOGENERATION CONTAINS ERRORS!!!!")
@@ -189,11 +367,12 @@ def main():
 
     if args.error_graph:
         # Write validation/error graph for visualizing result of parsing
-        validation_file = open(graph_filename_validation, "w")
-        graphparser.validation_output_graph.writexml(validation_file)
-        validation_file.close()
+        graphparser.write_validation_graph(graph_filename_validation)
         if graphparser.verbose:
             print "Created verification graph: " + graph_filename_validation
 
+    if output_failed:
+        sys.exit(1)
+
 if __name__ == "__main__":
     main()